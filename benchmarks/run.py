@@ -0,0 +1,177 @@
+"""
+Benchmark suite of pyneural. Run it from the root of the repository:
+
+    python -m benchmarks.run            # run all benchmarks and compare them with the stored baseline
+    python -m benchmarks.run --save     # run all benchmarks and store the results as the new baseline
+    python -m benchmarks.run -k hh      # run only the benchmarks whose names contain 'hh'
+
+Each benchmark reports its wall time (the best of several repeats), the simulated steps and neuron-steps per second and the peak memory allocated by NumPy and Python during one run (measured separately with tracemalloc, so it does not slow the timed runs). A benchmark regresses if its throughput drops or its peak memory grows by more than the tolerance relative to the baseline; the script then exits with status 1. Timings depend on the machine, so baselines should be compared on the machine they were stored on.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterator, NamedTuple
+import numpy as np
+from pyneural import NeuralModel
+from pyneural.input_current import NoisyConstInputCurrent
+
+BASELINE: str = os.path.join(os.path.dirname(__file__), 'baseline.json')
+"""Default path of the stored baseline."""
+
+MODELS: tuple[str, ...] = ('const', 'lif', 'hh')
+N_NEURONS: tuple[int, ...] = (100, 1000, 10000)
+N_STEPS: tuple[int, ...] = (1000, 5000)
+DT: float = 0.02
+
+
+class Benchmark(NamedTuple):
+    name: str
+    """Unique name of the benchmark."""
+    N_steps: int
+    """Number of steps simulated (or generated) by a single run."""
+    N_neurons: int
+    """Number of neurons in a single run."""
+    setup: Callable[[], Callable[[], object]]
+    """Function preparing the inputs of a run, which returns the function to time."""
+
+
+def _simulation(model: str, N_neurons: int, N_steps: int, record: tuple[str, ...] = (), backend: str = 'numpy') -> Callable[[], Callable[[], object]]:
+    def setup():
+        neural_model = NeuralModel(model, backend=backend)
+        neurons = neural_model.create_model(N_neurons)
+        I_input = NoisyConstInputCurrent(N_neurons, I=np.linspace(0, 30, N_neurons), std=2, rng=np.random.default_rng(0))
+        return lambda: neural_model.simulate_neurons(neurons, N_steps, DT, I_input, record=record)
+    return setup
+
+
+def _fi_curve(model: str, N_currents: int, N_iter: int, backend: str = 'numpy') -> Callable[[], Callable[[], object]]:
+    def setup():
+        neural_model = NeuralModel(model, backend=backend)
+        I = np.linspace(0, 30, N_currents)
+        return lambda: neural_model.get_fi_curve(I, N_iter=N_iter, dt=DT)
+    return setup
+
+
+def _noise(N_neurons: int, N_steps: int) -> Callable[[], Callable[[], object]]:
+    def setup():
+        I_input = NoisyConstInputCurrent(N_neurons, I=np.linspace(0, 30, N_neurons), std=2, rng=np.random.default_rng(0))
+        out = np.empty((N_steps, N_neurons))
+        return lambda: I_input.get_current_block(0, N_steps, DT, out=out)
+    return setup
+
+
+def benchmarks(backend: str = 'numpy') -> Iterator[Benchmark]:
+    """
+    Generate the benchmarks of the suite.
+
+    :param backend: simulation engine of `pyneural.NeuralModel` ('numpy' or 'numba').
+    """
+    for model in MODELS:
+        for N_neurons in N_NEURONS:
+            for N_steps in N_STEPS:
+                yield Benchmark(f'simulate/{model}/N={N_neurons}/steps={N_steps}', N_steps, N_neurons, _simulation(model, N_neurons, N_steps, backend=backend))
+    # the cost of recording the traces of all variables against recording nothing
+    for model in MODELS:
+        for record in ((), ('Vm',), NeuralModel(model).model_class.RECORDABLE):
+            yield Benchmark(f'record/{model}/variables={len(record)}', 2000, 1000, _simulation(model, 1000, 2000, record, backend))
+    for model in MODELS:
+        yield Benchmark(f'fi_curve/{model}/currents=200/steps=10000', 10000, 200, _fi_curve(model, 200, 10000, backend))
+    for N_neurons in N_NEURONS:
+        yield Benchmark(f'noise/N={N_neurons}/steps=1000', 1000, N_neurons, _noise(N_neurons, 1000))
+
+
+def measure(benchmark: Benchmark, repeat: int = 3) -> dict[str, float]:
+    """
+    Run a benchmark. Returns a dictionary with its wall time in seconds, steps/sec, neuron-steps/sec and peak memory in MB.
+
+    :param benchmark: benchmark to run.
+    :param repeat: number of timed runs, the best of which is reported.
+    """
+    seconds = np.inf
+    for _ in range(repeat):
+        run = benchmark.setup()
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    run = benchmark.setup()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'steps_per_sec': benchmark.N_steps / seconds,
+        'neuron_steps_per_sec': benchmark.N_steps * benchmark.N_neurons / seconds,
+        'peak_memory_mb': peak / 2**20
+    }
+
+
+def regressions(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float) -> list[str]:
+    """
+    Compare the results with the baseline. Returns descriptions of the benchmarks which got slower or use more memory by more than the tolerance.
+
+    :param results: dictionary mapping the name of each benchmark to the dictionary returned by `measure`.
+    :param baseline: results of the baseline in the same form.
+    :param tolerance: allowed relative change (e.g. 0.25 for 25%).
+    """
+    found = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if result['neuron_steps_per_sec'] < base['neuron_steps_per_sec'] * (1 - tolerance):
+            found.append(f"{name}: {result['neuron_steps_per_sec']:.3g} neuron-steps/sec, baseline {base['neuron_steps_per_sec']:.3g}")
+        if result['peak_memory_mb'] > base['peak_memory_mb'] * (1 + tolerance) + 1:
+            found.append(f"{name}: {result['peak_memory_mb']:.1f} MB peak memory, baseline {base['peak_memory_mb']:.1f}")
+    return found
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run the pyneural benchmarks and compare them with the baseline.')
+    parser.add_argument('-k', dest='pattern', default='', help='run only the benchmarks whose names contain this string')
+    parser.add_argument('--baseline', default=BASELINE, help='path of the baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline (merged into the existing file)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown or memory growth (default 0.25)')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs of each benchmark (default 3)')
+    parser.add_argument('--backend', default='numpy', choices=NeuralModel.BACKENDS, help='simulation engine (default numpy)')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    suite = baseline.setdefault(args.backend, {})
+
+    results = {}
+    print(f"{'benchmark':<40} {'seconds':>9} {'steps/s':>10} {'neuron-steps/s':>15} {'peak MB':>9}")
+    for benchmark in benchmarks(args.backend):
+        if args.pattern not in benchmark.name:
+            continue
+        result = results[benchmark.name] = measure(benchmark, args.repeat)
+        print(f"{benchmark.name:<40} {result['seconds']:>9.3f} {result['steps_per_sec']:>10.3g} {result['neuron_steps_per_sec']:>15.3g} {result['peak_memory_mb']:>9.1f}")
+
+    if args.save:
+        suite.update(results)
+        baseline['machine'] = {'platform': platform.platform(), 'python': platform.python_version(), 'numpy': np.__version__}
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=4, sort_keys=True)
+        print(f'Saved the baseline into {args.baseline}')
+        return 0
+
+    found = regressions(results, suite, args.tolerance)
+    for regression in found:
+        print(f'REGRESSION {regression}')
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import json
+import os
+import numpy as np
+
+
+class Checkpoint:
+    """
+    Checkpoint of a simulation run by `pyneural.NeuralModel.simulate_neurons`. It holds the index of the next step to simulate, the metadata of the simulation, and sections of numpy arrays with the captured state (e.g. 'neurons', 'current', 'detector' and 'traces').
+
+    Checkpoints are stored as uncompressed `.npz` archives with an entry `<section>/<name>` for each array, so they are written and read without pickling.
+    """
+
+    _METADATA_KEY = '__metadata__'
+
+    def __init__(self, step: int, metadata: dict, sections: dict[str, dict[str, np.ndarray]]):
+        """
+        Initialize a new checkpoint.
+
+        :param step: index of the next step to simulate.
+        :param metadata: dictionary describing the simulation (must be serializable to JSON).
+        :param sections: dictionary mapping the name of each section to the dictionary of its arrays.
+        """
+        self.step = step
+        """The index of the next step to simulate."""
+        self.metadata = metadata
+        """Dictionary describing the simulation."""
+        self.sections = sections
+        """Dictionary mapping the name of each section to the dictionary of its arrays."""
+
+    def save(self, path: str):
+        """
+        Write the checkpoint into a file. The file is replaced atomically, so an interrupted write leaves the previous checkpoint intact.
+
+        :param path: path of the checkpoint file.
+        """
+        arrays = {f'{section}/{name}': value for section, values in self.sections.items() for name, value in values.items()}
+        arrays[Checkpoint._METADATA_KEY] = np.array(json.dumps({'step': self.step, **self.metadata}))
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'Checkpoint':
+        """
+        Read a checkpoint from a file.
+
+        :param path: path of the checkpoint file.
+        """
+        sections: dict[str, dict[str, np.ndarray]] = {}
+        with np.load(path) as archive:
+            metadata = json.loads(str(archive[Checkpoint._METADATA_KEY]))
+            for key in archive.files:
+                if key != Checkpoint._METADATA_KEY:
+                    section, name = key.split('/', 1)
+                    sections.setdefault(section, {})[name] = archive[key]
+        step = metadata.pop('step')
+        return cls(step, metadata, sections)
+
+    def check(self, metadata: dict):
+        """
+        Check that the checkpoint belongs to the described simulation. Raises ValueError otherwise.
+
+        :param metadata: dictionary describing the simulation.
+        """
+        for key, value in metadata.items():
+            if self.metadata.get(key) != value:
+                raise ValueError(f'Checkpoint does not match the simulation: {key} is {self.metadata.get(key)}, expected {value}')
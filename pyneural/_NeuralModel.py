@@ -1,8 +1,16 @@
+from typing import Callable, Iterable, Iterator, Optional, Union
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
-from scipy.signal import find_peaks
-from .neuron_models import NeuronGroup, ConstCondNeuronGroup, LIFNeuronGroup, HHNeuronGroup
+from numpy.typing import DTypeLike
+from .neuron_models import NeuronGroup, ConstCondNeuronGroup, LIFNeuronGroup, HHNeuronGroup, EquationModel
+from .neuron_models import _kernels
 from .input_current import InputCurrent, ConstInputCurrent, NoisyConstInputCurrent, CONST_ZERO_INPUT
-from .statistics import NeuronStatistics
+from .statistics import NeuronStatistics, TraceRecorder, SpikeDetector, SimulationChunk, RecordingPolicy, SpikeTrainAccumulator, Profiler
+from ._Checkpoint import Checkpoint
+from ._ResultCache import ResultCache
+from .synapses import Synapses
 
 
 class NeuralModel:
@@ -16,15 +24,93 @@ class NeuralModel:
         'hh': HHNeuronGroup
     }
 
-    def __init__(self, model: str):
+    _BUILTIN_MODELS: tuple[str, ...] = ('const', 'lif', 'hh')
+
+    _EQUATION_MODELS: dict[str, EquationModel] = {}
+
+    BACKENDS: tuple[str, ...] = ('numpy', 'numba')
+    """Names of the available simulation engines (see the constructor)."""
+
+    def __init__(self, model: str, cache: Optional[ResultCache] = None, backend: str = 'numpy'):
+        """
+        :param model: type of the neuron model ('const', 'lif', 'hh' or the name of a model added with `register_model`).
+        :param cache: `pyneural.ResultCache` to reuse the results of `get_fi_curve`, `simulate_neurons` and `burn_in` from (no caching by default). f-I curves with noise are cached only if `seed` is specified, while simulations are keyed by the state of the random generator of the input current.
+        :param backend: simulation engine. 'numpy' (default) steps the neurons with NumPy array operations. 'numba' requires the optional numba package and advances the steps which record nothing with compiled kernels, which fuse a block of steps and the spike detection into a single pass parallelized over the neurons (see `pyneural.neuron_models.NeuronGroup.advance_compiled`). Recorded steps, accumulators, synapses, rate tables and the rk4 scheme of the Hodgkin-Huxley model fall back to the NumPy engine. The results agree with the NumPy engine up to the rounding of the transcendental functions (float32 groups are computed in double precision inside the kernels).
+        """
         if model not in NeuralModel._MODEL_TYPE_TO_CLASS_MAP:
             raise ValueError(f'Bad model type: {model}')
+        if backend not in NeuralModel.BACKENDS:
+            raise ValueError(f'Bad backend: {backend}')
+        if backend == 'numba' and not _kernels.AVAILABLE:
+            raise ImportError('The numba backend requires the numba package')
+        self.model: str = model
         self.model_class: type[NeuronGroup] = NeuralModel._MODEL_TYPE_TO_CLASS_MAP[model]
+        self.cache: Optional[ResultCache] = cache
+        self.backend: str = backend
+        """Simulation engine ('numpy' or 'numba')."""
+        self._burn_in_states: dict[str, dict[str, np.ndarray]] = {}
+
+    _CURRENT_BLOCK_SIZE: int = 2**16
+    """Number of elements (steps times neurons) in a block of the input current generated at once."""
+
+    _BURN_IN_STATES: int = 8
+    """Number of the most recently used burn-in states kept in memory by `burn_in` (older states are only kept by the result cache)."""
+
+    _TILED_BLOCK_SIZE: int = 2**22
+    """Number of elements in a block of the input current of a simulation stepped in tiles, so each tile advances several steps at once."""
+
+    _INTEGRATOR_ORDER: dict[str, int] = {
+        'euler': 1,
+        'exponential': 1,
+        'rk4': 4
+    }
+
+    @staticmethod
+    def register_model(name: str, model: Union[type[NeuronGroup], EquationModel], replace: bool = False):
+        """
+        Add a neuron model, which can then be used by its name like the built-in models (e.g. `NeuralModel('hh_a')`). The registration is kept by the current process only: f-I curves computed in worker processes need the models registered when their module is imported (or processes started by fork).
+
+        :param name: name of the model.
+        :param model: `pyneural.neuron_models.NeuronGroup` subclass, or a `pyneural.neuron_models.EquationModel` (its equations are compiled when the first group is created).
+        :param replace: if True, a model registered under the same name before is replaced. The built-in models cannot be replaced.
+        """
+        if name in NeuralModel._BUILTIN_MODELS:
+            raise ValueError(f'Bad model name: {name} is a built-in model')
+        if name in NeuralModel._MODEL_TYPE_TO_CLASS_MAP and not replace:
+            raise ValueError(f'Bad model name: {name} is already registered')
+        NeuralModel._EQUATION_MODELS.pop(name, None)
+        if isinstance(model, EquationModel):
+            NeuralModel._EQUATION_MODELS[name] = model
+            model = model.group_class()
+        elif not (isinstance(model, type) and issubclass(model, NeuronGroup)):
+            raise ValueError(f'Bad model: {model!r}, expected a NeuronGroup subclass or an EquationModel')
+        NeuralModel._MODEL_TYPE_TO_CLASS_MAP[name] = model
+
+    def _model_key(self) -> Union[str, dict]:
+        # the model in the keys of the cache; equation models are described by their equations, so changed equations are not served stale results
+        equations = NeuralModel._EQUATION_MODELS.get(self.model)
+        return self.model if equations is None else {'name': self.model, 'equations': equations.describe()}
+
+    def create_model(self, N_neurons: int, params: dict = {}, integrator: Optional[str] = None, dtype: Optional[DTypeLike] = None, n_trials: Optional[int] = None) -> NeuronGroup:
+        """
+        Create a new group of neurons of this model.
 
-    def create_model(self, N_neurons: int, params: dict = {}) -> NeuronGroup:
-        return self.model_class(N_neurons, params)
+        :param N_neurons: number of neurons in a group.
+        :param params: parameters of the model (see the constructor of the model class).
+        :param integrator: integration scheme (see `pyneural.neuron_models.NeuronGroup.INTEGRATORS`). Overrides `params['integrator']` if specified.
+        :param dtype: floating point type of the state of the neurons (e.g. `numpy.float32`). Overrides `params['dtype']` if specified.
+        :param n_trials: number of independent Monte-Carlo trials of the group (see `pyneural.neuron_models.NeuronGroup`). Overrides `params['n_trials']` if specified.
+        """
+        if dtype is not None:
+            params = {**params, 'dtype': dtype}
+        if n_trials is not None:
+            params = {**params, 'n_trials': n_trials}
+        neurons = self.model_class(N_neurons, params)
+        if integrator is not None:
+            neurons.set_integrator(integrator)
+        return neurons
         
-    def simulate_neurons(self, neurons: NeuronGroup, N_steps: int, dt: float, I_input: InputCurrent = CONST_ZERO_INPUT) -> NeuronStatistics:
+    def simulate_neurons(self, neurons: NeuronGroup, N_steps: int, dt: float, I_input: InputCurrent = CONST_ZERO_INPUT, record: Union[Iterable[str], RecordingPolicy, None] = None, integrator: Optional[str] = None, output_dir: Optional[str] = None, checkpoint: Optional[str] = None, checkpoint_steps: int = 100000, resume: bool = False, accumulator: Optional[SpikeTrainAccumulator] = None, threads: int = 1, tile_size: int = 4096, initial_state: Optional[dict[str, np.ndarray]] = None, synapses: Iterable[Synapses] = (), profiler: Optional[Profiler] = None) -> NeuronStatistics:
         """
         Simulate `N_steps` steps given the external current stimulation for a group of neurons. Returns a `pyneural.statistics.NeuronStatistics` object.
 
@@ -32,41 +118,680 @@ class NeuralModel:
         :param N_steps: number of steps in a simulation.
         :param dt: time interval between two consecutive steps in ms.
         :param I_input: `pyneural.input_current.InputCurrent` object specifying the current stimulation.
+        :param record: names of the variables to record (e.g. `['Vm', 'gate_n']` or `['gates']`, see `pyneural.statistics.RecordingPolicy.GROUPS`), or a `pyneural.statistics.RecordingPolicy` object which also selects the recorded steps (e.g. every 100th step, or only a time window). By default, all variables available for the model (`neurons.RECORDABLE`) are recorded at every step.
+        :param integrator: integration scheme to set for the neurons before the simulation (see `pyneural.neuron_models.NeuronGroup.INTEGRATORS`). By default, the scheme of the neurons is kept.
+        :param output_dir: directory to write the recorded traces into as memory-mapped `.npy` files, together with the spike events and a `meta.json` file with the metadata of the simulation. The simulation can then be reopened with `pyneural.statistics.NeuronStatistics.load`. By default, the traces are kept in memory.
+        :param checkpoint: path of a `pyneural.Checkpoint` file, which is written every `checkpoint_steps` steps with the state of the neurons, the input current (including its random generator) and the spike detector. Traces kept in memory are stored in the checkpoint too, so long runs should record into `output_dir`.
+        :param checkpoint_steps: number of steps between two consecutive checkpoints.
+        :param resume: if True and the `checkpoint` file exists, the simulation continues from it instead of starting over. The result is identical to an uninterrupted simulation.
+        :param accumulator: `pyneural.statistics.SpikeTrainAccumulator` to update with the spikes (and membrane potentials) during the simulation. Its state is stored in the checkpoints, and simulations with an accumulator are not cached.
+        :param threads: number of threads stepping the neurons (1 by default). With more threads, the neurons are split into tiles of `tile_size` neurons (see `pyneural.neuron_models.NeuronGroup.split`), and each tile advances a block of steps at once on a thread pool while its state stays in the CPU cache (numpy releases the GIL in the array operations). The input current is still generated for the whole group, so the spikes and the recorded traces are identical to a simulation in a single thread. Useful for large groups (e.g. 10^5 Hodgkin-Huxley neurons); accumulators tracking the membrane potential are not supported.
+        :param tile_size: number of neurons in a tile stepped by a thread.
+        :param initial_state: state of the neurons to start from (a snapshot, e.g. from `burn_in`). By default, the neurons start from the resting state.
+        :param synapses: `pyneural.synapses.Synapses` objects coupling the neurons of the group into a recurrent network. Their currents are added to the stimulation (and to the recorded `I_ext`), the spikes are delivered through them as they are detected, and their state is stored in the checkpoints. Simulations with synapses are not cached and run in a single thread.
+        :param profiler: `pyneural.statistics.Profiler` to accumulate the time spent in each phase of the simulation and the counters of its work into. The profile of this simulation is also stored in `profile` of the returned object (unless it is taken from the cache). Without a profiler, the simulation does not read the clock.
         """
 
+        policy = NeuralModel._recording_policy(record)
+        variables = policy.select(neurons.RECORDABLE)
+        if integrator is not None:
+            neurons.set_integrator(integrator)
+        if threads > 1 and accumulator is not None and accumulator.track_Vm:
+            raise ValueError('Accumulators tracking the membrane potential are not supported with multiple threads')
+        if tile_size < 1:
+            raise ValueError(f'Bad tile size: {tile_size}')
+        synapses = NeuralModel._check_synapses(neurons, synapses)
+        if threads > 1 and synapses:
+            raise ValueError('Synapses are not supported with multiple threads')
+        key = None
+        if self.cache is not None and output_dir is None and checkpoint is None and accumulator is None and not synapses:
+            key = self._simulation_key(neurons, N_steps, dt, I_input, variables, policy, initial_state)
+        if key is not None:
+            cached = self.cache.get_stats(key)
+            if cached is not None:
+                # the neurons and the input current are left in the same state as after a simulation
+                stats, state = cached
+                neurons.restore(state['neurons'])
+                I_input.restore(state.get('current', {}))
+                return stats
+
+        stats = self._simulate_neurons(neurons, N_steps, dt, I_input, variables, policy, output_dir, checkpoint, checkpoint_steps, resume, accumulator, threads, tile_size, initial_state, synapses, profiler)
+        if key is not None:
+            self.cache.put_stats(key, stats, {'neurons': neurons.snapshot(), 'current': I_input.snapshot()})
+        return stats
+
+    def _simulate_neurons(self, neurons: NeuronGroup, N_steps: int, dt: float, I_input: InputCurrent, variables: tuple[str, ...], policy: RecordingPolicy = RecordingPolicy(), output_dir: Optional[str] = None, checkpoint: Optional[str] = None, checkpoint_steps: int = 100000, resume: bool = False, accumulator: Optional[SpikeTrainAccumulator] = None, threads: int = 1, tile_size: int = 4096, initial_state: Optional[dict[str, np.ndarray]] = None, synapses: tuple[Synapses, ...] = (), profiler: Optional[Profiler] = None) -> NeuronStatistics:
+        # the simulation of `simulate_neurons` without the result cache
+        if profiler is not None:
+            profile_start = profiler.snapshot()
+            clock = profiler.clock()
+        metadata = {
+            'model': self.model,
+            'N_steps': N_steps,
+            'dt': dt,
+            'N_neurons': neurons.N_neurons,
+            'dtype': neurons.dtype.str,
+            'integrator': neurons.integrator,
+            'variables': list(variables),
+            'recording': policy.describe(),
+            'checkpoint_steps': checkpoint_steps
+        }
+        if synapses:
+            metadata['N_synapses'] = [synapse.N_synapses for synapse in synapses]
+        saved = None
+        if checkpoint is not None and resume and os.path.exists(checkpoint):
+            saved = Checkpoint.load(checkpoint)
+            saved.check(metadata)
+
         neurons.reset()
-        stats = NeuronStatistics(N_steps, dt)
-        potentials = np.zeros((N_steps, neurons.N_neurons))
-        for i in range(N_steps):
-            t = i * dt
-            step = neurons.step(I_input.get_current(t), t, dt)
-            potentials[i] = step.Vm
-            stats.step_data.append(step)
-
-        for i in range(neurons.N_neurons):
-            spike_ind, _ = find_peaks(potentials[:,i], height=neurons._V_threshold, distance=1/(neurons._max_spike_frequency*dt))
-            stats.spikes.append(spike_ind)
-            stats.spike_intervals.append(np.diff(spike_ind)*dt)
-
-            mean_interspike_int = np.mean(stats.spike_intervals[-1])
-            stats.mean_interspike_int.append(mean_interspike_int)
-            stats.spiking_frequency.append(np.floating(0) if mean_interspike_int == 0 else 1/mean_interspike_int)
+        if initial_state is not None:
+            neurons.restore(initial_state)
+        for synapse in synapses:
+            synapse.prepare(dt, neurons.dtype)
+        steps = policy.steps(N_steps, dt)
+        if saved is not None and output_dir is not None:
+            recorder = TraceRecorder.open(output_dir, variables, mode='r+', steps=steps)
+        else:
+            recorder = TraceRecorder(steps.size, neurons.N_neurons, variables, neurons.dtype, output_dir, steps)
+        stats = NeuronStatistics(N_steps, dt, recorder)
+        stats.model = self.model
+        stats.n_trials = neurons.n_trials
+        detector = NeuralModel._spike_detector(neurons, dt)
+        start = 0
+        if saved is not None:
+            neurons.restore(saved.sections.get('neurons', {}))
+            I_input.restore(saved.sections.get('current', {}))
+            detector.restore(saved.sections['detector'])
+            if accumulator is not None:
+                if 'accumulator' not in saved.sections:
+                    raise ValueError('Checkpoint does not contain the state of the accumulator')
+                accumulator.restore(saved.sections['accumulator'])
+            NeuralModel._restore_synapses(synapses, saved.sections.get('synapses', {}))
+            for name, trace in saved.sections.get('traces', {}).items():
+                recorder.traces[name][:len(trace)] = trace
+            start = saved.step
 
+        chunk_steps = N_steps if checkpoint is None else max(1, checkpoint_steps)
+        if threads > 1:
+            I_block = NeuralModel._current_block(neurons, min(N_steps, chunk_steps), NeuralModel._TILED_BLOCK_SIZE)
+        else:
+            I_block = NeuralModel._current_block(neurons, min(N_steps, chunk_steps))
+        if profiler is not None:
+            profiler.add('setup', clock)
+            profiler.notify('start')
+        neurons.profiler = profiler
+        try:
+            for chunk_start in range(start, N_steps, chunk_steps):
+                n_chunk = min(chunk_steps, N_steps - chunk_start)
+                if threads > 1:
+                    NeuralModel._advance_tiles(neurons, chunk_start, n_chunk, dt, I_input, I_block, recorder, detector, accumulator, threads, tile_size, profiler)
+                else:
+                    NeuralModel._advance_steps(neurons, chunk_start, n_chunk, dt, I_input, I_block, recorder, detector, accumulator, synapses, self.backend == 'numba', profiler)
+                if checkpoint is not None and chunk_start + n_chunk < N_steps:
+                    if profiler is not None:
+                        clock = profiler.clock()
+                    NeuralModel._checkpoint(chunk_start + n_chunk, metadata, neurons, I_input, recorder, detector, accumulator, synapses).save(checkpoint)
+                    if profiler is not None:
+                        profiler.add('checkpoint', clock)
+        finally:
+            neurons.profiler = None
+        if accumulator is not None:
+            accumulator.finish(N_steps)
+
+        if profiler is not None:
+            clock = profiler.clock()
+        stats.set_spike_events(detector.event_steps, detector.event_neurons, neurons.N_neurons)
+        if output_dir is not None:
+            stats.save(output_dir, self.model)
+        if profiler is not None:
+            profiler.add('statistics', clock)
+            stats.profile = profiler.since(profile_start)
+            profiler.notify('finish')
         return stats
+
+    def _simulation_key(self, neurons: NeuronGroup, N_steps: int, dt: float, I_input: InputCurrent, variables: tuple[str, ...], policy: RecordingPolicy, initial_state: Optional[dict[str, np.ndarray]] = None) -> Optional[str]:
+        # the key of a simulation in the cache, None if the input current cannot be described
+        description = I_input.describe()
+        if description is None:
+            return None
+        return ResultCache.key(kind='simulation', model=self._model_key(), backend=self.backend, neurons=type(neurons).__name__, N_neurons=neurons.N_neurons, params=neurons.params,
+                               integrator=neurons.integrator, dtype=neurons.dtype.str, N_steps=N_steps, dt=dt, variables=variables, recording=policy.describe(),
+                               current={'type': type(I_input).__name__, **description, 'state': I_input.snapshot()}, initial_state=initial_state)
+
+    def burn_in(self, neurons: NeuronGroup, I_ext: Union[float, np.ndarray], N_steps: int, dt: float) -> dict[str, np.ndarray]:
+        """
+        Simulate the initial transient of the neurons under a constant stimulation, and return their state at its end (a snapshot, which can be passed as `initial_state` to `simulate_neurons`, so later simulations record only the part after the transient). The neurons are left in this state too.
+
+        The burn-in is run once for each combination of the model, its parameters, the integration scheme, the stimulation, `N_steps` and `dt`: the most recently used states are kept in memory and, if the model has a `pyneural.ResultCache`, all states are kept in the cache, so repeated simulations (e.g. the points of a sweep or repeated f-I curves) skip the transient. For a noisy stimulation, burn in with its mean.
+
+        :param neurons: neurons to burn in.
+        :param I_ext: constant stimulation: a scalar, a value for each neuron of a trial (repeated for each trial of a multi-trial group) or a value for each neuron of all trials.
+        :param N_steps: number of steps of the burn-in.
+        :param dt: time interval between two consecutive steps in ms.
+        """
+        I_ext = NeuralModel._trial_tiled(neurons, I_ext)
+        key = ResultCache.key(kind='burn_in', model=self._model_key(), backend=self.backend, neurons=type(neurons).__name__, N_neurons=neurons.N_neurons, params=neurons.params,
+                              integrator=neurons.integrator, dtype=neurons.dtype.str, I_ext=I_ext, N_steps=N_steps, dt=dt)
+        # the states in memory are ordered from the least to the most recently used
+        state = self._burn_in_states.pop(key, None)
+        if state is None and self.cache is not None:
+            cached = self.cache.get_state(key)
+            state = None if cached is None else cached['neurons']
+        if state is None:
+            current = ConstInputCurrent(neurons.N_neurons, I=I_ext, dtype=neurons.dtype)
+            self._simulate_neurons(neurons, N_steps, dt, current, ())
+            state = neurons.snapshot()
+            if self.cache is not None:
+                self.cache.put_state(key, {'neurons': state})
+        self._burn_in_states[key] = state
+        while len(self._burn_in_states) > NeuralModel._BURN_IN_STATES:
+            del self._burn_in_states[next(iter(self._burn_in_states))]
+        neurons.restore(state)
+        return {name: value.copy() for name, value in state.items()}
+
+    @staticmethod
+    def _trial_tiled(neurons: NeuronGroup, I_ext: Union[float, np.ndarray]) -> np.ndarray:
+        # the stimulation of each neuron of all trials, with values of the neurons of a trial repeated for each trial like the parameters of the group
+        I_ext = np.asarray(I_ext, dtype=float)
+        if neurons.n_trials > 1 and I_ext.shape == (neurons.N_trial_neurons,):
+            I_ext = np.tile(I_ext, neurons.n_trials)
+        if I_ext.ndim > 0 and I_ext.shape != (neurons.N_neurons,):
+            raise ValueError(f'Bad shape of the stimulation: {I_ext.shape}, expected a scalar, ({neurons.N_trial_neurons},) or ({neurons.N_neurons},)')
+        return np.array(np.broadcast_to(I_ext, (neurons.N_neurons,)))
+
+    @staticmethod
+    def _frequencies(stats: NeuronStatistics) -> np.ndarray:
+        # the spiking frequency of each neuron, with a leading trial axis for multi-trial groups
+        return np.array(stats.spiking_frequency) if stats.n_trials == 1 else stats.trial_frequency
+
+    def simulate_event_driven(self, neurons: NeuronGroup, N_steps: int, dt: float, I_input: InputCurrent = CONST_ZERO_INPUT, initial_state: Optional[dict[str, np.ndarray]] = None) -> NeuronStatistics:
+        """
+        Simulate the time interval of `N_steps` steps of length `dt` like `simulate_neurons`, but jump from one spike or change of the stimulation to the next using the closed-form solution of the model, so the work is proportional to the number of spikes rather than steps. Only available for models with `NeuronGroup.EVENT_DRIVEN` set (the 'const' and 'lif' models) and piecewise-constant stimulations (see `pyneural.input_current.InputCurrent.segments`).
+
+        Spike times are exact: they are stored in `spike_times` of the returned `pyneural.statistics.NeuronStatistics` object and used for the interspike intervals, while `spike_steps` contains the steps the spikes fall into. No traces are recorded.
+
+        :param neurons: neurons to simulate.
+        :param N_steps: number of steps of the simulated interval.
+        :param dt: time interval between two consecutive steps in ms.
+        :param I_input: `pyneural.input_current.InputCurrent` object specifying the current stimulation.
+        :param initial_state: state of the neurons to start from (see `simulate_neurons`).
+        """
+        if not neurons.EVENT_DRIVEN:
+            raise ValueError(f'{type(neurons).__name__} does not support event-driven simulations')
+        T = N_steps * dt
+        segments = I_input.segments(T)
+        if segments is None:
+            raise ValueError(f'{type(I_input).__name__} is not piecewise constant and cannot drive an event-driven simulation')
+
+        neurons.reset()
+        if initial_state is not None:
+            neurons.restore(initial_state)
+        spike_neurons, spike_times = [], []
+        for t_start, t_end, I_ext in segments:
+            segment_neurons, segment_times = neurons.advance_exact(I_ext, t_start, t_end - t_start)
+            spike_neurons.append(segment_neurons)
+            spike_times.append(segment_times)
+
+        stats = NeuronStatistics(N_steps, dt)
+        stats.model = self.model
+        stats.n_trials = neurons.n_trials
+        times = np.concatenate([np.array([], dtype=np.float64)] + spike_times)
+        stats.set_spike_events(np.floor(times / dt).astype(np.int64), np.concatenate([np.array([], dtype=np.int64)] + spike_neurons), neurons.N_neurons, times)
+        return stats
+
+    def iter_simulation(self, neurons: NeuronGroup, N_steps: int, dt: float, I_input: InputCurrent = CONST_ZERO_INPUT, chunk_steps: int = 10000, record: Union[Iterable[str], RecordingPolicy, None] = None, integrator: Optional[str] = None, callback: Optional[Callable[[SimulationChunk], bool]] = None, accumulator: Optional[SpikeTrainAccumulator] = None, initial_state: Optional[dict[str, np.ndarray]] = None, synapses: Iterable[Synapses] = (), profiler: Optional[Profiler] = None) -> Iterator[SimulationChunk]:
+        """
+        Simulate up to `N_steps` steps like `simulate_neurons`, but yield the recorded traces and the detected spikes in chunks of `chunk_steps` steps as the simulation progresses. Only a single chunk of traces is kept in memory by the simulation.
+
+        The simulation stops early if the callback returns True for a chunk (e.g. `lambda chunk: chunk.spike_counts.min() >= 10` stops once every neuron has fired 10 spikes); the chunk is still yielded. It can also be stopped by closing the generator.
+
+        Spikes are detected one step after their peak, so a spike at the last step of a chunk is reported in the next chunk, and the spikes of the last simulated step are not reported.
+
+        :param neurons: neurons to simulate.
+        :param N_steps: maximal number of steps in a simulation.
+        :param dt: time interval between two consecutive steps in ms.
+        :param I_input: `pyneural.input_current.InputCurrent` object specifying the current stimulation.
+        :param chunk_steps: number of steps in a chunk.
+        :param record: names of the variables to record or a `pyneural.statistics.RecordingPolicy` object (see `simulate_neurons`).
+        :param integrator: integration scheme to set for the neurons before the simulation (see `simulate_neurons`).
+        :param callback: function called with each `pyneural.statistics.SimulationChunk` before it is yielded. The simulation stops after the chunk if it returns True.
+        :param accumulator: `pyneural.statistics.SpikeTrainAccumulator` to update during the simulation. Together with recording nothing (`record=()`), it keeps the memory of long runs independent of their length.
+        :param initial_state: state of the neurons to start from (see `simulate_neurons`).
+        :param synapses: `pyneural.synapses.Synapses` objects coupling the neurons of the group (see `simulate_neurons`).
+        :param profiler: `pyneural.statistics.Profiler` to accumulate the time spent in each phase of the simulation into (see `simulate_neurons`). The 'finish' event is sent when the simulation ends, including an early stop.
+        """
+        if chunk_steps < 1:
+            raise ValueError(f'Bad number of steps in a chunk: {chunk_steps}')
+        synapses = NeuralModel._check_synapses(neurons, synapses)
+        policy = NeuralModel._recording_policy(record)
+        variables = policy.select(neurons.RECORDABLE)
+        if integrator is not None:
+            neurons.set_integrator(integrator)
+        neurons.reset()
+        if initial_state is not None:
+            neurons.restore(initial_state)
+        for synapse in synapses:
+            synapse.prepare(dt, neurons.dtype)
+        steps = policy.steps(N_steps, dt)
+        detector = NeuralModel._spike_detector(neurons, dt)
+        I_block = NeuralModel._current_block(neurons, min(N_steps, chunk_steps))
+        spike_counts = np.zeros(neurons.N_neurons, dtype=np.int64)
+
+        if profiler is not None:
+            profiler.notify('start')
+        try:
+            for start in range(0, N_steps, chunk_steps):
+                n_chunk = min(chunk_steps, N_steps - start)
+                chunk_rows = steps[np.searchsorted(steps, start):np.searchsorted(steps, start + n_chunk)]
+                recorder = TraceRecorder(chunk_rows.size, neurons.N_neurons, variables, neurons.dtype, steps=chunk_rows)
+                neurons.profiler = profiler
+                try:
+                    NeuralModel._advance_steps(neurons, start, n_chunk, dt, I_input, I_block, recorder, detector, accumulator, synapses, self.backend == 'numba', profiler)
+                finally:
+                    neurons.profiler = None
+                if accumulator is not None:
+                    accumulator.finish(start + n_chunk)
+
+                spike_steps, spike_neurons = detector.pop_events()
+                spike_counts += np.bincount(spike_neurons, minlength=neurons.N_neurons)
+                chunk = SimulationChunk(start, n_chunk, dt, recorder.traces, spike_steps, spike_neurons, spike_counts.copy(), chunk_rows)
+                stop = callback is not None and callback(chunk)
+                yield chunk
+                if stop:
+                    return
+        finally:
+            if profiler is not None:
+                profiler.notify('finish')
+
+    @staticmethod
+    def _checkpoint(step: int, metadata: dict, neurons: NeuronGroup, I_input: InputCurrent, recorder: TraceRecorder, detector: SpikeDetector, accumulator: Optional[SpikeTrainAccumulator] = None, synapses: tuple[Synapses, ...] = ()) -> Checkpoint:
+        # memory-mapped traces are flushed to their files, while traces kept in memory are stored in the checkpoint
+        recorder.flush()
+        rows = int(np.searchsorted(recorder.steps, step))
+        traces = {name: trace[:rows] for name, trace in recorder.traces.items()} if recorder.directory is None else {}
+        return Checkpoint(step, metadata, {
+            'neurons': neurons.snapshot(),
+            'current': I_input.snapshot(),
+            'detector': detector.snapshot(),
+            'traces': traces,
+            'accumulator': {} if accumulator is None else accumulator.snapshot(),
+            'synapses': {f'{i}.{name}': value for i, synapse in enumerate(synapses) for name, value in synapse.snapshot().items()}
+        })
+
+    @staticmethod
+    def _restore_synapses(synapses: tuple[Synapses, ...], section: dict[str, np.ndarray]):
+        for i, synapse in enumerate(synapses):
+            prefix = f'{i}.'
+            synapse.restore({name[len(prefix):]: value for name, value in section.items() if name.startswith(prefix)})
+
+    @staticmethod
+    def _check_synapses(neurons: NeuronGroup, synapses: Iterable[Synapses]) -> tuple[Synapses, ...]:
+        synapses = tuple(synapses)
+        for synapse in synapses:
+            if synapse.N_neurons != neurons.N_neurons:
+                raise ValueError(f'Bad synapses: they connect {synapse.N_neurons} neurons, but the group has {neurons.N_neurons}')
+        return synapses
+
+    @staticmethod
+    def _recording_policy(record: Union[Iterable[str], RecordingPolicy, None]) -> RecordingPolicy:
+        if isinstance(record, RecordingPolicy):
+            return record
+        return RecordingPolicy(record)
+
+    @staticmethod
+    def _spike_detector(neurons: NeuronGroup, dt: float) -> SpikeDetector:
+        return SpikeDetector(neurons.N_neurons, neurons._V_threshold, SpikeDetector.refractory_steps(neurons._max_spike_frequency, dt), neurons.dtype)
+
+    @staticmethod
+    def _current_block(neurons: NeuronGroup, N_steps: int, block_size: int = _CURRENT_BLOCK_SIZE) -> np.ndarray:
+        # the input current is generated in blocks of steps, which turns many small calls (e.g. to the random generator) into a few large ones
+        block_steps = max(1, min(N_steps, block_size // neurons.N_neurons))
+        return np.zeros((block_steps, neurons.N_neurons), dtype=neurons.dtype)
+
+    @staticmethod
+    def _advance_steps(neurons: NeuronGroup, start: int, N_steps: int, dt: float, I_input: InputCurrent, I_block: np.ndarray, recorder: TraceRecorder, detector: SpikeDetector, accumulator: Optional[SpikeTrainAccumulator] = None, synapses: tuple[Synapses, ...] = (), compiled: bool = False, profiler: Optional[Profiler] = None):
+        # simulates the steps [start, start + N_steps), generating the input current in blocks;
+        # with `compiled`, the blocks which record nothing are advanced by the compiled kernel of the model if it has one
+        compiled = compiled and accumulator is None and not synapses
+        block_steps = I_block.shape[0]
+        for block_start in range(0, N_steps, block_steps):
+            n_block = min(block_steps, N_steps - block_start)
+            t0 = (start + block_start) * dt
+            if profiler is not None:
+                N_events = detector.N_events
+                clock = profiler.clock()
+            I_input.get_current_block(t0, n_block, dt, out=I_block[:n_block])
+            if profiler is not None:
+                clock = profiler.add('input', clock)
+            if compiled and not NeuralModel._records(recorder, start + block_start, n_block) and neurons.advance_compiled(I_block[:n_block], dt, detector):
+                if profiler is not None:
+                    profiler.add('compiled', clock)
+                    profiler.count('compiled_steps', n_block)
+            else:
+                NeuralModel._advance_rows(neurons, start + block_start, dt, I_block[:n_block], recorder, detector, accumulator, synapses, profiler)
+            if profiler is not None:
+                NeuralModel._profile_block(profiler, start + block_start, n_block, recorder, detector, N_events)
+
+    @staticmethod
+    def _profile_block(profiler: Profiler, start: int, N_steps: int, recorder: TraceRecorder, detector: SpikeDetector, N_events: int):
+        # counts the work of the block of steps [start, start + N_steps), whose spikes were appended to the detector after `N_events`
+        rows = int(np.searchsorted(recorder.steps, start + N_steps) - np.searchsorted(recorder.steps, start))
+        profiler.count('steps', N_steps)
+        profiler.count('spikes', detector.N_events - N_events)
+        profiler.count('bytes_recorded', rows * recorder.N_neurons * sum(trace.dtype.itemsize for trace in recorder.traces.values()))
+        profiler.notify('block')
+
+    @staticmethod
+    def _records(recorder: TraceRecorder, start: int, N_steps: int) -> bool:
+        # whether any of the steps [start, start + N_steps) is recorded
+        return bool(recorder.traces) and np.searchsorted(recorder.steps, start) < np.searchsorted(recorder.steps, start + N_steps)
+
+    @staticmethod
+    def _advance_rows(neurons: NeuronGroup, start: int, dt: float, I_rows: np.ndarray, recorder: TraceRecorder, detector: SpikeDetector, accumulator: Optional[SpikeTrainAccumulator] = None, synapses: tuple[Synapses, ...] = (), profiler: Optional[Profiler] = None):
+        # simulates a step for each row of the input current starting at `start`, and records the steps listed in `recorder.steps` into their rows,
+        # the other steps are simulated without a recorder so the neurons skip the recording work
+        row = int(np.searchsorted(recorder.steps, start))
+        recorded = recorder.steps[row:np.searchsorted(recorder.steps, start + I_rows.shape[0])].tolist()
+        first_row = row
+        next_recorded = recorded[0] if recorded else -1
+        clock = 0.0
+        for k in range(I_rows.shape[0]):
+            step = start + k
+            t = step * dt
+            if profiler is not None:
+                clock = profiler.clock()
+            if synapses:
+                for synapse in synapses:
+                    # the synaptic current is added to the row of the stimulation, which is not used after this step
+                    synapse.add_current(step, neurons.V, I_rows[k])
+                if profiler is not None:
+                    clock = profiler.add('synapses', clock)
+            if step == next_recorded:
+                recorder.step = row
+                row += 1
+                next_recorded = recorded[row - first_row] if row - first_row < len(recorded) else -1
+                Vm = neurons.advance(I_rows[k], t, dt, recorder)
+                if profiler is not None:
+                    clock = profiler.add('recording', clock)
+            else:
+                Vm = neurons.advance(I_rows[k], t, dt)
+                if profiler is not None:
+                    clock = profiler.add('neurons', clock)
+            fired = detector.update(Vm)
+            if profiler is not None:
+                clock = profiler.add('detection', clock)
+            if fired.size and synapses:
+                for synapse in synapses:
+                    synapse.deliver(fired, step)
+                if profiler is not None:
+                    clock = profiler.add('synapses', clock)
+            if accumulator is not None:
+                # the detector reports the spikes at the previous step
+                if fired.size:
+                    accumulator.add_spikes(step - 1, fired)
+                accumulator.add_potentials(Vm)
+                if profiler is not None:
+                    profiler.add('accumulator', clock)
+
+    @staticmethod
+    def _advance_tiles(neurons: NeuronGroup, start: int, N_steps: int, dt: float, I_input: InputCurrent, I_block: np.ndarray, recorder: TraceRecorder, detector: SpikeDetector, accumulator: Optional[SpikeTrainAccumulator], threads: int, tile_size: int, profiler: Optional[Profiler] = None):
+        # the same as `_advance_steps`, but the neurons are split into tiles, which advance each block of steps in a thread pool;
+        # the input current is generated for the whole group in this thread, so the random numbers are drawn in the same order
+        bounds = [(tile_start, min(tile_start + tile_size, neurons.N_neurons)) for tile_start in range(0, neurons.N_neurons, tile_size)]
+        tiles = [(neurons.split(*bound), detector.split(*bound), recorder.split(*bound)) for bound in bounds]
+        block_steps = I_block.shape[0]
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for block_start in range(0, N_steps, block_steps):
+                n_block = min(block_steps, N_steps - block_start)
+                t0 = (start + block_start) * dt
+                if profiler is not None:
+                    N_events = detector.N_events
+                    clock = profiler.clock()
+                I_input.get_current_block(t0, n_block, dt, out=I_block[:n_block])
+                if profiler is not None:
+                    clock = profiler.add('input', clock)
+                futures = [executor.submit(NeuralModel._advance_rows, tile, start + block_start, dt, I_block[:n_block, tile_start:tile_stop], tile_recorder, tile_detector)
+                           for (tile, tile_detector, tile_recorder), (tile_start, tile_stop) in zip(tiles, bounds)]
+                for future in futures:
+                    future.result()
+                if profiler is not None:
+                    clock = profiler.add('threads', clock)
+
+                block_events = detector.N_events
+                detector.join([tile_detector for _, tile_detector, _ in tiles])
+                for _, tile_detector, _ in tiles:
+                    tile_detector.pop_events()
+                if profiler is not None:
+                    clock = profiler.add('detection', clock)
+                if accumulator is not None and detector.N_events > block_events:
+                    spike_steps, first = np.unique(detector.event_steps[block_events:], return_index=True)
+                    for step, fired in zip(spike_steps.tolist(), np.split(detector.event_neurons[block_events:], first[1:])):
+                        accumulator.add_spikes(step, fired)
+                    if profiler is not None:
+                        profiler.add('accumulator', clock)
+                if profiler is not None:
+                    NeuralModel._profile_block(profiler, start + block_start, n_block, recorder, detector, N_events)
+        neurons.join([tile for tile, _, _ in tiles])
         
-    def get_fi_curve(self, I_ext: np.ndarray, std: float = 0, params: dict = {}, N_iter = 100000, dt: float = 1) -> np.ndarray:
+    def estimate_integration_error(self, neurons: NeuronGroup, N_steps: int, dt: float, I_input: InputCurrent = CONST_ZERO_INPUT, integrator: Optional[str] = None) -> dict[str, float]:
         """
-        This function computes the f-I (spiking frequency vs. current stimulation) curve for a given neuron.
+        Estimate the global error of the membrane potential of a simulation with the step `dt` by step doubling: the simulation is repeated with the step `dt/2` and the difference is scaled by the order `p` of the integration scheme (Richardson extrapolation, the error of the step `dt` is `(V_dt/2 - V_dt) * 2**p / (2**p - 1)`). Returns a dictionary with the maximal ('max_abs') and the root mean square ('rms') error in mV of the simulation with the step `dt`, and the order of the scheme ('order').
+
+        Both simulations should be driven by the same input, so the estimate is meaningful only for deterministic input currents.
+
+        :param neurons: neurons to simulate.
+        :param N_steps: number of steps in a simulation with the step `dt`.
+        :param dt: time interval between two consecutive steps in ms.
+        :param I_input: `pyneural.input_current.InputCurrent` object specifying the current stimulation.
+        :param integrator: integration scheme (see `pyneural.neuron_models.NeuronGroup.INTEGRATORS`). By default, the scheme of the neurons is used.
+        """
+        if integrator is not None:
+            neurons.set_integrator(integrator)
+        coarse = self.simulate_neurons(neurons, N_steps, dt, I_input, record=['Vm']).traces['Vm']
+        fine = self.simulate_neurons(neurons, 2*N_steps, dt/2, I_input, record=['Vm']).traces['Vm']
+
+        order = NeuralModel._INTEGRATOR_ORDER[neurons.integrator]
+        error = (fine[1::2] - coarse) * 2**order / (2**order - 1)
+        return {
+            'max_abs': float(np.max(np.abs(error))),
+            'rms': float(np.sqrt(np.mean(error**2))),
+            'order': order
+        }
+
+    def sweep(self, param_grid: dict[str, Iterable[float]], N_steps: int, dt: float, params: dict = {}, std: float = 0, record: Optional[Iterable[str]] = (), integrator: Optional[str] = None, dtype: Optional[DTypeLike] = None, burn_in_steps: int = 0, profiler: Optional[Profiler] = None) -> tuple[np.ndarray, NeuronStatistics]:
+        """
+        Simulate every combination of the parameter values in a grid as a single group of neurons with per-neuron parameters. Returns the spiking frequencies with one axis per key of the grid (in the order of the keys), and the `pyneural.statistics.NeuronStatistics` object of the simulation, where the neuron `i` corresponds to the grid point `numpy.unravel_index(i, frequencies.shape)`. With `params['n_trials'] > 1`, the frequencies have a leading trial axis, and the neuron `i` corresponds to the trial `i // N` and the grid point `numpy.unravel_index(i % N, frequencies.shape[1:])` (`N` is the number of grid points).
+
+        :param param_grid: dictionary mapping names of parameters of the model (e.g. 'gNa') to their values. The key 'I_ext' sweeps the constant current stimulation.
+        :param N_steps: number of steps in a simulation.
+        :param dt: time interval between two consecutive steps in ms.
+        :param params: parameters of the model shared by all neurons.
+        :param std: standard deviation of the gaussian noise added to the stimulation.
+        :param record: names of the variables to record (nothing by default, see `simulate_neurons`).
+        :param integrator: integration scheme (see `create_model`).
+        :param dtype: floating point type of the simulation (see `create_model`).
+        :param burn_in_steps: number of steps of the initial transient, which is simulated without noise and without recording before the simulation (see `burn_in`).
+        :param profiler: `pyneural.statistics.Profiler` timing the phases of the simulation (see `simulate_neurons`).
+        """
+        names = list(param_grid)
+        axes = [np.asarray(param_grid[name], dtype=float).ravel() for name in names]
+        shape = tuple(axis.size for axis in axes)
+        values = {name: grid.ravel() for name, grid in zip(names, np.meshgrid(*axes, indexing='ij'))}
+        N_neurons = int(np.prod(shape))
+
+        I_ext = values.pop('I_ext', np.zeros(N_neurons))
+        neurons = self.create_model(N_neurons, {**params, **values}, integrator, dtype)
+        current = NoisyConstInputCurrent(N_neurons=N_neurons, I=I_ext, std=std, dtype=neurons.dtype, n_trials=neurons.n_trials)
+        initial_state = self.burn_in(neurons, I_ext, burn_in_steps, dt) if burn_in_steps > 0 else None
+        stats = self.simulate_neurons(neurons, N_steps, dt, current, record=record, initial_state=initial_state, profiler=profiler)
+        frequencies = NeuralModel._frequencies(stats)
+        return frequencies.reshape(frequencies.shape[:-1] + shape), stats
+
+    def get_fi_curve(self, I_ext: np.ndarray, std: float = 0, params: dict = {}, N_iter = 100000, dt: float = 1, workers: int = 1, seed: Optional[int] = None, shard_size: int = 128, dtype: Optional[DTypeLike] = None, event_driven: bool = False, burn_in_steps: int = 0) -> np.ndarray:
+        """
+        This function computes the f-I (spiking frequency vs. current stimulation) curve for a given neuron. With `params['n_trials'] > 1`, each current is simulated in every trial and the returned frequencies have the shape `(n_trials, len(I_ext))`.
+
+        By default, all currents are simulated as a single group of neurons and the noise is drawn from the global numpy random state. If `seed` is specified or `workers > 1`, the currents are split into shards of `shard_size` currents, and each shard is simulated with its own `numpy.random.Generator` stream derived from the seed. The shards can then be simulated in parallel processes, and the result does not depend on the number of workers.
 
         :param neuron: a neuron object for which the curve is computed.
         :param I_ext: a list of different current stimulations for which the spiking frequency should be computed.
         :param N_iter: a number of iterations per current in a simulation.
         :param dt: an interval between two consequtive iterations in a simulation.
+        :param workers: number of processes simulating the shards (1 by default, the shards are then simulated in this process).
+        :param seed: seed of the random streams of the shards. If not specified while `workers > 1`, it is drawn from the global numpy random state.
+        :param shard_size: number of currents in a shard.
+        :param dtype: floating point type of the simulation (e.g. `numpy.float32`). Overrides `params['dtype']` if specified.
+        :param event_driven: if True, the neurons are simulated with `simulate_event_driven`, so the spike times and frequencies are exact and the cost is proportional to the number of spikes. Requires `std = 0` and a model supporting event-driven simulations.
+        :param burn_in_steps: number of steps of the initial transient, which is simulated without noise before the `N_iter` steps the frequencies are measured in (see `burn_in`). The states after the transient are cached, so repeated curves skip it.
         """
+        if dtype is not None:
+            params = {**params, 'dtype': dtype}
+        key = None
+        if self.cache is not None and (std == 0 or seed is not None):
+            # without noise the result does not depend on the seed and the shards
+            key = ResultCache.key(kind='fi_curve', model=self._model_key(), backend=self.backend, params=params, I_ext=np.asarray(I_ext, dtype=float), std=std, N_iter=N_iter, dt=dt,
+                                  seed=seed if std != 0 else None, shard_size=shard_size if std != 0 else None, event_driven=event_driven,
+                                  burn_in_steps=burn_in_steps)
+            cached = self.cache.get_array(key)
+            if cached is not None:
+                return cached
+        frequencies = self._fi_curve(I_ext, std, params, N_iter, dt, workers, seed, shard_size, event_driven, burn_in_steps)
+        if key is not None:
+            self.cache.put_array(key, frequencies)
+        return frequencies
+
+    def find_rheobase(self, I_min: float = 0, I_max: float = 100, params: dict = {}, N_iter: int = 20000, dt: float = 0.02, tolerance: float = 0.01, N_probes: int = 64, dtype: Optional[DTypeLike] = None, event_driven: bool = False) -> float:
+        """
+        Find the rheobase: the smallest constant current which makes a neuron fire repetitively (at least two spikes in a simulation of `N_iter` steps, so the spiking frequency is defined). The current is found by a batched bisection: each round simulates `N_probes` currents spread evenly over the current bracket as a single group (see `get_fi_curve`) and shrinks the bracket to the interval below the first firing probe, so a few rounds reach a tolerance which a dense sweep would need thousands of currents for. Returns the upper end of the final bracket, which is a firing current within `tolerance` of the rheobase.
+
+        :param I_min: lower end of the searched currents.
+        :param I_max: upper end of the searched currents, which must make the neuron fire.
+        :param params: parameters of the model (see the constructor of the model class).
+        :param N_iter: number of steps of each simulation.
+        :param dt: time interval between two consecutive steps in ms.
+        :param tolerance: width of the final bracket.
+        :param N_probes: number of currents simulated in each round.
+        :param dtype: floating point type of the simulation (e.g. `numpy.float32`).
+        :param event_driven: if True, the probes are simulated with `simulate_event_driven` (see `get_fi_curve`).
+        """
+        if I_max <= I_min or tolerance <= 0 or N_probes < 2:
+            raise ValueError(f'Bad rheobase search: I_min={I_min}, I_max={I_max}, tolerance={tolerance}, N_probes={N_probes}')
+        if params.get('n_trials', 1) > 1:
+            raise ValueError(f'The rheobase search simulates the currents without noise, so it does not support n_trials={params["n_trials"]}')
+        # the first round includes the ends of the bracket, the next ones only the currents inside it
+        probes = np.linspace(I_min, I_max, N_probes)
+        low, high = None, None
+        while True:
+            firing = np.flatnonzero(self.get_fi_curve(probes, params=params, N_iter=N_iter, dt=dt, dtype=dtype, event_driven=event_driven) > 0)
+            if firing.size:
+                high = float(probes[firing[0]])
+                if firing[0] > 0:
+                    low = float(probes[firing[0] - 1])
+            elif high is None:
+                raise ValueError(f'The neuron does not fire with I_max={I_max}')
+            else:
+                low = float(probes[-1])
+            if low is None:
+                return high
+            if high - low <= tolerance:
+                return high
+            probes = np.linspace(low, high, N_probes + 2)[1:-1]
+
+    def get_adaptive_fi_curve(self, I_min: float, I_max: float, params: dict = {}, N_iter: int = 20000, dt: float = 0.02, N_initial: int = 33, max_points: int = 200, tolerance: float = 0.02, N_split: int = 4, min_dI: Optional[float] = None, dtype: Optional[DTypeLike] = None, event_driven: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the f-I curve (without noise) on an adaptive grid of currents. The curve is first computed on `N_initial` evenly spaced currents. Then, in each round, the intervals where the frequency changes by more than `tolerance` times the maximal frequency, or where the neuron starts or stops firing, are split into `N_split` parts. All new currents of a round are simulated as a single group (see `get_fi_curve`), so the points are placed only where the curve changes, e.g. around the rheobase. Returns numpy arrays with the sorted currents and their spiking frequencies.
+
+        :param I_min: lower end of the currents.
+        :param I_max: upper end of the currents.
+        :param params: parameters of the model (see the constructor of the model class).
+        :param N_iter: number of steps of each simulation.
+        :param dt: time interval between two consecutive steps in ms.
+        :param N_initial: number of evenly spaced currents of the first round.
+        :param max_points: maximal number of currents in the curve. If the refinement would exceed it, the intervals with the largest changes of the frequency are split first.
+        :param tolerance: maximal change of the frequency between two neighbouring currents, relative to the maximal frequency.
+        :param N_split: number of parts each refined interval is split into.
+        :param min_dI: intervals narrower than this are not split (1/1000 of the range of currents by default).
+        :param dtype: floating point type of the simulation (e.g. `numpy.float32`).
+        :param event_driven: if True, the currents are simulated with `simulate_event_driven` (see `get_fi_curve`).
+        """
+        if I_max <= I_min or N_initial < 2 or N_split < 2:
+            raise ValueError(f'Bad adaptive f-I curve: I_min={I_min}, I_max={I_max}, N_initial={N_initial}, N_split={N_split}')
+        if params.get('n_trials', 1) > 1:
+            raise ValueError(f'The adaptive f-I curve is computed without noise, so it does not support n_trials={params["n_trials"]}')
+        if min_dI is None:
+            min_dI = (I_max - I_min) / 1000
+        I = np.linspace(I_min, I_max, N_initial)
+        f = self.get_fi_curve(I, params=params, N_iter=N_iter, dt=dt, dtype=dtype, event_driven=event_driven)
+        fractions = np.arange(1, N_split) / N_split
+        while I.size + N_split - 1 <= max_points:
+            # silent neurons have nan frequencies, which count as 0 here
+            rates = np.nan_to_num(f)
+            change = np.abs(np.diff(rates))
+            split = ((change > tolerance * max(rates.max(), np.finfo(float).tiny)) | (np.diff(rates > 0) != 0)) & (np.diff(I) > min_dI)
+            intervals = np.flatnonzero(split)
+            if intervals.size == 0:
+                break
+            intervals = intervals[np.argsort(-change[intervals], kind='stable')][:(max_points - I.size) // (N_split - 1)]
+            new_I = (I[intervals, None] + np.diff(I)[intervals, None] * fractions).ravel()
+            new_f = self.get_fi_curve(new_I, params=params, N_iter=N_iter, dt=dt, dtype=dtype, event_driven=event_driven)
+            order = np.argsort(np.concatenate([I, new_I]), kind='stable')
+            I = np.concatenate([I, new_I])[order]
+            f = np.concatenate([f, new_f])[order]
+        return I, f
+
+    def _fi_curve(self, I_ext: np.ndarray, std: float, params: dict, N_iter: int, dt: float, workers: int, seed: Optional[int], shard_size: int, event_driven: bool, burn_in_steps: int = 0) -> np.ndarray:
+        if event_driven:
+            neurons = self.model_class(N_neurons=I_ext.size, params=params)
+            current = NoisyConstInputCurrent(N_neurons=I_ext.size, I=I_ext, std=std, dtype=neurons.dtype, n_trials=neurons.n_trials)
+            initial_state = self.burn_in(neurons, I_ext, burn_in_steps, dt) if burn_in_steps > 0 else None
+            return NeuralModel._frequencies(self.simulate_event_driven(neurons, N_iter, dt, current, initial_state))
         
-        neurons = self.model_class(N_neurons=I_ext.size, params=params)
-        current = NoisyConstInputCurrent(N_neurons=I_ext.size, I=I_ext, std=std)
-        stats = self.simulate_neurons(neurons, N_iter, dt, current)
+        if seed is None and workers <= 1:
+            neurons = self.model_class(N_neurons=I_ext.size, params=params)
+            current = NoisyConstInputCurrent(N_neurons=I_ext.size, I=I_ext, std=std, dtype=neurons.dtype, n_trials=neurons.n_trials)
+            initial_state = self.burn_in(neurons, I_ext, burn_in_steps, dt) if burn_in_steps > 0 else None
+            stats = self._simulate_neurons(neurons, N_iter, dt, current, (), initial_state=initial_state)
+
+            return NeuralModel._frequencies(stats)
+
+        if seed is None:
+            seed = int(np.random.randint(np.iinfo(np.int64).max))
+        I_ext = np.asarray(I_ext, dtype=float)
+        shards = [(start, min(start + shard_size, I_ext.size)) for start in range(0, I_ext.size, shard_size)]
+        streams = np.random.SeedSequence(seed).spawn(len(shards))
+
+        # the frequencies of each trial are gathered in a shared memory block which each shard writes its columns into
+        n_trials = int(params.get('n_trials', 1))
+        memory = shared_memory.SharedMemory(create=True, size=max(n_trials * I_ext.nbytes, 1))
+        try:
+            tasks = [(self.model, params, I_ext[start:end], std, N_iter, dt, stream, memory.name, I_ext.size, start, burn_in_steps, self.cache, self.backend)
+                     for (start, end), stream in zip(shards, streams)]
+            if workers <= 1:
+                for task in tasks:
+                    _simulate_fi_shard(*task)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for future in [executor.submit(_simulate_fi_shard, *task) for task in tasks]:
+                        future.result()
+            frequencies = np.ndarray((n_trials, I_ext.size), dtype=float, buffer=memory.buf).copy()
+            return frequencies[0] if n_trials == 1 else frequencies
+        finally:
+            memory.close()
+            memory.unlink()
+
 
-        return np.array(stats.spiking_frequency)
+def _simulate_fi_shard(model: str, params: dict, I_ext: np.ndarray, std: float, N_iter: int, dt: float, stream: np.random.SeedSequence, memory_name: str, N_total: int, offset: int, burn_in_steps: int = 0, cache: Optional[ResultCache] = None, backend: str = 'numpy'):
+    # simulates a shard of the currents of `NeuralModel.get_fi_curve` and writes the frequencies into the shared memory block
+    neural_model = NeuralModel(model, cache, backend)
+    neurons = neural_model.model_class(N_neurons=I_ext.size, params=params)
+    current = NoisyConstInputCurrent(N_neurons=I_ext.size, I=I_ext, std=std, rng=np.random.Generator(np.random.PCG64(stream)), dtype=neurons.dtype, n_trials=neurons.n_trials)
+    initial_state = neural_model.burn_in(neurons, I_ext, burn_in_steps, dt) if burn_in_steps > 0 else None
+    stats = neural_model._simulate_neurons(neurons, N_iter, dt, current, (), initial_state=initial_state)
 
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        frequencies = np.ndarray((neurons.n_trials, N_total), dtype=float, buffer=memory.buf)
+        frequencies[:, offset:offset + I_ext.size] = stats.trial_frequency
+        del frequencies
+    finally:
+        memory.close()
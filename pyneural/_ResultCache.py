@@ -0,0 +1,199 @@
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from .statistics import NeuronStatistics
+from ._Checkpoint import Checkpoint
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of simulation results. Each entry is a directory named by the SHA-256 hash of everything the result depends on (see `key`), holding either a numpy array (e.g. an f-I curve) or a saved `pyneural.statistics.NeuronStatistics` object.
+
+    The total size of the entries is capped: when a new entry exceeds the cap, the least recently used entries are evicted.
+
+    Pass a cache to `pyneural.NeuralModel` to enable it for `get_fi_curve`, `simulate_neurons` and `burn_in`.
+    """
+
+    VERSION: int = 1
+    """Version of the cached results, included in every key. Increment it when a change of the simulation code invalidates the old results."""
+
+    _STATE_FILE = 'state.npz'
+    _ARRAY_FILE = 'result.npy'
+
+    def __init__(self, directory: str, max_bytes: int = 2**30):
+        """
+        Open a cache in a directory, creating it if necessary.
+
+        :param directory: directory holding the cache entries.
+        :param max_bytes: maximal total size of the entries in bytes (1 GiB by default).
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.hits: int = 0
+        """The number of lookups that found an entry."""
+        self.misses: int = 0
+        """The number of lookups that found no entry."""
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(**parts: Any) -> str:
+        """
+        Compute a stable key of a result from everything it depends on. Numpy arrays are hashed by their type, shape and contents, and dictionaries do not depend on the order of their keys.
+
+        :param parts: named parts of the key (e.g. model, params, dt).
+        """
+        encoded = json.dumps(_canonical({'version': ResultCache.VERSION, **parts}), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        # counts the lookup and marks the entry as recently used
+        path = self._entry(key)
+        if not os.path.isdir(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(path)
+        return path
+
+    def _store(self, key: str, write):
+        # the entry is written into a temporary directory first, so readers never see a partial entry
+        temp_path = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        try:
+            write(temp_path)
+            os.replace(temp_path, self._entry(key))
+        except OSError:
+            if os.path.isdir(self._entry(key)):
+                # the same result was stored concurrently
+                shutil.rmtree(temp_path, ignore_errors=True)
+            else:
+                raise
+        except BaseException:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            raise
+        self.evict()
+
+    def get_array(self, key: str) -> Optional[np.ndarray]:
+        """
+        Get a cached numpy array. Returns None if there is no entry with the key.
+
+        :param key: key of the entry (see `key`).
+        """
+        path = self._lookup(key)
+        if path is None:
+            return None
+        return np.load(os.path.join(path, ResultCache._ARRAY_FILE))
+
+    def put_array(self, key: str, array: np.ndarray):
+        """
+        Store a numpy array.
+
+        :param key: key of the entry (see `key`).
+        :param array: numpy array to store.
+        """
+        self._store(key, lambda path: np.save(os.path.join(path, ResultCache._ARRAY_FILE), array))
+
+    def get_stats(self, key: str) -> Optional[tuple[NeuronStatistics, dict[str, dict[str, np.ndarray]]]]:
+        """
+        Get a cached simulation. Returns the `pyneural.statistics.NeuronStatistics` object (with memory-mapped traces) and the stored state sections, or None if there is no entry with the key.
+
+        :param key: key of the entry (see `key`).
+        """
+        path = self._lookup(key)
+        if path is None:
+            return None
+        return NeuronStatistics.load(path), Checkpoint.load(os.path.join(path, ResultCache._STATE_FILE)).sections
+
+    def put_stats(self, key: str, stats: NeuronStatistics, state: dict[str, dict[str, np.ndarray]] = {}):
+        """
+        Store a simulation.
+
+        :param key: key of the entry (see `key`).
+        :param stats: `pyneural.statistics.NeuronStatistics` object of the simulation.
+        :param state: sections of numpy arrays with the state at the end of the simulation (e.g. snapshots of the neurons and the input current).
+        """
+        def write(path: str):
+            stats.save(path, stats.model)
+            Checkpoint(stats.N_steps, {}, state).save(os.path.join(path, ResultCache._STATE_FILE))
+        self._store(key, write)
+
+    def get_state(self, key: str) -> Optional[dict[str, dict[str, np.ndarray]]]:
+        """
+        Get cached state sections (e.g. the state of neurons after a burn-in, see `pyneural.NeuralModel.burn_in`). Returns None if there is no entry with the key.
+
+        :param key: key of the entry (see `key`).
+        """
+        path = self._lookup(key)
+        if path is None:
+            return None
+        return Checkpoint.load(os.path.join(path, ResultCache._STATE_FILE)).sections
+
+    def put_state(self, key: str, state: dict[str, dict[str, np.ndarray]]):
+        """
+        Store state sections.
+
+        :param key: key of the entry (see `key`).
+        :param state: sections of numpy arrays (e.g. `{'neurons': neurons.snapshot()}`).
+        """
+        self._store(key, lambda path: Checkpoint(0, {}, state).save(os.path.join(path, ResultCache._STATE_FILE)))
+
+    def size(self) -> int:
+        """
+        Compute the total size of the entries in bytes.
+        """
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self) -> list[tuple[float, str, int]]:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(root, file)) for root, _, files in os.walk(path) for file in files)
+            entries.append((os.path.getmtime(path), path, size))
+        return entries
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the total size is within `max_bytes`.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """
+        Remove all entries and reset the counters.
+        """
+        for _, path, _ in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
+        self.hits = 0
+        self.misses = 0
+
+
+def _canonical(value: Any) -> Any:
+    # converts a value into a JSON-serializable form that does not depend on the identity of the objects
+    if isinstance(value, dict):
+        return {str(name): _canonical(item) for name, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        array = np.ascontiguousarray(value)
+        return {'sha256': hashlib.sha256(array.tobytes()).hexdigest(), 'dtype': array.dtype.str, 'shape': list(array.shape)}
+    if isinstance(value, float):
+        return repr(value)
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, type) and issubclass(value, np.generic):
+        return np.dtype(value).str
+    return repr(value)
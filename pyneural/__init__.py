@@ -1,15 +1,21 @@
 from ._NeuralModel import NeuralModel
+from ._Checkpoint import Checkpoint
+from ._ResultCache import ResultCache
 from . import (
         ion_channels,
         neuron_models,
         statistics,
-        input_current
+        input_current,
+        synapses
 )
 
 __all__ = [
     'NeuralModel',
+    'Checkpoint',
+    'ResultCache',
     'ion_channels',
     'neuron_models',
     'statistics',
-    'input_current'
+    'input_current',
+    'synapses'
 ]
@@ -1,5 +1,6 @@
 from typing import Optional
 import numpy as np
+from numpy.typing import DTypeLike
 from ._InputCurrent import InputCurrent
 
 class ConstInputCurrent(InputCurrent):
@@ -11,23 +12,61 @@ class ConstInputCurrent(InputCurrent):
     _end_time: float
     _I: np.ndarray
 
-    def __init__(self, N_neurons: int = 1, start_time: float = 0.0, end_time: float = np.inf, I: Optional[np.ndarray] = None):
+    def __init__(self, N_neurons: int = 1, start_time: float = 0.0, end_time: float = np.inf, I: Optional[np.ndarray] = None, dtype: DTypeLike = np.float64, n_trials: int = 1):
         """
-        :param N_neurons: number of neurons in a simulation.
+        :param N_neurons: number of neurons in a simulation (in each trial).
         :param start_time: start time of the external stimulation in ms.
         :param end_time: end time of the external stimulation in ms.
         :param I: numpy array containing values of external stimulation for each neuron. 
+        :param dtype: floating point type of the returned stimulation values (float64 by default).
+        :param n_trials: number of Monte-Carlo trials of the simulated group (see `pyneural.neuron_models.NeuronGroup`). The stimulation of the neurons is repeated for each trial.
         """
-        super().__init__(N_neurons)
+        super().__init__(N_neurons * n_trials, dtype)
+        self.n_trials = n_trials
         self._start_time = start_time
         self._end_time = end_time
         if I is None:
-            self._I = np.zeros(N_neurons)
+            self._I = np.zeros(self.N_neurons, dtype=self.dtype)
         else:
-            self._I = I
+            self._I = np.asarray(I, dtype=self.dtype)
+            if n_trials > 1:
+                self._I = np.tile(np.broadcast_to(self._I, (N_neurons,)), n_trials)
 
-    def get_current(self, t: float) -> np.ndarray:
-        if(t >= self._start_time and t <= self._end_time):
-            return self._I.copy()
-        return np.zeros(self.N_neurons)
+    def _is_active(self, t: float) -> bool:
+        return t >= self._start_time and t <= self._end_time
 
+    def _active_rows(self, t0: float, n_steps: int, dt: float) -> tuple[int, int]:
+        # the stimulation is active on a single time interval, so the active rows of a block are contiguous
+        times = self._row_times(t0, n_steps, dt)
+        active = np.flatnonzero((times >= self._start_time) & (times <= self._end_time))
+        if active.size == 0:
+            return 0, 0
+        return active[0], active[-1] + 1
+
+    def describe(self) -> Optional[dict]:
+        return {'start_time': self._start_time, 'end_time': self._end_time, 'I': self._I}
+
+    def segments(self, T: float) -> Optional[list[tuple[float, float, np.ndarray]]]:
+        zero = np.zeros_like(self._I)
+        start = min(max(self._start_time, 0.0), T)
+        end = min(max(self._end_time, start), T)
+        segments = [(0.0, start, zero), (start, end, self._I), (end, T, zero)]
+        return [segment for segment in segments if segment[1] > segment[0]]
+
+    def get_current(self, t: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            out = np.empty(self.N_neurons, dtype=self.dtype)
+        if self._is_active(t):
+            out[:] = self._I
+        else:
+            out.fill(0)
+        return out
+
+    def get_current_block(self, t0: float, n_steps: int, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            out = np.empty((n_steps, self.N_neurons), dtype=self.dtype)
+        start, end = self._active_rows(t0, n_steps, dt)
+        out[:start] = 0
+        out[start:end] = self._I
+        out[end:] = 0
+        return out
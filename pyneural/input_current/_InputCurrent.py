@@ -1,24 +1,79 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 import numpy as np
+from numpy.typing import DTypeLike
 
 class InputCurrent(ABC):
     """
     A base class for different modes of input current stimulation.
     """
 
-    def __init__(self, N_neurons: int):
+    def __init__(self, N_neurons: int, dtype: DTypeLike = np.float64):
         """
         Initialize an InputCurrent object.
 
         :param N_neurons: number of neurons for the simulation (some models can simulate different input stimulation for dofferent neurons within a single simulation)
+        :param dtype: floating point type of the returned stimulation values (float64 by default).
         """
         self.N_neurons = N_neurons
+        self.dtype = np.dtype(dtype)
 
     @abstractmethod
-    def get_current(self, t: float) -> np.ndarray:
+    def get_current(self, t: float, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Get current stimulation at a particular moment in time. Returns a numpy array of stimulation values for each neuron in a simulaiton.
 
         :param t: time in ms
+        :param out: numpy array to write the stimulation values into. If not specified, a new array is returned.
         """
         pass
+
+    def describe(self) -> Optional[dict]:
+        """
+        Describe the definition of the stimulation, e.g. for the keys of a `pyneural.ResultCache` (the state of random generators is captured by `snapshot` instead). Returns a dictionary of the parameters of the stimulation, or None if it cannot be described.
+        """
+        return None
+
+    def segments(self, T: float) -> Optional[list[tuple[float, float, np.ndarray]]]:
+        """
+        Describe the stimulation on the time interval [0, T] as a piecewise-constant function, which allows event-driven simulations (see `pyneural.NeuralModel.simulate_event_driven`). Returns a list of consecutive segments (t_start, t_end, I), where I is a numpy array of stimulation values for each neuron, or None if the stimulation is not piecewise constant.
+
+        :param T: end of the time interval in ms.
+        """
+        return None
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Capture the state of the stimulation (e.g. of a random generator). Returns a dictionary of numpy arrays, which can be passed to `restore`. Stimulations without a state return an empty dictionary.
+        """
+        return {}
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        """
+        Restore the state of the stimulation captured by `snapshot`.
+
+        :param snapshot: dictionary returned by `snapshot`.
+        """
+        pass
+
+    def get_current_block(self, t0: float, n_steps: int, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Get current stimulation for `n_steps` consecutive moments in time `(step + k)*dt`, where `step = round(t0/dt)` is the index of the first step. The times are computed the same way as the times `step*dt` of the single steps, so a block gives the same values as `get_current` at each step regardless of where the block starts. Returns a numpy array of shape `(n_steps, N_neurons)`, where each row contains stimulation values for each neuron at one moment in time.
+
+        The base implementation calls `get_current` for each moment, subclasses can override it to generate the whole block at once.
+
+        :param t0: time of the first row in ms.
+        :param n_steps: number of rows.
+        :param dt: time interval between two consecutive rows in ms.
+        :param out: numpy array of shape `(n_steps, N_neurons)` to write the stimulation values into. If not specified, a new array is returned.
+        """
+        if out is None:
+            out = np.empty((n_steps, self.N_neurons), dtype=self.dtype)
+        for k, t in enumerate(self._row_times(t0, n_steps, dt)):
+            self.get_current(float(t), out=out[k])
+        return out
+
+    @staticmethod
+    def _row_times(t0: float, n_steps: int, dt: float) -> np.ndarray:
+        # the times of the rows of a block, rounded like the times of the single steps
+        return (round(t0/dt) + np.arange(n_steps))*dt
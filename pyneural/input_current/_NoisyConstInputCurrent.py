@@ -1,4 +1,6 @@
+import json
 import numpy as np
+from numpy.typing import DTypeLike
 from typing import Optional
 from ._ConstInputCurrent import ConstInputCurrent
 
@@ -10,19 +12,87 @@ class NoisyConstInputCurrent(ConstInputCurrent):
 
     _std: float = 0
 
-    def __init__(self, N_neurons: int = 1, start_time: float = 0, end_time: float = np.inf, I: Optional[np.ndarray] = None, std: float = 0):
+    def __init__(self, N_neurons: int = 1, start_time: float = 0, end_time: float = np.inf, I: Optional[np.ndarray] = None, std: float = 0, rng: Optional[np.random.Generator] = None, dtype: DTypeLike = np.float64, n_trials: int = 1):
         """
-        Initialize a new noisy input current object. Apart from its superclass parameters, takes one additional argument:
+        Initialize a new noisy input current object. Apart from its superclass parameters, takes the following additional arguments:
 
         :param std: standard deviation of the noisy current. Often should be normalized by a time interval between updates of a system (e.g. std^2 should be proportional to tau/dt).
+        :param rng: `numpy.random.Generator` used to draw the noise. If not specified, the global numpy random state is used.
+        :param dtype: floating point type of the returned stimulation values (float64 by default). With `rng`, float32 noise is drawn directly in single precision.
+        :param n_trials: number of Monte-Carlo trials of the simulated group. The mean stimulation is repeated for each trial, while the noise is drawn independently for each neuron of each trial.
         """
-        super().__init__(N_neurons, start_time, end_time, I)
+        super().__init__(N_neurons, start_time, end_time, I, dtype, n_trials)
         self._std = std
+        self._rng = rng
 
 
-    def get_current(self, t: float) -> np.ndarray:
-        if(t >= self._start_time and t <= self._end_time):
-            return self._I + np.random.normal(0.0, self._std, self.N_neurons)
+    def get_current(self, t: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            out = np.empty(self.N_neurons, dtype=self.dtype)
+        if self._is_active(t):
+            self._add_noise(out)
+        else:
+            out.fill(0)
+        return out
 
-        return np.zeros(self.N_neurons)
-        
+    def _add_noise(self, out: np.ndarray):
+        # writes I + noise into out
+        if self._rng is None:
+            # the global numpy random state cannot sample into an existing array, so the noise is the only allocation here
+            np.add(self._I, np.random.normal(0.0, self._std, out.shape), out=out)
+        else:
+            self._rng.standard_normal(dtype=out.dtype, out=out)
+            out *= self._std
+            out += self._I
+
+    def describe(self) -> Optional[dict]:
+        description = super().describe()
+        return None if description is None else {**description, 'std': self._std}
+
+    def segments(self, T: float) -> Optional[list[tuple[float, float, np.ndarray]]]:
+        # only a stimulation without noise is piecewise constant
+        if self._std != 0:
+            return None
+        return super().segments(T)
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Capture the state of the random generator (the global numpy random state if no generator was given). Returns a dictionary with the state encoded as a JSON string.
+        """
+        if self._rng is None:
+            state = np.random.get_state(legacy=False)
+        else:
+            state = self._rng.bit_generator.state
+        return {'rng': np.array(json.dumps(state, default=_encode_array))}
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        state = json.loads(str(snapshot['rng']), object_hook=_decode_array)
+        if self._rng is None:
+            np.random.set_state(state)
+        else:
+            self._rng.bit_generator.state = state
+
+    def get_current_block(self, t0: float, n_steps: int, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            out = np.empty((n_steps, self.N_neurons), dtype=self.dtype)
+        start, end = self._active_rows(t0, n_steps, dt)
+        out[:start] = 0
+        # the noise for the whole block is drawn at once; the values are the same as when drawn step by step
+        self._add_noise(out[start:end])
+        out[end:] = 0
+        return out
+
+
+def _encode_array(value):
+    # states of some bit generators (e.g. MT19937) contain numpy arrays
+    if isinstance(value, np.ndarray):
+        return {'__ndarray__': value.tolist(), 'dtype': value.dtype.str}
+    if isinstance(value, np.integer):
+        return int(value)
+    raise TypeError(f'Cannot encode {type(value).__name__}')
+
+
+def _decode_array(value: dict):
+    if '__ndarray__' in value:
+        return np.array(value['__ndarray__'], dtype=value['dtype'])
+    return value
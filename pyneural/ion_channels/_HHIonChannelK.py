@@ -2,6 +2,26 @@ from typing import Optional
 from ._IonChannel import IonChannel
 from ._MarkovIonGate import MarkovIonGate
 import numpy as np
+from numpy.typing import DTypeLike
+
+
+def _alpha_n(V: np.ndarray, out: np.ndarray, work: np.ndarray) -> np.ndarray:
+    # ((10 - V) / 100) / (exp(0.1 * (10 - V)) - 1)
+    np.subtract(10, V, out=work)
+    np.multiply(0.1, work, out=out)
+    np.exp(out, out=out)
+    out -= 1
+    work /= 100
+    return np.divide(work, out, out=out)
+
+
+def _beta_n(V: np.ndarray, out: np.ndarray, work: np.ndarray) -> np.ndarray:
+    # 0.125 * exp(-V / 80)
+    np.negative(V, out=out)
+    out /= 80
+    np.exp(out, out=out)
+    out *= 0.125
+    return out
 
 
 class HHIonChannelK(IonChannel):
@@ -12,31 +32,54 @@ class HHIonChannelK(IonChannel):
         g: ion channel conductance for each neuron.
     """
 
-    def __init__(self, N_neurons: int, gK: float, V_init: Optional[np.ndarray] = None):
+    def __init__(self, N_neurons: int, gK: float, V_init: Optional[np.ndarray] = None, dtype: DTypeLike = np.float64):
         """
         Initialize a new potassium ion channel for a set of neurons.
 
         :param N_neurons: number of neurons in a simulation.
         :param gK: conductance of potassium channels of a single neuron when all ion gates are open (maximum conductance).
         :param V_init: numpy array containing initial membrane potentials (relative to resting potential) for each neuron at stability in mV (zero by default).
+        :param dtype: floating point type of the conductances and gate states (float64 by default).
         """
-        super().__init__(N_neurons)
+        super().__init__(N_neurons, dtype)
 
 
         self._n_gate = MarkovIonGate(N_neurons,
-                                    alpha = lambda V: ((10 - V) / 100) / (np.exp(0.1 * (10 - V)) - 1),
-                                    beta = lambda V: 0.125 * np.exp(-V / 80),
-                                    V_init = V_init)
+                                    alpha = _alpha_n,
+                                    beta = _beta_n,
+                                    V_init = V_init,
+                                    inplace_rates = True,
+                                    dtype = dtype)
 
         self._g_max: float = gK
-        self.g: np.ndarray = self._g_max * np.power(self._n_gate.state, 4)
+        self._update_conductance()
+
+    def _update_conductance(self):
+        np.power(self._n_gate.state, 4, out=self.g)
+        self.g *= self._g_max
+
+    def set_integrator(self, integrator: str):
+        self._n_gate.set_integrator(integrator)
+
+    def set_rate_table(self, **table):
+        """
+        Evaluate the rates of the gates by interpolation in precomputed tables (see `pyneural.ion_channels.MarkovIonGate.set_rate_table` for the parameters).
+        """
+        self._n_gate.set_rate_table(**table)
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        return {**super().snapshot(), 'n': self._n_gate.state.copy()}
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        super().restore(snapshot)
+        np.copyto(self._n_gate.state, snapshot['n'])
 
-    def update_g(self, V: np.ndarray, t: float, dt: float) -> np.ndarray:
+    def update_g(self, V: np.ndarray, t: float, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray:
         self._n_gate.update(V, dt)
-        self.g = self._g_max * np.power(self._n_gate.state, 4)
-        return self.g
+        self._update_conductance()
+        return self._output(out)
     
     def reset(self, V_init: Optional[np.ndarray] = None):
         self._n_gate.set_inf_state(V_init)
-        self.g = self._g_max * np.power(self._n_gate.state, 4)
+        self._update_conductance()
 
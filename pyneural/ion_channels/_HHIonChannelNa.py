@@ -2,6 +2,44 @@ from typing import Optional
 from ._IonChannel import IonChannel
 from ._MarkovIonGate import MarkovIonGate
 import numpy as np
+from numpy.typing import DTypeLike
+
+
+def _alpha_m(V: np.ndarray, out: np.ndarray, work: np.ndarray) -> np.ndarray:
+    # ((25 - V) / 10) / (exp(0.1 * (25 - V)) - 1)
+    np.subtract(25, V, out=work)
+    np.multiply(0.1, work, out=out)
+    np.exp(out, out=out)
+    out -= 1
+    work /= 10
+    return np.divide(work, out, out=out)
+
+
+def _beta_m(V: np.ndarray, out: np.ndarray, work: np.ndarray) -> np.ndarray:
+    # 4 * exp(-V / 18)
+    np.negative(V, out=out)
+    out /= 18
+    np.exp(out, out=out)
+    out *= 4
+    return out
+
+
+def _alpha_h(V: np.ndarray, out: np.ndarray, work: np.ndarray) -> np.ndarray:
+    # 0.07 * exp(-V / 20)
+    np.negative(V, out=out)
+    out /= 20
+    np.exp(out, out=out)
+    out *= 0.07
+    return out
+
+
+def _beta_h(V: np.ndarray, out: np.ndarray, work: np.ndarray) -> np.ndarray:
+    # 1 / (exp((30 - V) / 10) + 1)
+    np.subtract(30, V, out=out)
+    out /= 10
+    np.exp(out, out=out)
+    out += 1
+    return np.divide(1, out, out=out)
 
 
 class HHIonChannelNa(IonChannel):
@@ -12,36 +50,68 @@ class HHIonChannelNa(IonChannel):
         g: ion channel conductance for each neuron.
     """
 
-    def __init__(self, N_neurons: int, gNa: float, V_init: Optional[np.ndarray]=None):
+    def __init__(self, N_neurons: int, gNa: float, V_init: Optional[np.ndarray]=None, dtype: DTypeLike = np.float64):
         """
         Initialize a new sodium ion channel for a set of neurons.
 
         :param N_neurons: number of neurons in a simulation.
         :param gNa: conductance of sodium channels in a single neuron when all ion gates are open (maximum conductance).
         :param V_init: numpy array containing initial membrane potentials (relative to resting potential) for each neuron at stability in mV (zero by default).
+        :param dtype: floating point type of the conductances and gate states (float64 by default).
         """
+        super().__init__(N_neurons, dtype)
 
         self._m_gate = MarkovIonGate(N_neurons,
-                                    alpha=lambda V: ((25 - V) / 10) / (np.exp(0.1 * (25 - V)) - 1),
-                                    beta=lambda V: 4 * np.exp(-V / 18),
-                                    V_init=V_init)
+                                    alpha=_alpha_m,
+                                    beta=_beta_m,
+                                    V_init=V_init,
+                                    inplace_rates=True,
+                                    dtype=dtype)
 
         self._h_gate = MarkovIonGate(N_neurons,
-                                    alpha=lambda V: 0.07 * np.exp(-V / 20),
-                                    beta=lambda V: 1 / (np.exp((30 - V) / 10) + 1),
-                                    V_init=V_init)
+                                    alpha=_alpha_h,
+                                    beta=_beta_h,
+                                    V_init=V_init,
+                                    inplace_rates=True,
+                                    dtype=dtype)
 
         self._g_max: float = gNa
-        self.g: np.ndarray = self._g_max * np.power(self._m_gate.state, 3) * self._h_gate.state
+        self._update_conductance()
+
+    def _update_conductance(self):
+        np.power(self._m_gate.state, 3, out=self.g)
+        self.g *= self._g_max
+        self.g *= self._h_gate.state
+
+    def set_integrator(self, integrator: str):
+        self._m_gate.set_integrator(integrator)
+        self._h_gate.set_integrator(integrator)
+
+    def set_rate_table(self, **table):
+        """
+        Evaluate the rates of the gates by interpolation in precomputed tables (see `pyneural.ion_channels.MarkovIonGate.set_rate_table` for the parameters).
+        """
+        self._m_gate.set_rate_table(**table)
+        self._h_gate.set_rate_table(**table)
+        # both gates see the same membrane potential, so its position in the grid is computed once
+        self._h_gate.share_location(self._m_gate)
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        return {**super().snapshot(), 'm': self._m_gate.state.copy(), 'h': self._h_gate.state.copy()}
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        super().restore(snapshot)
+        np.copyto(self._m_gate.state, snapshot['m'])
+        np.copyto(self._h_gate.state, snapshot['h'])
 
-    def update_g(self, V: np.ndarray, t, dt) -> np.ndarray:
+    def update_g(self, V: np.ndarray, t: float, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray:
         self._m_gate.update(V, dt)
-        self._h_gate.update(V, dt)
-        self.g = self._g_max * np.power(self._m_gate.state, 3) * self._h_gate.state
-        return self.g
+        self._h_gate.update(V, dt, reuse_location=self._h_gate.rate_table is not None)
+        self._update_conductance()
+        return self._output(out)
 
     def reset(self, V_init: Optional[np.ndarray] = None):
         self._m_gate.set_inf_state(V_init)
         self._h_gate.set_inf_state(V_init)
-        self.g = self._g_max * np.power(self._m_gate.state, 3) * self._h_gate.state
+        self._update_conductance()
 
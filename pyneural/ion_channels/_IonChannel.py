@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 import numpy as np
+from numpy.typing import DTypeLike
 
 
 class IonChannel(ABC):
@@ -11,26 +12,57 @@ class IonChannel(ABC):
         g: conductace of a channel for each neuron.
     """
 
-    def __init__(self, N_neurons: int = 1):
+    def __init__(self, N_neurons: int = 1, dtype: DTypeLike = np.float64):
         """
         Initialize a new ion channel object.
 
         :param N_neurons: number of neurons in a simulation.
+        :param dtype: floating point type of the conductances (float64 by default).
         """
         self.N_neurons = N_neurons
-        self.g = np.zeros(N_neurons)
+        self.dtype = np.dtype(dtype)
+        self.g = np.zeros(N_neurons, dtype=self.dtype)
     
     @abstractmethod
-    def update_g(self, V: np.ndarray, t: float, dt: float) -> np.ndarray:
+    def update_g(self, V: np.ndarray, t: float, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        Updates the conductance of the channel for each neuron based on current time and membrane potential for each neuron. Returns new conductance for each neuron.
+        Updates the conductance of the channel for each neuron based on current time and membrane potential for each neuron. The conductance `g` is updated in place. Returns new conductance for each neuron.
 
         :param V: numpy array containing current membrane potentials (relative to the resting potential) for each neuron in mV.
         :param t: current time in ms.
         :param dt: the time interval between two consecutive updates in ms.
+        :param out: numpy array to write the new conductance into. If not specified, `g` itself is returned.
         """
         pass
 
+    def set_integrator(self, integrator: str):
+        """
+        Set the integration scheme used to update the state of the channel. Channels without a state ignore it.
+
+        :param integrator: name of the integration scheme (see `pyneural.ion_channels.MarkovIonGate.INTEGRATORS`).
+        """
+        pass
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Capture the state of the channel. Returns a dictionary of numpy arrays (copies), which can be passed to `restore`.
+        """
+        return {'g': self.g.copy()}
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        """
+        Restore the state of the channel captured by `snapshot`.
+
+        :param snapshot: dictionary returned by `snapshot`.
+        """
+        np.copyto(self.g, snapshot['g'])
+
+    def _output(self, out: Optional[np.ndarray]) -> np.ndarray:
+        if out is None:
+            return self.g
+        np.copyto(out, self.g)
+        return out
+
     @abstractmethod
     def reset(self, V_init: Optional[np.ndarray] = None):
         """
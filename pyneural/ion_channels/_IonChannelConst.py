@@ -1,6 +1,7 @@
 from typing import Optional
 from ._IonChannel import IonChannel
 import numpy as np
+from numpy.typing import DTypeLike
 
 
 class IonChannelConst(IonChannel):
@@ -11,18 +12,19 @@ class IonChannelConst(IonChannel):
         g: ion channel conductance for each neuron.
     """
 
-    def __init__(self, N_neurons: int, g: float):
+    def __init__(self, N_neurons: int, g: float, dtype: DTypeLike = np.float64):
         """
         Initialize a new ion channel with constant conductance.
 
         :param N_neurons: number of neurons in a simulation.
         :param g: conductance of this channel (same for each neuron).
+        :param dtype: floating point type of the conductances (float64 by default).
         """
-        super().__init__(N_neurons)
+        super().__init__(N_neurons, dtype)
         self.g += g
 
-    def update_g(self, V: np.ndarray, t: float, dt: float) -> np.ndarray: 
-        return self.g
+    def update_g(self, V: np.ndarray, t: float, dt: float, out: Optional[np.ndarray] = None) -> np.ndarray: 
+        return self._output(out)
 
     def reset(self, V_init: Optional[np.ndarray] = None):
         return
@@ -1,5 +1,7 @@
 from typing import Callable, Optional
 import numpy as np
+from numpy.typing import DTypeLike
+from ._RateTable import RateTable
 
 
 class MarkovIonGate:
@@ -11,7 +13,10 @@ class MarkovIonGate:
     """
     state: np.ndarray = np.array([])
 
-    def __init__(self, N_neurons: int, alpha: Callable[[np.ndarray], np.ndarray], beta: Callable[[np.ndarray], np.ndarray], V_init: Optional[np.ndarray] = None):
+    INTEGRATORS: tuple[str, ...] = ('euler', 'exponential')
+    """Names of the available integration schemes: forward Euler and the Rush-Larsen exponential update."""
+
+    def __init__(self, N_neurons: int, alpha: Callable[..., np.ndarray], beta: Callable[..., np.ndarray], V_init: Optional[np.ndarray] = None, inplace_rates: bool = False, dtype: DTypeLike = np.float64):
         """
         Initialize a new Markov ion gate.
 
@@ -19,16 +24,72 @@ class MarkovIonGate:
         :param alpha: a function that maps current membrane potentials of all neurons in mV to the probabilities of the gate transitioning from closed to open in each neuron.
         :param beta: a function that maps current mambrane potantial of all neurons in mV to the probabilities of the gate transitioning from open to closed in each neuron. 
         :param V_init: initial membrane potantial (relative to the resting potential) at stability for each neuron (zero by default).
+        :param inplace_rates: if True, `alpha` and `beta` are called as `f(V, out, work)` and must write the rates into `out`, using `work` as a scratch array of the same shape. This allows the gate to be updated without allocating new arrays.
+        :param dtype: floating point type of the state (float64 by default).
         """
         self.N_neurons = N_neurons
+        self.dtype = np.dtype(dtype)
         self._alpha = alpha
         self._beta = beta
+        self._inplace_rates = inplace_rates
+        self.integrator: str = 'euler'
+        """Integration scheme used by `update` (one of `INTEGRATORS`)."""
+        self.rate_table: Optional[RateTable] = None
+        """`pyneural.ion_channels.RateTable` used to evaluate the rates (None if the rate functions are evaluated directly)."""
+        self._index = np.zeros(N_neurons, dtype=np.intp)
+        self._frac = np.zeros(N_neurons, dtype=self.dtype)
+
+        self.state = np.zeros(N_neurons, dtype=self.dtype)
+        self._a = np.zeros(N_neurons, dtype=self.dtype)
+        self._b = np.zeros(N_neurons, dtype=self.dtype)
+        self._work = np.zeros(N_neurons, dtype=self.dtype)
         
-        zero = np.array([0])
-        self.rest_val: float = alpha(zero)[0]/(beta(zero)[0] + alpha(zero)[0]) 
+        zero = np.array([0.0])
+        alpha_rest = self._rate(alpha, zero)[0]
+        self.rest_val: float = alpha_rest/(self._rate(beta, zero)[0] + alpha_rest)
 
         self.set_inf_state(V_init)
 
+    def set_integrator(self, integrator: str):
+        """
+        Set the integration scheme used to update the state.
+
+        :param integrator: 'euler' for the forward Euler update or 'exponential' for the Rush-Larsen update, which integrates the gate exactly assuming the membrane potential is constant during a step.
+        """
+        if integrator not in MarkovIonGate.INTEGRATORS:
+            raise ValueError(f'Bad integrator for a Markov ion gate: {integrator}')
+        self.integrator = integrator
+
+    def set_rate_table(self, V_min: float = -100.0, V_max: float = 150.0, dV: float = 0.05, enabled: bool = True):
+        """
+        Evaluate the rates by linear interpolation in a precomputed `pyneural.ion_channels.RateTable` instead of calling the rate functions. The table is shared between all gates with the same rate functions and grid.
+
+        :param V_min: lower end of the grid in mV (relative to the resting potential).
+        :param V_max: upper end of the grid in mV (relative to the resting potential).
+        :param dV: grid spacing in mV.
+        :param enabled: if False, the table is removed and the rate functions are evaluated directly.
+        """
+        self.rate_table = RateTable.get(self._alpha, self._beta, V_min, V_max, dV, self._inplace_rates, self.dtype) if enabled else None
+
+    def rates(self, V: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the transition rates at a given membrane potential. Returns new arrays (alpha, beta).
+
+        :param V: numpy array containing membrane potentials for each neuron in mV.
+        """
+        if self.rate_table is None:
+            return self._rate(self._alpha, V), self._rate(self._beta, V)
+        index, frac = np.zeros(V.shape, dtype=np.intp), np.zeros(V.shape, dtype=self.dtype)
+        self.rate_table.locate(V, index, frac)
+        return tuple(self.rate_table.interpolate(self.rate_table.tables[name], index, frac, np.empty(V.shape, dtype=self.dtype), np.empty(V.shape, dtype=self.dtype)) for name in ('alpha', 'beta'))
+
+    def _rate(self, rate: Callable[..., np.ndarray], V: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if not self._inplace_rates:
+            return rate(V)
+        if out is None:
+            return rate(V, np.empty_like(V, dtype=self.dtype), np.empty_like(V, dtype=self.dtype))
+        return rate(V, out, self._work)
+
     def set_inf_state(self, V: Optional[np.ndarray] = None):
         """
         Set the state to the stable value at a given membrane potential.
@@ -36,16 +97,75 @@ class MarkovIonGate:
         :param V: numpy array containing membrane potentials for each neuron in mV.
         """
         if V is None:
-            self.state = np.zeros(self.N_neurons) + self.rest_val
+            self.state[:] = self.rest_val
+        elif self.rate_table is not None:
+            self.rate_table.locate(V, self._index, self._frac)
+            self.rate_table.interpolate(self.rate_table.tables['x_inf'], self._index, self._frac, self.state, self._work)
         else:
-            self.state = np.divide(self._alpha(V),  self._alpha(V) + self._beta(V))
+            a = self._rate(self._alpha, V, self._a)
+            b = self._rate(self._beta, V, self._b)
+            np.add(a, b, out=b)
+            np.divide(a, b, out=self.state)
+
+    def share_location(self, gate: 'MarkovIonGate'):
+        """
+        Share the buffers holding the position of the membrane potentials in the rate table grid with another gate of the same neurons. The other gate has to be updated first, and this gate is then updated with `reuse_location=True`.
 
-    def update(self, V: np.ndarray, dt: float):
+        :param gate: gate with the rate table on the same grid.
         """
-        Update the state given current membrane potential.
+        self._index = gate._index
+        self._frac = gate._frac
+
+    def update(self, V: np.ndarray, dt: float, out: Optional[np.ndarray] = None, reuse_location: bool = False) -> np.ndarray:
+        """
+        Update the state given current membrane potential. The state is updated in place. Returns the new state.
 
         :param V: numpy array containing membrane potentials for each neuron in mV.
         :param dt: time interval between two consecutive updates in ms.
+        :param out: numpy array to copy the new state into.
+        :param reuse_location: if True, the position of `V` in the rate table grid is not recomputed, but taken from the gate set by `share_location`.
         """
-        self.state += (self._alpha(V) * (1 - self.state) - self._beta(V) * self.state) * dt
+        table = self.rate_table
+        if table is not None:
+            if not reuse_location:
+                table.locate(V, self._index, self._frac)
+            if self.integrator == 'exponential':
+                x_inf = table.interpolate(table.tables['x_inf'], self._index, self._frac, self._a, self._work)
+                decay = table.interpolate(table.decay(dt), self._index, self._frac, self._b, self._work)
+                self._relax(x_inf, decay)
+            else:
+                a = table.interpolate(table.tables['alpha'], self._index, self._frac, self._a, self._work)
+                b = table.interpolate(table.tables['beta'], self._index, self._frac, self._b, self._work)
+                self._euler_step(a, b, dt)
+        else:
+            a = self._rate(self._alpha, V, self._a)
+            b = self._rate(self._beta, V, self._b)
+            if self.integrator == 'exponential':
+                # x_inf = alpha / (alpha + beta), decay = exp(-(alpha + beta) * dt)
+                np.add(a, b, out=b)
+                np.divide(a, b, out=a)
+                np.multiply(b, -dt, out=b)
+                np.exp(b, out=b)
+                self._relax(a, b)
+            else:
+                self._euler_step(a, b, dt)
+
+        if out is None:
+            return self.state
+        np.copyto(out, self.state)
+        return out
+
+    def _euler_step(self, a: np.ndarray, b: np.ndarray, dt: float):
+        # state += (alpha * (1 - state) - beta * state) * dt
+        np.subtract(1, self.state, out=self._work)
+        np.multiply(a, self._work, out=self._work)
+        np.multiply(b, self.state, out=b)
+        np.subtract(self._work, b, out=self._work)
+        self._work *= dt
+        self.state += self._work
 
+    def _relax(self, x_inf: np.ndarray, decay: np.ndarray):
+        # state = x_inf + (state - x_inf) * decay
+        np.subtract(self.state, x_inf, out=self._work)
+        self._work *= decay
+        np.add(x_inf, self._work, out=self.state)
@@ -0,0 +1,135 @@
+from typing import Callable
+import numpy as np
+from numpy.typing import DTypeLike
+
+
+class RateTable:
+    """
+    Precomputed table of the transition rates of a `pyneural.ion_channels.MarkovIonGate` on a uniform grid of membrane potentials. The table stores alpha, beta, the stable state x_inf = alpha/(alpha + beta) and the time constant tau = 1/(alpha + beta), and evaluates them by linear interpolation, so no transcendental functions are computed during a simulation. Membrane potentials outside of the grid are clamped to its ends.
+
+    Tables are cached: use `RateTable.get` to share a single table between all gates with the same rate functions and grid.
+
+    Attributes:
+        max_error: dictionary with the maximal relative interpolation error of each tabulated function, estimated at the midpoints of the grid.
+    """
+
+    TABLES: tuple[str, ...] = ('alpha', 'beta', 'x_inf', 'tau')
+    """Names of the tabulated functions."""
+
+    _cache: dict[tuple, 'RateTable'] = {}
+
+    def __init__(self, alpha: Callable[..., np.ndarray], beta: Callable[..., np.ndarray], V_min: float = -100.0, V_max: float = 150.0, dV: float = 0.05, inplace_rates: bool = False, dtype: DTypeLike = np.float64):
+        """
+        Tabulate the rate functions of a gate. The functions are evaluated in double precision and stored with the given type.
+
+        :param alpha: rate function of the gate transitioning from closed to open (see `pyneural.ion_channels.MarkovIonGate`).
+        :param beta: rate function of the gate transitioning from open to closed.
+        :param V_min: lower end of the grid in mV (relative to the resting potential).
+        :param V_max: upper end of the grid in mV (relative to the resting potential).
+        :param dV: grid spacing in mV.
+        :param inplace_rates: if True, the rate functions are called as `f(V, out, work)` (see `pyneural.ion_channels.MarkovIonGate`).
+        :param dtype: floating point type of the stored tables (float64 by default).
+        """
+        if V_max <= V_min or dV <= 0:
+            raise ValueError(f'Bad rate table grid: V_min={V_min}, V_max={V_max}, dV={dV}')
+        self.V_min = V_min
+        self.dV = dV
+        self._inv_dV = 1 / dV
+        self.N_points = int(np.ceil((V_max - V_min) / dV)) + 1
+        self.V_max = V_min + (self.N_points - 1) * dV
+        self._alpha = alpha
+        self._beta = beta
+        self._inplace_rates = inplace_rates
+        self.dtype = np.dtype(dtype)
+
+        grid = V_min + dV * np.arange(self.N_points)
+        self.tables: dict[str, tuple[np.ndarray, np.ndarray]] = {name: self._with_slopes(values) for name, values in self._evaluate(grid).items()}
+        """Dictionary mapping the name of each tabulated function to the arrays of its values at the grid points and the slopes between them."""
+        self._decay_cache: dict[float, tuple[np.ndarray, np.ndarray]] = {}
+
+        midpoints = grid[:-1] + dV / 2
+        exact = self._evaluate(midpoints)
+        self.max_error: dict[str, float] = {}
+        for name in RateTable.TABLES:
+            values, slopes = self.tables[name]
+            interpolated = values[:-1] + slopes[:-1] / 2
+            scale = np.maximum(np.abs(exact[name]), np.finfo(float).tiny)
+            self.max_error[name] = float(np.max(np.abs(interpolated - exact[name]) / scale))
+
+    @classmethod
+    def get(cls, alpha: Callable[..., np.ndarray], beta: Callable[..., np.ndarray], V_min: float = -100.0, V_max: float = 150.0, dV: float = 0.05, inplace_rates: bool = False, dtype: DTypeLike = np.float64) -> 'RateTable':
+        """
+        Get the cached table for the given rate functions and grid, creating it if necessary. The parameters are the same as for the constructor.
+        """
+        key = (alpha, beta, V_min, V_max, dV, inplace_rates, np.dtype(dtype))
+        if key not in cls._cache:
+            cls._cache[key] = cls(alpha, beta, V_min, V_max, dV, inplace_rates, dtype)
+        return cls._cache[key]
+
+    def _with_slopes(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return values.astype(self.dtype), np.append(np.diff(values), 0.0).astype(self.dtype)
+
+    def _rate(self, rate: Callable[..., np.ndarray], V: np.ndarray) -> np.ndarray:
+        if self._inplace_rates:
+            return rate(V, np.empty_like(V), np.empty_like(V))
+        return rate(V)
+
+    def _evaluate(self, V: np.ndarray) -> dict[str, np.ndarray]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            alpha = self._rate(self._alpha, V)
+            beta = self._rate(self._beta, V)
+            # rate functions like (10 - V)/(exp(0.1*(10 - V)) - 1) have removable singularities, which are evaluated next to the grid point
+            for rate, values in ((self._alpha, alpha), (self._beta, beta)):
+                bad = ~np.isfinite(values)
+                if bad.any():
+                    values[bad] = self._rate(rate, V[bad] + 1e-6 * self.dV)
+        return {
+            'alpha': alpha,
+            'beta': beta,
+            'x_inf': alpha / (alpha + beta),
+            'tau': 1 / (alpha + beta)
+        }
+
+    def locate(self, V: np.ndarray, index: np.ndarray, frac: np.ndarray):
+        """
+        Find the grid cell and the position within it for each membrane potential. Writes the results into the given arrays.
+
+        :param V: numpy array containing membrane potentials (relative to the resting potential) in mV.
+        :param index: integer numpy array to write the indices of the grid cells into.
+        :param frac: numpy array to write the positions within the grid cells (between 0 and 1) into.
+        """
+        np.subtract(V, self.V_min, out=frac)
+        frac *= self._inv_dV
+        np.clip(frac, 0, self.N_points - 1, out=frac)
+        # the positions are not negative, so the truncation to integers is the floor,
+        # and the table keeps no scratch buffers, so it can be shared by groups stepped in different threads
+        np.copyto(index, frac, casting='unsafe')
+        np.subtract(frac, index, out=frac)
+
+    def interpolate(self, table: tuple[np.ndarray, np.ndarray], index: np.ndarray, frac: np.ndarray, out: np.ndarray, work: np.ndarray) -> np.ndarray:
+        """
+        Interpolate a tabulated function at the positions found by `locate`. Returns `out`.
+
+        :param table: values and slopes of the tabulated function (an item of `tables` or the result of `decay`).
+        :param index: indices of the grid cells.
+        :param frac: positions within the grid cells.
+        :param out: numpy array to write the values into.
+        :param work: scratch numpy array of the same shape as `out`.
+        """
+        values, slopes = table
+        # the indices are already within the table, so the bounds check of np.take is skipped with mode='clip'
+        np.take(slopes, index, out=work, mode='clip')
+        work *= frac
+        np.take(values, index, out=out, mode='clip')
+        out += work
+        return out
+
+    def decay(self, dt: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the table of exp(-dt/tau) used by the exponential integration of the gate. The table is computed once per time step.
+
+        :param dt: time interval between two consecutive updates in ms.
+        """
+        if dt not in self._decay_cache:
+            self._decay_cache[dt] = self._with_slopes(np.exp(-dt / self.tables['tau'][0].astype(np.float64)))
+        return self._decay_cache[dt]
@@ -3,6 +3,7 @@ This module contains models for ion channels that control the ion flow through n
 """
 
 from ._MarkovIonGate import MarkovIonGate
+from ._RateTable import RateTable
 from ._IonChannelConst import IonChannelConst
 from ._IonChannel import IonChannel
 from ._HHIonChannelK import HHIonChannelK
@@ -14,4 +15,5 @@ __all__ = [
     'HHIonChannelK',
     'HHIonChannelNa',
     'MarkovIonGate',
+    'RateTable',
 ]
@@ -1,13 +1,16 @@
 from typing import Optional
 import numpy as np
-from ..statistics import NeuronStepStatistics
+from ..statistics import TraceRecorder, SpikeDetector
 from ._Neuron import NeuronGroup
+from . import _kernels
 
 class ConstCondNeuronGroup(NeuronGroup):
     """
     A neuron with constant conductance for each ion channel type.
     """
 
+    EVENT_DRIVEN = True
+
     def __init__(self, N_neurons: int, params: dict = {}):
         """
         Initialize a new group of neurons with constaint conductance for each ion channel.
@@ -31,33 +34,86 @@ class ConstCondNeuronGroup(NeuronGroup):
         super().__init__(N_neurons, params)
 
         if any(param in params for param in ['gL', 'gK', 'gNa', 'E_L', 'E_K', 'E_Na', 'C_m']):
-            g_L = params.get('gL', 0.3)
-            g_K = params.get('gK', 0.366)
-            g_Na = params.get('gNa', 0.0106)
-            E_L = params.get('E_L', -59.4)
-            E_K = params.get('E_K', -82.0)
-            E_Na = params.get('E_Na', 45.0)
-            C_m = params.get('C_m', 1.0)
+            g_L = self._param(params, 'gL', 0.3)
+            g_K = self._param(params, 'gK', 0.366)
+            g_Na = self._param(params, 'gNa', 0.0106)
+            E_L = self._param(params, 'E_L', -59.4)
+            E_K = self._param(params, 'E_K', -82.0)
+            E_Na = self._param(params, 'E_Na', 45.0)
+            C_m = self._param(params, 'C_m', 1.0)
             
             self._g_m = g_L + g_K + g_Na
             self._V_rest = (g_L*E_L + g_K*E_K + g_Na*E_Na)/(g_L + g_K + g_Na)
             self._tau = C_m/(g_L + g_K + g_Na)
         else:
-            self._g_m = params.get('g_m', 1.0)
-            self._V_rest = params.get('V_rest', -70.0)
-            self._tau = params.get('tau', 10.0)
+            self._g_m = self._param(params, 'g_m', 1.0)
+            self._V_rest = self._param(params, 'V_rest', -70.0)
+            self._tau = self._param(params, 'tau', 10.0)
+
+        self._factor_cache: tuple = (None, None)
+
+
+    def _integrate(self, I_ext: np.ndarray, t: float, dt: float, recorder: Optional[TraceRecorder]):
+        if recorder is not None:
+            recorder.record('I_ext', I_ext)
+            if recorder.wants('I_total'):
+                # I_total = I_ext - g_m*(V - V_rest)
+                np.subtract(self._V, self._V_rest, out=self._work)
+                self._work *= self._g_m
+                np.subtract(I_ext, self._work, out=self._work)
+                recorder.record('I_total', self._work)
+
+        # V += (-(V - V_rest) + I_ext/g_m)*dt/tau
+        np.subtract(self._V_rest, self._V, out=self._dV)
+        np.divide(I_ext, self._g_m, out=self._work)
+        self._dV += self._work
+        if self.integrator == 'euler':
+            self._dV *= dt
+            self._dV /= self._tau
+        else:
+            self._dV *= self._step_factor(dt)
+        self._V += self._dV
+
+    def _step_factor(self, dt: float):
+        # with the input constant during a step, V relaxes to V_inf = V_rest + I_ext/g_m, so V += (V_inf - V)*factor
+        if self._factor_cache[0] != (dt, self.integrator):
+            h = dt/self._tau
+            if self.integrator == 'exponential':
+                factor = -np.expm1(-h)  # exact solution
+            else:
+                factor = h - h**2/2 + h**3/6 - h**4/24  # classical Runge-Kutta applied to the linear equation
+            self._factor_cache = ((dt, self.integrator), factor)
+        return self._factor_cache[1]
+
+    def _kernel_params(self, dt: float) -> tuple:
+        # the parameters of the membrane equation in the form taken by the kernels
+        params = (_kernels.per_neuron(param, self.N_neurons, self.dtype) for param in (self._V_rest, self._g_m, self._tau))
+        factor = self._step_factor(dt) if self.integrator != 'euler' else 0.0
+        return (*params, _kernels.per_neuron(factor, self.N_neurons, np.asarray(factor).dtype), self.integrator == 'euler', dt)
+
+    def advance_compiled(self, I_rows: np.ndarray, dt: float, detector: SpikeDetector) -> bool:
+        peaks = np.zeros(I_rows.shape, dtype=bool)
+        _kernels.const_cond_kernel(self._V, I_rows, *self._kernel_params(dt), *detector.compiled_state(), peaks)
+        detector.add_peaks(peaks)
+        return True
 
+    def _relax(self, V_inf: np.ndarray, V_start: np.ndarray, duration: np.ndarray):
+        # exact solution of the membrane equation: V = V_inf + (V_start - V_inf)*exp(-duration/tau)
+        np.copyto(self._V, V_inf + (V_start - V_inf)*np.exp(-duration/self._tau), casting='same_kind')
 
-    def step(self, I_ext: np.ndarray, t: float, dt: float) -> NeuronStepStatistics:
-        stats = NeuronStepStatistics()
-        stats.T = t
-        stats.I_ext = I_ext
-        stats.I_total = I_ext - self._g_m*(self._V - self._V_rest)
+    def _stable_potential(self, I_ext: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(self._V_rest + np.asarray(I_ext, dtype=np.float64)/self._g_m, self._V.shape)
 
-        self._V += (-(self._V - self._V_rest) + I_ext/self._g_m)*dt/self._tau
-        stats.Vm = self._V.copy()
+    def advance_exact(self, I_ext: np.ndarray, t0: float, duration: float) -> tuple[np.ndarray, np.ndarray]:
+        # the membrane potential relaxes to V_inf monotonically, so the model generates no spikes
+        self._relax(self._stable_potential(I_ext), self._V.astype(np.float64), np.float64(duration))
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
 
-        return stats
+    def advance(self, I_ext: np.ndarray, t: float, dt: float, recorder: Optional[TraceRecorder] = None) -> np.ndarray:
+        self._integrate(I_ext, t, dt, recorder)
+        if recorder is not None:
+            recorder.record('Vm', self._V)
+        return self._V
 
     def reset(self, V: Optional[np.ndarray] = None):
         return super().reset(V)
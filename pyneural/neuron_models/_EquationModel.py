@@ -0,0 +1,647 @@
+from typing import Any, Callable, Optional
+import ast
+import copy
+import json
+import math
+import re
+import numpy as np
+from ..statistics import TraceRecorder, SpikeDetector
+from ._Neuron import NeuronGroup
+from . import _kernels
+
+
+def _vtrap_scalar(x, y):
+    # x / (exp(x/y) - 1), which tends to y for x -> 0
+    if x == 0:
+        return y
+    return x / math.expm1(x / y)
+
+
+_vtrap_scalar = _kernels._compile(_vtrap_scalar, parallel=False)
+
+
+def _vtrap(x, y, out: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    # the vectorized `_vtrap_scalar`, writing into `out` with the boolean scratch buffer `mask`
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(x, y, out=out)
+        np.expm1(out, out=out)
+        np.divide(x, out, out=out)
+    np.isnan(out, out=mask)
+    np.copyto(out, y, where=mask)
+    return out
+
+
+_UNARY_FUNCTIONS: dict[str, Any] = {'exp': np.exp, 'expm1': np.expm1, 'log': np.log, 'log1p': np.log1p, 'sqrt': np.sqrt, 'abs': np.abs,
+                                    'tanh': np.tanh, 'sinh': np.sinh, 'cosh': np.cosh, 'sin': np.sin, 'cos': np.cos}
+_BINARY_FUNCTIONS: dict[str, Any] = {'minimum': np.minimum, 'maximum': np.maximum, 'vtrap': _vtrap}
+_SCALAR_FUNCTIONS: dict[str, Any] = {'exp': math.exp, 'expm1': math.expm1, 'log': math.log, 'log1p': math.log1p, 'sqrt': math.sqrt, 'abs': abs,
+                                     'tanh': math.tanh, 'sinh': math.sinh, 'cosh': math.cosh, 'sin': math.sin, 'cos': math.cos,
+                                     'minimum': min, 'maximum': max, 'vtrap': _vtrap_scalar}
+
+_BINARY_OPERATORS: dict[type, str] = {ast.Add: 'np.add', ast.Sub: 'np.subtract', ast.Mult: 'np.multiply', ast.Div: 'np.divide', ast.Pow: 'np.power',
+                                      ast.BitAnd: 'np.logical_and', ast.BitOr: 'np.logical_or'}
+_COMPARISONS: dict[type, str] = {ast.Gt: 'np.greater', ast.GtE: 'np.greater_equal', ast.Lt: 'np.less', ast.LtE: 'np.less_equal', ast.Eq: 'np.equal', ast.NotEq: 'np.not_equal'}
+
+_RESERVED: tuple[str, ...] = ('I_ext', 'I_total', 't', 'dt', 'Vm', 'np') + tuple(_SCALAR_FUNCTIONS)
+# parameters of the base class which are not available in the expressions
+_BASE_PARAMS: tuple[str, ...] = ('V_start', 'max_spike_f', 'integrator', 'dtype', 'n_trials')
+_LINE = re.compile(r'^(?:d(?P<derivative>\w+)/dt|(?P<initial>\w+)\(0\)|(?P<rate>alpha|beta)_(?P<gate>\w+)|(?P<current>\w+))\s*=\s*(?P<expression>.+)$')
+
+
+class EquationModel:
+    """
+    Neuron model defined by its equations instead of a hand-written `pyneural.neuron_models.NeuronGroup` subclass. The model is described by:
+
+    - the membrane potential `V` and other state variables, each with an expression of its time derivative (e.g. `dV/dt = I_total / C_m`),
+    - gating variables, each with the expressions of its opening and closing rates (alpha and beta, as for `pyneural.ion_channels.MarkovIonGate`),
+    - named membrane currents (e.g. `I_K = -g_K * n**4 * (V - E_K)`, positive currents depolarize the membrane as in `pyneural.neuron_models.HHNeuronGroup`), which are summed with the external stimulation `I_ext` into `I_total`,
+    - an optional threshold condition with the reset of the state variables (as in the LIF model),
+    - the parameters with their default values, which can be overridden per group and per neuron like the parameters of the built-in models.
+
+    Expressions are Python arithmetic over the names above, `t` (the time in ms) and the functions exp, expm1, log, log1p, sqrt, abs, tanh, sinh, cosh, sin, cos, minimum, maximum and vtrap (`vtrap(x, y) = x / (exp(x / y) - 1)` with its limit `y` at `x = 0`, for rate functions like the HH alpha_n). The equations are compiled once into step functions, which are cached and shared by all models with the same equations: a vectorized NumPy function evaluating the expressions in place in scratch buffers (so no arrays are allocated during a simulation, as in the built-in models), and a kernel fusing a block of steps and the spike detection for the 'numba' backend of `pyneural.NeuralModel`.
+
+    The state variables are integrated with the scheme of the group: 'euler', 'exponential' (the Rush-Larsen update of the gating variables, Euler for the others) or 'rk4'. Use `group_class` to get the `NeuronGroup` subclass of the model, or register the model under a name with `pyneural.NeuralModel.register_model`.
+    """
+
+    _cache: dict[str, dict[str, Any]] = {}
+
+    def __init__(self, equations: dict[str, str], params: dict[str, Any] = {}, gates: dict[str, tuple[str, str]] = {}, currents: dict[str, str] = {}, initial: dict[str, str] = {}, threshold: Optional[str] = None, reset: dict[str, str] = {}, name: str = 'EquationNeuronGroup'):
+        """
+        Define a new model. Raises ValueError if the equations are inconsistent or use unknown names.
+
+        :param equations: dictionary mapping the name of each state variable to the expression of its time derivative. Must contain the membrane potential 'V' (in mV).
+        :param params: dictionary mapping the name of each parameter to its default value. 'V_rest' (-70.0 by default) and 'V_threshold' (0.0 by default, used by the spike detection) are always available, and the other parameters of `pyneural.neuron_models.NeuronGroup` (e.g. 'V_start', 'max_spike_f') can be given defaults too.
+        :param gates: dictionary mapping the name of each gating variable to the expressions of its opening and closing rates in 1/ms. A gate starts in its stable state alpha/(alpha + beta), so the rates must not depend on the gates.
+        :param currents: dictionary mapping the name of each membrane current to its expression, in the order of evaluation (a current can use the currents before it).
+        :param initial: dictionary mapping the names of state variables other than 'V' and the gates to the expressions of their initial values in terms of 'V' and the parameters (0 by default).
+        :param threshold: condition of a spike (e.g. 'V > V_th'), evaluated after each step. If it holds, the observed membrane potential of the step is kept and the state variables are reset. Comparisons can be combined with `&` and `|`.
+        :param reset: dictionary mapping the name of each reset state variable to the expression of its value after a spike (e.g. `{'V': 'V_reset'}`).
+        :param name: name of the `NeuronGroup` subclass of the model.
+        """
+        if 'V' not in equations:
+            raise ValueError('Bad equations: the derivative of the membrane potential V is missing')
+        if (threshold is None) != (not reset):
+            raise ValueError('Bad equations: a threshold condition requires a reset and vice versa')
+        self.name = name
+        self.equations: dict[str, str] = {'V': equations['V'], **{variable: expression for variable, expression in equations.items() if variable != 'V'}}
+        """Dictionary mapping the name of each state variable to the expression of its derivative (the membrane potential 'V' first)."""
+        self.gates: dict[str, tuple[str, str]] = {gate: (alpha, beta) for gate, (alpha, beta) in gates.items()}
+        """Dictionary mapping the name of each gating variable to the expressions of its opening and closing rates."""
+        self.currents: dict[str, str] = dict(currents)
+        """Dictionary mapping the name of each membrane current to its expression."""
+        self.initial: dict[str, str] = dict(initial)
+        """Dictionary mapping the names of state variables to the expressions of their initial values."""
+        self.threshold = threshold
+        """Condition of a spike (None if the state is never reset)."""
+        self.reset: dict[str, str] = dict(reset)
+        """Dictionary mapping the name of each reset state variable to the expression of its value after a spike."""
+        self.params: dict[str, Any] = dict(params)
+        """Dictionary mapping the name of each parameter to its default value."""
+        self.param_names: tuple[str, ...] = ('V_rest', 'V_threshold') + tuple(sorted(name for name in params if name not in ('V_rest', 'V_threshold', *_BASE_PARAMS)))
+        """Names of the parameters available in the expressions, in the order of the arguments of the compiled functions."""
+        self.state_names: tuple[str, ...] = tuple(self.equations) + tuple(self.gates)
+        """Names of the state variables: the membrane potential, the other variables with equations, and the gates."""
+        self._check()
+        self._group_class: Optional[type['EquationNeuronGroup']] = None
+
+    @classmethod
+    def parse(cls, text: str, params: dict[str, Any] = {}, name: str = 'EquationNeuronGroup') -> 'EquationModel':
+        """
+        Define a model by the lines of a text, one definition per line ('#' starts a comment):
+
+            dV/dt = I_total / C_m              # derivative of a state variable
+            I_L = -g_L * (V - E_L)             # membrane current
+            alpha_n = 0.01 * vtrap(10 - (V - V_rest), 10)
+            beta_n = 0.125 * exp(-(V - V_rest) / 80)
+            w(0) = 0.1 * (V - V_rest)          # initial value of a state variable
+            threshold: V > V_th
+            reset: V = V_reset
+
+        A pair of rates alpha_x and beta_x defines the gating variable x. The other parameters are the same as for the constructor.
+
+        :param text: definitions of the model.
+        :param params: dictionary mapping the name of each parameter to its default value.
+        :param name: name of the `NeuronGroup` subclass of the model.
+        """
+        equations: dict[str, str] = {}
+        currents: dict[str, str] = {}
+        initial: dict[str, str] = {}
+        rates: dict[str, dict[str, str]] = {}
+        reset: dict[str, str] = {}
+        threshold = None
+        for line in text.splitlines():
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            keyword, _, rest = line.partition(':')
+            if keyword.strip() == 'threshold':
+                threshold = rest.strip()
+                continue
+            if keyword.strip() == 'reset':
+                line = rest.strip()
+            match = _LINE.match(line)
+            if match is None:
+                raise ValueError(f'Bad model definition: {line!r}')
+            expression = match['expression'].strip()
+            if keyword.strip() == 'reset':
+                if match['current'] is None:
+                    raise ValueError(f'Bad reset: {line!r}')
+                reset[match['current']] = expression
+            elif match['derivative'] is not None:
+                equations[match['derivative']] = expression
+            elif match['initial'] is not None:
+                initial[match['initial']] = expression
+            elif match['rate'] is not None:
+                rates.setdefault(match['gate'], {})[match['rate']] = expression
+            else:
+                currents[match['current']] = expression
+        for gate, pair in rates.items():
+            if set(pair) != {'alpha', 'beta'}:
+                raise ValueError(f'Bad gate {gate}: both alpha_{gate} and beta_{gate} are required')
+        return cls(equations, params, {gate: (pair['alpha'], pair['beta']) for gate, pair in rates.items()}, currents, initial, threshold, reset, name)
+
+    def describe(self) -> dict:
+        """
+        Describe the model, e.g. for the keys of a `pyneural.ResultCache`.
+        """
+        return {'equations': self.equations, 'gates': {gate: list(rates) for gate, rates in self.gates.items()}, 'currents': self.currents, 'initial': self.initial,
+                'threshold': self.threshold, 'reset': self.reset, 'params': {name: np.asarray(value).tolist() if np.ndim(value) or isinstance(value, (int, float)) else str(value)
+                                                                            for name, value in self.params.items()}}
+
+    @property
+    def recordable(self) -> tuple[str, ...]:
+        """Names of the variables the model can record: the membrane potential 'Vm', the stimulation 'I_ext', the currents with their sum 'I_total', the state variables other than 'V' and the gates as 'gate_<name>'."""
+        return ('Vm', 'I_ext', *self.currents, 'I_total', *tuple(self.equations)[1:], *(f'gate_{gate}' for gate in self.gates))
+
+    def group_class(self) -> type['EquationNeuronGroup']:
+        """
+        Get the `pyneural.neuron_models.NeuronGroup` subclass simulating this model. Its constructor takes the number of neurons and the parameters like the built-in models.
+        """
+        if self._group_class is None:
+            self._group_class = type(self.name, (EquationNeuronGroup,), {'MODEL': self, 'RECORDABLE': self.recordable, '__doc__': 'Neuron model defined by equations (see `pyneural.neuron_models.EquationModel`).'})
+        return self._group_class
+
+    def _check(self):
+        names = [*self.state_names, *self.currents, *self.param_names]
+        for name in names:
+            if not name.isidentifier() or name in _RESERVED or name.startswith('_'):
+                raise ValueError(f'Bad name: {name}')
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f'Bad equations: names {sorted(duplicates)} are defined more than once')
+        for variable in self.initial:
+            if variable not in self.equations or variable == 'V':
+                raise ValueError(f'Bad initial value: {variable} is not a state variable with an equation other than V')
+        for variable in self.reset:
+            if variable not in self.state_names:
+                raise ValueError(f'Bad reset: {variable} is not a state variable')
+
+        known = {*self.state_names, *self.param_names, 'I_ext', 't'}
+        for current, expression in self.currents.items():
+            _parse(expression, known)
+            known.add(current)
+        known.add('I_total')
+        for expression in self.equations.values():
+            _parse(expression, known)
+        for expression in (rate for rates in self.gates.values() for rate in rates):
+            _parse(expression, known - set(self.gates) - set(self.currents) - {'I_total'})
+        for expression in self.initial.values():
+            _parse(expression, {'V', 't', *self.param_names})
+        condition = {*self.state_names, *self.param_names, 't'}
+        if self.threshold is not None:
+            _parse(self.threshold, condition, condition=True)
+        for expression in self.reset.values():
+            _parse(expression, condition)
+
+    def _rhs_expressions(self) -> list[tuple[str, ast.expr]]:
+        # the outputs of the right-hand side in the order of evaluation: the currents, I_total, the derivatives and the rates of the gates
+        # (the names of the model cannot start with an underscore, so the names of the derivatives and the rates do not clash with them)
+        outputs = [(current, _parse(expression)) for current, expression in self.currents.items()]
+        outputs.append(('I_total', _parse(' + '.join([*self.currents, 'I_ext']))))
+        outputs.extend((f'_d_{variable}', _parse(expression)) for variable, expression in self.equations.items())
+        for gate, (alpha, beta) in self.gates.items():
+            outputs.extend(((f'_a_{gate}', _parse(alpha)), (f'_b_{gate}', _parse(beta))))
+        return outputs
+
+    def _code_key(self) -> str:
+        # the compiled functions depend on the expressions and the names of the parameters, but not on their values
+        description = self.describe()
+        description['params'] = list(self.param_names)
+        return json.dumps(description, sort_keys=True)
+
+    def compiled(self) -> dict[str, Any]:
+        """
+        Get the functions compiled from the equations (cached for all models with the same equations): 'rhs', 'threshold' and 'reset' evaluating the right-hand side, the spike condition and the reset values in place in scratch buffers, with the number of the buffers in 'buffers'. Used by `pyneural.neuron_models.EquationNeuronGroup`.
+        """
+        key = self._code_key()
+        if key not in EquationModel._cache:
+            state = ', '.join(self.state_names)
+            params = ', '.join(self.param_names)
+            compiler = _VectorCompiler()
+            lines = [f'def _rhs({state}, I_ext, t, {params}, _b, _m, _o):']
+            for i, (output, node) in enumerate(self._rhs_expressions()):
+                lines.extend(compiler.assign(node, f'_o[{i}]'))
+                lines.append(f'    {output} = _o[{i}]')
+            lines.append('    return _o')
+            lines.append(f'def _threshold({state}, t, {params}, _b, _m, _o):')
+            lines.extend(compiler.assign(_parse('False') if self.threshold is None else _parse(self.threshold), '_o'))
+            lines.append(f'def _reset({state}, t, {params}, _b, _m, _o):')
+            for i, expression in enumerate(self.reset.values()):
+                lines.extend(compiler.assign(_parse(expression), f'_o[{i}]'))
+            lines.append('    return _o')
+            namespace = {'np': np, **_UNARY_FUNCTIONS, **_BINARY_FUNCTIONS}
+            exec('\n'.join(lines), namespace)
+            EquationModel._cache[key] = {'rhs': namespace['_rhs'], 'threshold': namespace['_threshold'], 'reset': namespace['_reset'], 'buffers': compiler.N_buffers, 'kernels': {}}
+        return EquationModel._cache[key]
+
+    def kernel(self, integrator: str) -> Callable:
+        """
+        Get the kernel of the 'numba' backend for an integration scheme (compiled once for all models with the same equations). It advances a block of steps for all neurons like the kernels of the built-in models (see `pyneural.neuron_models.NeuronGroup.advance_compiled`).
+
+        :param integrator: integration scheme (one of `pyneural.neuron_models.NeuronGroup.INTEGRATORS`).
+        """
+        kernels = self.compiled()['kernels']
+        if integrator not in kernels:
+            kernels[integrator] = self._compile_kernel(integrator)
+        return kernels[integrator]
+
+    def _compile_kernel(self, integrator: str) -> Callable:
+        state = ', '.join(self.state_names)
+        params = ', '.join(self.param_names)
+        outputs = [output for output, _ in self._rhs_expressions()]
+        helpers = [f'def _rhs({state}, I_ext, t, {params}):']
+        helpers.extend(f'    {output} = {_unparse(node)}' for output, node in self._rhs_expressions())
+        helpers.append(f'    return ({", ".join(outputs)},)')
+        helpers.append(f'def _threshold({state}, t, {params}):')
+        helpers.append(f'    return {"False" if self.threshold is None else _unparse(_parse(self.threshold))}')
+        helpers.append(f'def _reset({state}, t, {params}):')
+        helpers.append(f'    return ({"".join(_unparse(_parse(expression)) + ", " for expression in self.reset.values())})')
+        namespace: dict[str, Any] = {**_SCALAR_FUNCTIONS, '_prange': _kernels._prange, '_detect': _kernels._detect}
+        exec('\n'.join(helpers), namespace)
+        for function in ('_rhs', '_threshold', '_reset'):
+            namespace[function] = _kernels._compile(namespace[function], parallel=False, cache=False)
+
+        # the names of the kernel start with an underscore, so they do not clash with the names of the model
+        arguments = ', '.join([*(f'_s_{variable}' for variable in self.state_names), '_Vm', '_I', *(f'_p_{name}' for name in self.param_names)])
+        lines = [f'def _kernel({arguments}, dt, _prev_V, _rising, _last_spike, _V_threshold, _refractory, _step, _peaks):']
+        lines.append('    for _i in _prange(_s_V.shape[0]):')
+        lines.extend(f'        {variable} = _s_{variable}[_i]' for variable in self.state_names)
+        lines.extend(f'        {name} = _p_{name}[_i]' for name in self.param_names)
+        lines.append('        _vm = _Vm[_i]')
+        lines.append('        for _k in range(_I.shape[0]):')
+        lines.append('            I_ext = _I[_k, _i]')
+        lines.append('            t = (_step + _k) * dt')
+        lines.extend(f'            {line}' for line in self._kernel_step(integrator, outputs))
+        lines.append('            _vm = V')
+        if self.threshold is not None:
+            lines.append(f'            if _threshold({state}, t, {params}):')
+            lines.append(f'                {"".join(variable + ", " for variable in self.reset)}= _reset({state}, t, {params})')
+        lines.append('            _detect(_vm, _i, _k, _step, _prev_V, _rising, _last_spike, _V_threshold, _refractory, _peaks)')
+        lines.extend(f'        _s_{variable}[_i] = {variable}' for variable in self.state_names)
+        lines.append('        _Vm[_i] = _vm')
+        exec('\n'.join(lines), namespace)
+        return _kernels._compile(namespace['_kernel'], cache=False)
+
+    def _kernel_step(self, integrator: str, outputs: list[str]) -> list[str]:
+        # the statements of a step of a single neuron in the kernel, in the same order of operations as `EquationNeuronGroup.advance`
+        params = ', '.join(self.param_names)
+        N_equations = len(self.equations)
+
+        def derivatives(stage: str, values: list[str], time: str = 't') -> list[str]:
+            # evaluates the derivatives of all state variables at the given values and time into the names `_k<stage>_<variable>`
+            lines = [f'{", ".join(outputs)}, = _rhs({", ".join(values)}, I_ext, {time}, {params})']
+            lines.extend(f'_k{stage}_{variable} = _d_{variable}' for variable in self.equations)
+            lines.extend(f'_k{stage}_{gate} = _a_{gate} * (1 - {value}) - _b_{gate} * {value}' for gate, value in zip(self.gates, values[N_equations:]))
+            return lines
+
+        if integrator == 'rk4':
+            lines = derivatives('1', list(self.state_names))
+            for stage, previous, step in (('2', '1', 'dt / 2'), ('3', '2', 'dt / 2'), ('4', '3', 'dt')):
+                lines.extend(f'_y_{variable} = ({step}) * _k{previous}_{variable} + {variable}' for variable in self.state_names)
+                lines.extend(derivatives(stage, [f'_y_{variable}' for variable in self.state_names], f't + ({step})'))
+            lines.extend(f'{variable} = {variable} + (2 * _k2_{variable} + _k1_{variable} + 2 * _k3_{variable} + _k4_{variable}) * (dt / 6)' for variable in self.state_names)
+            return lines
+
+        lines = derivatives('1', list(self.state_names))[:1]
+        lines.extend(f'{variable} = {variable} + _d_{variable} * dt' for variable in self.equations)
+        for gate in self.gates:
+            if integrator == 'exponential':
+                lines.append(f'_s = _a_{gate} + _b_{gate}')
+                lines.append(f'_x_inf = _a_{gate} / _s')
+                lines.append(f'{gate} = ({gate} - _x_inf) * exp(_s * -dt) + _x_inf')
+            else:
+                lines.append(f'{gate} = {gate} + (_a_{gate} * (1 - {gate}) - _b_{gate} * {gate}) * dt')
+        return lines
+
+
+def _parse(expression: str, known: Optional[set[str]] = None, condition: bool = False) -> ast.expr:
+    # parses an expression into its syntax tree with the constant subexpressions folded, checking the names if `known` is given
+    try:
+        tree = ast.parse(expression.strip(), mode='eval').body
+    except SyntaxError:
+        raise ValueError(f'Bad expression: {expression!r}')
+    if known is not None:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in _SCALAR_FUNCTIONS or node.keywords:
+                    raise ValueError(f'Bad expression {expression!r}: unknown function {ast.unparse(node.func)}')
+                if len(node.args) != (1 if node.func.id in _UNARY_FUNCTIONS else 2):
+                    raise ValueError(f'Bad expression {expression!r}: wrong number of arguments of {node.func.id}')
+            elif isinstance(node, ast.Name):
+                if node.id not in known and node.id not in _SCALAR_FUNCTIONS:
+                    raise ValueError(f'Bad expression {expression!r}: unknown name {node.id}')
+            elif isinstance(node, ast.Compare):
+                if not condition or len(node.ops) != 1 or type(node.ops[0]) not in _COMPARISONS:
+                    raise ValueError(f'Bad expression {expression!r}: comparisons are only allowed in a threshold condition, one at a time')
+            elif isinstance(node, ast.BinOp):
+                if type(node.op) not in _BINARY_OPERATORS or (isinstance(node.op, (ast.BitAnd, ast.BitOr)) and not condition):
+                    raise ValueError(f'Bad expression {expression!r}: unsupported operator {type(node.op).__name__}')
+            elif isinstance(node, ast.UnaryOp):
+                if not isinstance(node.op, (ast.USub, ast.UAdd)):
+                    raise ValueError(f'Bad expression {expression!r}: unsupported operator {type(node.op).__name__}')
+            elif isinstance(node, ast.Constant):
+                if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                    raise ValueError(f'Bad expression {expression!r}: unsupported constant {node.value!r}')
+            elif not isinstance(node, (ast.Load, ast.operator, ast.unaryop, ast.cmpop)):
+                raise ValueError(f'Bad expression {expression!r}: unsupported syntax {type(node).__name__}')
+    try:
+        return ast.fix_missing_locations(_Folder().visit(tree))
+    except ValueError as error:
+        raise ValueError(f'Bad expression {expression!r}: {error}')
+
+
+class _Folder(ast.NodeTransformer):
+    # folds the arithmetic of constants (e.g. `-0.1` or `1/80`), which Python would compute the same way at each step;
+    # raises ValueError if the arithmetic fails or does not give a real number
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.operand, ast.Constant) and isinstance(node.op, ast.USub):
+            return ast.copy_location(ast.Constant(-node.operand.value), node)
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant) and not isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+            try:
+                value = eval(compile(ast.Expression(node), '<constant>', 'eval'))
+            except ArithmeticError as error:
+                raise ValueError(str(error))
+            if not isinstance(value, (int, float)):
+                raise ValueError(f'the constant {value!r} is not a real number')
+            return ast.copy_location(ast.Constant(value), node)
+        return node
+
+
+def _unparse(node: ast.expr) -> str:
+    # the source of an expression for the compiled kernels, with the small integer powers computed by multiplications in the order of `_VectorCompiler`
+    return ast.unparse(_Powers().visit(copy.deepcopy(node)))
+
+
+class _Powers(ast.NodeTransformer):
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow) and isinstance(node.right, ast.Constant) and node.right.value in (2, 3, 4):
+            square = ast.BinOp(node.left, ast.Mult(), node.left)
+            if node.right.value == 3:
+                return ast.BinOp(square, ast.Mult(), node.left)
+            if node.right.value == 4:
+                return ast.BinOp(square, ast.Mult(), square)
+            return square
+        return node
+
+
+class _VectorCompiler:
+    # translates expressions into NumPy calls writing into the scratch buffers `_b[i]`, which are reused once their values are consumed
+
+    def __init__(self):
+        self.N_buffers = 0
+        self._free: list[str] = []
+        self._lines: list[str] = []
+
+    def assign(self, node: ast.expr, out: str) -> list[str]:
+        # the statements evaluating the expression into the array `out`
+        self._lines = []
+        operand = self._emit(node, out)
+        if operand != out:
+            self._lines.append(f'np.copyto({out}, {operand})')
+        return [f'    {line}' for line in self._lines]
+
+    def _acquire(self) -> str:
+        if self._free:
+            return self._free.pop()
+        self.N_buffers += 1
+        return f'_b[{self.N_buffers - 1}]'
+
+    def _release(self, *operands: str):
+        self._free.extend(operand for operand in operands if operand.startswith('_b[') and operand not in self._free)
+
+    def _call(self, function: str, operands: list[str], out: Optional[str]) -> str:
+        target = out or self._acquire()
+        self._lines.append(f'{function}({", ".join(operands)}, out={target})')
+        self._release(*(operand for operand in operands if operand != target))
+        return target
+
+    def _emit(self, node: ast.expr, out: Optional[str] = None) -> str:
+        # returns the name, the constant or the buffer holding the value of the node; the outermost operation writes into `out`
+        if isinstance(node, ast.Constant):
+            return repr(node.value)
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.UnaryOp):
+            operand = self._emit(node.operand)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            return self._call('np.negative', [operand], out)
+        if isinstance(node, ast.BinOp):
+            left = self._emit(node.left)
+            if isinstance(node.op, ast.Pow) and isinstance(node.right, ast.Constant) and node.right.value in (2, 3, 4):
+                # small integer powers are computed by multiplications
+                target = out or self._acquire()
+                power = node.right.value
+                self._lines.append(f'np.multiply({left}, {left}, out={target})')
+                if power == 3:
+                    self._lines.append(f'np.multiply({target}, {left}, out={target})')
+                elif power == 4:
+                    self._lines.append(f'np.multiply({target}, {target}, out={target})')
+                self._release(left)
+                return target
+            right = self._emit(node.right)
+            return self._call(_BINARY_OPERATORS[type(node.op)], [left, right], out)
+        if isinstance(node, ast.Compare):
+            left = self._emit(node.left)
+            right = self._emit(node.comparators[0])
+            return self._call(_COMPARISONS[type(node.ops[0])], [left, right], out)
+        if isinstance(node, ast.Call):
+            assert isinstance(node.func, ast.Name)
+            operands = [self._emit(arg) for arg in node.args]
+            if node.func.id == 'vtrap':
+                operands.append('mask=_m')
+            return self._call(node.func.id, operands, out)
+        raise ValueError(f'Bad expression: {ast.unparse(node)}')
+
+
+class EquationNeuronGroup(NeuronGroup):
+    """
+    Base class of the groups of neurons of the models defined by equations. The subclass of a model is created by `pyneural.neuron_models.EquationModel.group_class`.
+    """
+
+    MODEL: Optional[EquationModel] = None
+    """The equations of the model."""
+
+    def __init__(self, N_neurons: int, params: dict = {}):
+        """
+        Initialize a new group of neurons of the model.
+
+        Apart from the parameters specified in the base class `pyneural.neuron_models.NeuronGroup`, the parameters of the model (see `pyneural.neuron_models.EquationModel`) can be given as scalars or per-neuron arrays; the defaults of the model are used for the others.
+        """
+        model = type(self).MODEL
+        if model is None:
+            raise ValueError('EquationNeuronGroup is created for a model by EquationModel.group_class')
+        self._model = model
+        super().__init__(N_neurons, {**model.params, **params})
+        self._param_values = tuple(self._V_rest if name == 'V_rest' else self._V_threshold if name == 'V_threshold' else self._param(self.params, name, model.params[name])
+                                   for name in model.param_names)
+        self._states = (self._V, *(np.zeros(self.N_neurons, dtype=self.dtype) for _ in model.state_names[1:]))
+        self._Vm = self._V.copy()
+        self._fired = np.zeros(self.N_neurons, dtype=bool)
+        self._mask = np.zeros(self.N_neurons, dtype=bool)
+
+        functions = model.compiled()
+        self._rhs, self._threshold, self._reset = functions['rhs'], functions['threshold'], functions['reset']
+        self._buffers = tuple(np.zeros(self.N_neurons, dtype=self.dtype) for _ in range(functions['buffers']))
+        N_outputs = len(model.currents) + 1 + len(model.equations) + 2*len(model.gates)
+        self._outputs = tuple(np.zeros(self.N_neurons, dtype=self.dtype) for _ in range(N_outputs))
+        self._reset_values = tuple(np.zeros(self.N_neurons, dtype=self.dtype) for _ in model.reset)
+        self._rk4_buffers: Optional[tuple] = None
+        self._initialize()
+
+    def _initialize(self):
+        # sets the state variables to their initial values at the current membrane potential, and the gates to their stable states
+        model = self._model
+        namespace = {'V': self._V, 't': 0.0, **dict(zip(model.param_names, self._param_values)), **_UNARY_FUNCTIONS, 'minimum': np.minimum, 'maximum': np.maximum, 'vtrap': lambda x, y: _vtrap(x, y, np.zeros(np.broadcast(x, y).shape), np.zeros(np.broadcast(x, y).shape, dtype=bool))}
+        for variable, state in zip(model.state_names[1:len(model.equations)], self._states[1:]):
+            value = eval(compile(ast.Expression(_parse(model.initial[variable])), '<initial>', 'eval'), namespace) if variable in model.initial else 0.0
+            np.copyto(state, value, casting='unsafe')
+        gates = self._states[len(model.equations):]
+        for gate in gates:
+            gate.fill(0.0)
+        outputs = self._rhs(*self._states, np.zeros(self.N_neurons, dtype=self.dtype), 0.0, *self._param_values, self._buffers, self._mask, self._outputs)
+        rates = outputs[len(model.currents) + 1 + len(model.equations):]
+        for gate, alpha, beta in zip(gates, rates[0::2], rates[1::2]):
+            np.add(alpha, beta, out=gate)
+            np.divide(alpha, gate, out=gate)
+
+    @property
+    def state(self) -> dict[str, np.ndarray]:
+        """Dictionary mapping the name of each state variable to the numpy array of its values (owned by the group, do not modify)."""
+        return dict(zip(self._model.state_names, self._states))
+
+    def advance(self, I_ext: np.ndarray, t: float, dt: float, recorder: Optional[TraceRecorder] = None) -> np.ndarray:
+        model = self._model
+        N_currents, N_equations = len(model.currents) + 1, len(model.equations)
+        if self.integrator == 'rk4':
+            self._advance_rk4(I_ext, t, dt)
+        else:
+            outputs = self._rhs(*self._states, I_ext, t, *self._param_values, self._buffers, self._mask, self._outputs)
+            derivatives = outputs[N_currents:N_currents + N_equations]
+            rates = outputs[N_currents + N_equations:]
+            for x, derivative in zip(self._states, derivatives):
+                np.multiply(derivative, dt, out=self._work)
+                x += self._work
+            for x, alpha, beta in zip(self._states[N_equations:], rates[0::2], rates[1::2]):
+                if self.integrator == 'exponential':
+                    # x relaxes to x_inf = alpha/(alpha + beta) with the rate alpha + beta, the arrays of the rates are reused
+                    np.add(alpha, beta, out=beta)
+                    np.divide(alpha, beta, out=alpha)
+                    np.multiply(beta, -dt, out=beta)
+                    np.exp(beta, out=beta)
+                    x -= alpha
+                    x *= beta
+                    x += alpha
+                else:
+                    self._gate_derivative(x, alpha, beta, self._work)
+                    self._work *= dt
+                    x += self._work
+
+        Vm = self._V
+        if model.threshold is not None:
+            np.copyto(self._Vm, self._V)
+            Vm = self._Vm
+            self._threshold(*self._states, t, *self._param_values, self._buffers, self._mask, self._fired)
+            if self._fired.any():
+                self._reset(*self._states, t, *self._param_values, self._buffers, self._mask, self._reset_values)
+                states = dict(zip(model.state_names, self._states))
+                for variable, value in zip(model.reset, self._reset_values):
+                    np.copyto(states[variable], value, where=self._fired)
+
+        if recorder is not None:
+            recorder.record('Vm', Vm)
+            recorder.record('I_ext', I_ext)
+            # the currents are recorded at the beginning of the step
+            for name, current in zip((*model.currents, 'I_total'), self._outputs):
+                recorder.record(name, current)
+            for variable, x in zip(model.state_names[1:N_equations], self._states[1:N_equations]):
+                recorder.record(variable, x)
+            for gate, x in zip(model.gates, self._states[N_equations:]):
+                recorder.record(f'gate_{gate}', x)
+        return Vm
+
+    def _gate_derivative(self, x: np.ndarray, alpha: np.ndarray, beta: np.ndarray, out: np.ndarray) -> np.ndarray:
+        # alpha*(1 - x) - beta*x
+        np.subtract(1, x, out=out)
+        out *= alpha
+        np.multiply(beta, x, out=self._dV)
+        out -= self._dV
+        return out
+
+    def _derivatives(self, states: tuple[np.ndarray, ...], I_ext: np.ndarray, t: float, outputs: tuple[np.ndarray, ...], out: tuple[np.ndarray, ...]):
+        # writes the derivative of each state variable into `out`
+        model = self._model
+        N_currents, N_equations = len(model.currents) + 1, len(model.equations)
+        self._rhs(*states, I_ext, t, *self._param_values, self._buffers, self._mask, outputs)
+        for derivative, value in zip(out, outputs[N_currents:N_currents + N_equations]):
+            np.copyto(derivative, value)
+        rates = outputs[N_currents + N_equations:]
+        for derivative, x, alpha, beta in zip(out[N_equations:], states[N_equations:], rates[0::2], rates[1::2]):
+            self._gate_derivative(x, alpha, beta, derivative)
+
+    def _advance_rk4(self, I_ext: np.ndarray, t: float, dt: float):
+        # the stages are evaluated at their times into preallocated arrays; the currents of the first stage are kept in `_outputs` for the recording
+        if self._rk4_buffers is None:
+            zeros = lambda: tuple(np.zeros(self.N_neurons, dtype=self.dtype) for _ in self._states)
+            self._rk4_buffers = (zeros(), tuple(zeros() for _ in range(4)), tuple(np.zeros(self.N_neurons, dtype=self.dtype) for _ in self._outputs))
+        stage, (k1, k2, k3, k4), outputs = self._rk4_buffers
+        self._derivatives(self._states, I_ext, t, self._outputs, k1)
+        for k, previous, step in ((k2, k1, dt/2), (k3, k2, dt/2), (k4, k3, dt)):
+            for y, x, d in zip(stage, self._states, previous):
+                np.multiply(d, step, out=y)
+                y += x
+            self._derivatives(stage, I_ext, t + step, outputs, k)
+        for x, d1, d2, d3, d4 in zip(self._states, k1, k2, k3, k4):
+            np.multiply(d2, 2, out=self._work)
+            self._work += d1
+            np.multiply(d3, 2, out=self._dV)
+            self._work += self._dV
+            self._work += d4
+            self._work *= dt/6
+            x += self._work
+
+    def advance_compiled(self, I_rows: np.ndarray, dt: float, detector: SpikeDetector) -> bool:
+        params = (_kernels.per_neuron(value, self.N_neurons, self.dtype) for value in self._param_values)
+        peaks = np.zeros(I_rows.shape, dtype=bool)
+        self._model.kernel(self.integrator)(*self._states, self._Vm, I_rows, *params, dt, *detector.compiled_state(), peaks)
+        detector.add_peaks(peaks)
+        return True
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        return {variable: x.copy() for variable, x in zip(self._model.state_names, self._states)}
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        for variable, x in zip(self._model.state_names, self._states):
+            np.copyto(x, snapshot[variable])
+
+    def reset(self, V: Optional[np.ndarray] = None):
+        super().reset(V)
+        self._initialize()
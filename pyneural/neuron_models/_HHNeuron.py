@@ -1,14 +1,17 @@
 from typing import Optional
 import numpy as np
-from ..statistics import NeuronStepStatistics
-from ..ion_channels import HHIonChannelNa, HHIonChannelK, IonChannelConst
+from ..statistics import TraceRecorder, SpikeDetector
+from ..ion_channels import IonChannel, HHIonChannelNa, HHIonChannelK, IonChannelConst
 from ._Neuron import NeuronGroup
+from . import _kernels
 
 class HHNeuronGroup(NeuronGroup):
     """
     Implementation of the Hodgkin-Huxley model of a neuron.
     """
 
+    RECORDABLE = ('Vm', 'I_ext', 'I_total', 'I_leak', 'I_K', 'I_Na', 'g_leak', 'g_K', 'g_Na', 'gate_n', 'gate_m', 'gate_h')
+
     def __init__(self, N_neurons: int, params: dict = {}):
         """
         Initialize a new group of Hodgkin-Huxley neurons.
@@ -21,44 +24,175 @@ class HHNeuronGroup(NeuronGroup):
         :param params['E_L']: leak ion channels reversal potantial in mV (-59.4 by default).
         :param params['E_K']: potassium ion channels reversal potential in mV (-82.0 by default).
         :param params['E_Na']: sodium ion channels reversal potential in mV (45.0 by default).
+        :param params['rate_table']: if True, the rates of the ion gates are interpolated in precomputed tables instead of evaluating the rate functions at each step. Can also be a dictionary with the grid of the tables (keys 'V_min', 'V_max' and 'dV', see `pyneural.ion_channels.MarkovIonGate.set_rate_table`). False by default.
         """
 
         super().__init__(N_neurons, params)
         
-        self._E_L = params.get('E_L', -59.4)
-        self._E_K = params.get('E_K', -82)
-        self._E_Na = params.get('E_Na', 45)
+        self._E_L = self._param(params, 'E_L', -59.4)
+        self._E_K = self._param(params, 'E_K', -82)
+        self._E_Na = self._param(params, 'E_Na', 45)
+
+        self._C_m = self._param(params, 'C_m', 1.0)
+
+        self._g_L = IonChannelConst(self.N_neurons, self._param(params, 'gL', 0.3), self.dtype)
+        self._g_K = HHIonChannelK(self.N_neurons, self._param(params, 'gK', 36.0), self._V - self._V_rest, self.dtype)
+        self._g_Na = HHIonChannelNa(self.N_neurons, self._param(params, 'gNa', 120.0), self._V - self._V_rest, self.dtype)
+
+        rate_table = params.get('rate_table', False)
+        if rate_table:
+            grid = {} if rate_table is True else dict(rate_table)
+            self._g_K.set_rate_table(**grid)
+            self._g_Na.set_rate_table(**grid)
+
+        self._I_leak = np.zeros(self.N_neurons, dtype=self.dtype)
+        self._I_K = np.zeros(self.N_neurons, dtype=self.dtype)
+        self._I_Na = np.zeros(self.N_neurons, dtype=self.dtype)
+        self._I_total = np.zeros(self.N_neurons, dtype=self.dtype)
+        self._conducting = np.zeros(self.N_neurons, dtype=bool)
+
+        self.set_integrator(self.integrator)
+
+    def set_integrator(self, integrator: str):
+        super().set_integrator(integrator)
+        if hasattr(self, '_g_Na'):
+            # the rk4 scheme integrates the gates together with the membrane potential in `_advance_rk4`
+            gate_integrator = 'exponential' if integrator == 'exponential' else 'euler'
+            self._g_K.set_integrator(gate_integrator)
+            self._g_Na.set_integrator(gate_integrator)
+
+    def rate_table_error(self) -> dict[str, dict[str, float]]:
+        """
+        Report the maximal relative interpolation error of the rate tables for each gate ('n', 'm' and 'h'). Returns an empty dictionary if the rate tables are not used.
+        """
+        gates = {'n': self._g_K._n_gate, 'm': self._g_Na._m_gate, 'h': self._g_Na._h_gate}
+        return {name: gate.rate_table.max_error for name, gate in gates.items() if gate.rate_table is not None}
+
+    def advance(self, I_ext: np.ndarray, t: float, dt: float, recorder: Optional[TraceRecorder] = None) -> np.ndarray:
+        if self.integrator == 'rk4':
+            self._advance_rk4(I_ext, dt)
+        else:
+            self._advance_channels(I_ext, t, dt)
+
+        if recorder is not None:
+            recorder.record('g_leak', self._g_L.g)
+            recorder.record('g_K', self._g_K.g)
+            recorder.record('g_Na', self._g_Na.g)
+            recorder.record('I_leak', self._I_leak)
+            recorder.record('I_K', self._I_K)
+            recorder.record('I_Na', self._I_Na)
+            recorder.record('I_ext', I_ext)
+            recorder.record('I_total', self._I_total)
+            recorder.record('Vm', self._V)
+            recorder.record('gate_n', self._g_K._n_gate.state)
+            recorder.record('gate_m', self._g_Na._m_gate.state)
+            recorder.record('gate_h', self._g_Na._h_gate.state)
+        return self._V
+
+    def advance_compiled(self, I_rows: np.ndarray, dt: float, detector: SpikeDetector) -> bool:
+        # the kernel evaluates the rate functions directly, so the rate tables and the rk4 scheme are left to the NumPy engine
+        gates = self._g_K._n_gate, self._g_Na._m_gate, self._g_Na._h_gate
+        if self.integrator == 'rk4' or any(gate.rate_table is not None for gate in gates):
+            return False
+        params = (_kernels.per_neuron(param, self.N_neurons, self.dtype)
+                  for param in (self._g_K._g_max, self._g_Na._g_max, self._E_L, self._E_K, self._E_Na, self._C_m, self._V_rest))
+        peaks = np.zeros(I_rows.shape, dtype=bool)
+        _kernels.hh_kernel(self._V, *(gate.state for gate in gates), self._g_L.g, *params, I_rows, self.integrator == 'exponential', dt,
+                           self._g_K.g, self._g_Na.g, self._I_leak, self._I_K, self._I_Na, self._I_total, *detector.compiled_state(), peaks)
+        detector.add_peaks(peaks)
+        return True
+
+    def _advance_channels(self, I_ext: np.ndarray, t: float, dt: float):
+        if self.profiler is not None:
+            start = self.profiler.clock()
+        np.subtract(self._V, self._V_rest, out=self._dV)
+        self._g_L.update_g(self._dV, t, dt)
+        self._g_K.update_g(self._dV, t, dt)
+        self._g_Na.update_g(self._dV, t, dt)
+        if self.profiler is not None:
+            self.profiler.add('channels', start)
+
+        # I = -g * (V - E) for each channel
+        self._channel_current(self._g_L.g, self._E_L, self._I_leak)
+        self._channel_current(self._g_K.g, self._E_K, self._I_K)
+        self._channel_current(self._g_Na.g, self._E_Na, self._I_Na)
+        np.add(self._I_leak, self._I_K, out=self._I_total)
+        self._I_total += self._I_Na
+        self._I_total += I_ext
+
+        if self.integrator == 'exponential':
+            # with the conductances constant during a step, V relaxes exponentially with the rate G/C_m (G is the total conductance)
+            # to the value where I_total is zero: V += I_total/G * (1 - exp(-G*dt/C_m)), which tends to the Euler step I_total*dt/C_m for G -> 0
+            np.add(self._g_L.g, self._g_K.g, out=self._work)
+            self._work += self._g_Na.g
+            np.multiply(self._work, -dt, out=self._dV)
+            self._dV /= self._C_m
+            np.expm1(self._dV, out=self._dV)
+            np.negative(self._dV, out=self._dV)
+            np.greater(self._work, 0, out=self._conducting)
+            np.divide(self._dV, self._work, out=self._dV, where=self._conducting)
+            np.logical_not(self._conducting, out=self._conducting)
+            np.divide(dt, self._C_m, out=self._dV, where=self._conducting)
+            self._dV *= self._I_total
+            self._V += self._dV
+        else:
+            np.multiply(self._I_total, dt, out=self._work)
+            self._work /= self._C_m
+            self._V += self._work  # since dV/dt = CI
 
-        self._C_m = params.get('C_m', 1.0)
+    def _derivatives(self, V: np.ndarray, n: np.ndarray, m: np.ndarray, h: np.ndarray, I_ext: np.ndarray) -> tuple[tuple[np.ndarray, ...], tuple[np.ndarray, ...]]:
+        gates = self._g_K._n_gate, self._g_Na._m_gate, self._g_Na._h_gate
+        dx = []
+        for gate, x in zip(gates, (n, m, h)):
+            alpha, beta = gate.rates(V - self._V_rest)
+            dx.append(alpha * (1 - x) - beta * x)
+        I_leak = -self._g_L.g * (V - self._E_L)
+        I_K = -self._g_K._g_max * np.power(n, 4) * (V - self._E_K)
+        I_Na = -self._g_Na._g_max * np.power(m, 3) * h * (V - self._E_Na)
+        I_total = I_leak + I_K + I_Na + I_ext
+        return (I_total / self._C_m, *dx), (I_leak, I_K, I_Na, I_total)
 
-        self._g_L = IonChannelConst(self.N_neurons, params.get('gL', 0.3))
-        self._g_K = HHIonChannelK(self.N_neurons, params.get('gK', 36.0), self._V - self._V_rest)
-        self._g_Na = HHIonChannelNa(self.N_neurons, params.get('gNa', 120.0), self._V - self._V_rest)
+    def _advance_rk4(self, I_ext: np.ndarray, dt: float):
+        # the gates and the membrane potential are integrated together, the intermediate stages allocate new arrays
+        gates = self._g_K._n_gate, self._g_Na._m_gate, self._g_Na._h_gate
+        y = (self._V, *(gate.state for gate in gates))
+        k1, currents = self._derivatives(*y, I_ext)
+        k2, _ = self._derivatives(*(x + dt/2*k for x, k in zip(y, k1)), I_ext)
+        k3, _ = self._derivatives(*(x + dt/2*k for x, k in zip(y, k2)), I_ext)
+        k4, _ = self._derivatives(*(x + dt*k for x, k in zip(y, k3)), I_ext)
+        for x, d1, d2, d3, d4 in zip(y, k1, k2, k3, k4):
+            x += dt/6*(d1 + 2*d2 + 2*d3 + d4)
 
-    def step(self, I_ext: np.ndarray, t: float, dt: float) -> NeuronStepStatistics:
-        stats = NeuronStepStatistics()
-        stats.T = t
+        # currents are reported at the beginning of the step, conductances at the end of it
+        for buffer, current in zip((self._I_leak, self._I_K, self._I_Na, self._I_total), currents):
+            np.copyto(buffer, current)
+        self._g_K._update_conductance()
+        self._g_Na._update_conductance()
 
-        stats.g_leak = self._g_L.update_g(self._V - self._V_rest, t, dt).copy()
-        stats.g_K = self._g_K.update_g(self._V - self._V_rest, t, dt).copy()
-        stats.g_Na = self._g_Na.update_g(self._V - self._V_rest, t, dt).copy()
+    def _channel_current(self, g: np.ndarray, E: float, out: np.ndarray):
+        np.subtract(self._V, E, out=out)
+        out *= g
+        np.negative(out, out=out)
 
-        I_leak: np.ndarray = -self._g_L.g * (self._V - self._E_L)
-        I_K: np.ndarray = -self._g_K.g * (self._V - self._E_K)
-        I_Na: np.ndarray = -self._g_Na.g * (self._V - self._E_Na)
-        stats.I_leak, stats.I_K, stats.I_Na, stats.I_ext, stats.I_total = I_leak, I_K, I_Na, I_ext, (I_leak + I_K + I_Na + I_ext)
+    def _channels(self) -> dict[str, IonChannel]:
+        return {'leak': self._g_L, 'K': self._g_K, 'Na': self._g_Na}
 
-        self._V += stats.I_total * dt / self._C_m  # since dV/dt = CI
-        stats.Vm = self._V.copy()
+    def snapshot(self) -> dict[str, np.ndarray]:
+        snapshot = super().snapshot()
+        for channel_name, channel in self._channels().items():
+            snapshot.update({f'{channel_name}.{name}': value for name, value in channel.snapshot().items()})
+        return snapshot
 
-        stats.gate_n = self._g_K._n_gate.state.copy()
-        stats.gate_m = self._g_Na._m_gate.state.copy()
-        stats.gate_h = self._g_Na._h_gate.state.copy()
-        return stats
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        super().restore(snapshot)
+        for channel_name, channel in self._channels().items():
+            prefix = f'{channel_name}.'
+            channel.restore({name[len(prefix):]: value for name, value in snapshot.items() if name.startswith(prefix)})
 
     def reset(self, V: Optional[np.ndarray] = None):
         super().reset(V)
-        self._g_L.reset(self._V - self._V_rest)
-        self._g_K.reset(self._V - self._V_rest)
-        self._g_Na.reset(self._V - self._V_rest)
+        np.subtract(self._V, self._V_rest, out=self._dV)
+        self._g_L.reset(self._dV)
+        self._g_K.reset(self._dV)
+        self._g_Na.reset(self._dV)
 
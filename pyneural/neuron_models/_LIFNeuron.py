@@ -1,7 +1,8 @@
 from typing import Optional
 import numpy as np
-from ..statistics import NeuronStepStatistics
+from ..statistics import TraceRecorder, SpikeDetector
 from ._ConstCondNeuron import ConstCondNeuronGroup
+from . import _kernels
 
 class LIFNeuronGroup(ConstCondNeuronGroup):
     """
@@ -19,16 +20,62 @@ class LIFNeuronGroup(ConstCondNeuronGroup):
         :param params['V_threshold']: threshold potential in mV (-50.0 by default).
         """
         super().__init__(N_neurons, params)
-        self._V_reset = params.get('V_reset', -75.0)
-        self._V_spike = params.get('V_spike', 35.0)
-        self._V_threshold = params.get('V_threshold', -50.0)
+        self._V_reset = self._param(params, 'V_reset', -75.0)
+        self._V_spike = self._param(params, 'V_spike', 35.0)
+        self._V_threshold = self._param(params, 'V_threshold', -50.0)
+        self._Vm = self._V.copy()
+        self._fired = np.zeros(self.N_neurons, dtype=bool)
 
 
-    def step(self, I_ext: np.ndarray, t: float, dt: float) -> NeuronStepStatistics:
-        stats = super().step(I_ext, t, dt)
-        stats.Vm[self._V > self._V_threshold] = self._V_spike
-        self._V[self._V > self._V_threshold] = self._V_reset
-        return stats
+    def advance(self, I_ext: np.ndarray, t: float, dt: float, recorder: Optional[TraceRecorder] = None) -> np.ndarray:
+        self._integrate(I_ext, t, dt, recorder)
+        np.greater(self._V, self._V_threshold, out=self._fired)
+        np.copyto(self._Vm, self._V)
+        np.copyto(self._Vm, self._V_spike, where=self._fired)
+        np.copyto(self._V, self._V_reset, where=self._fired)
+        if recorder is not None:
+            recorder.record('Vm', self._Vm)
+        return self._Vm
+
+    def advance_compiled(self, I_rows: np.ndarray, dt: float, detector: SpikeDetector) -> bool:
+        peaks = np.zeros(I_rows.shape, dtype=bool)
+        V_reset, V_spike, V_threshold = (_kernels.per_neuron(param, self.N_neurons, self.dtype) for param in (self._V_reset, self._V_spike, self._V_threshold))
+        _kernels.lif_kernel(self._V, self._Vm, I_rows, *self._kernel_params(dt), V_reset, V_spike, V_threshold, *detector.compiled_state(), peaks)
+        detector.add_peaks(peaks)
+        return True
+
+    def advance_exact(self, I_ext: np.ndarray, t0: float, duration: float) -> tuple[np.ndarray, np.ndarray]:
+        V_threshold, V_reset, tau = (np.broadcast_to(np.asarray(param, dtype=np.float64), self._V.shape) for param in (self._V_threshold, self._V_reset, self._tau))
+        if np.any(V_reset >= V_threshold):
+            raise ValueError('Event-driven simulation requires V_reset < V_threshold')
+        V_inf = self._stable_potential(I_ext)
+        V_start = self._V.astype(np.float64)
+        firing = np.flatnonzero((V_inf > V_threshold) | (V_start > V_threshold))
+        if firing.size == 0:
+            self._relax(V_inf, V_start, np.float64(duration))
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        # time to the first crossing of the threshold, and the (constant) interval between the following spikes
+        V_inf_f, V_threshold_f, V_reset_f, tau_f = V_inf[firing], V_threshold[firing], V_reset[firing], tau[firing]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            first = np.where(V_start[firing] > V_threshold_f, 0.0,
+                             tau_f*np.log((V_inf_f - V_start[firing])/(V_inf_f - V_threshold_f)))
+            period = np.where(V_inf_f > V_threshold_f,
+                              tau_f*np.log((V_inf_f - V_reset_f)/(V_inf_f - V_threshold_f)), np.inf)
+        N_spikes = np.where(first < duration, np.ceil((duration - first)/period), 0).astype(np.int64)
+        N_spikes[(first < duration) & (N_spikes == 0)] = 1
+
+        # the neurons that spiked relax from the reset potential since their last spike
+        elapsed = np.full(self.N_neurons, np.float64(duration))
+        V_start[firing[N_spikes > 0]] = V_reset_f[N_spikes > 0]
+        elapsed[firing] = np.where(N_spikes > 0, duration - (first + (N_spikes - 1)*np.where(N_spikes > 1, period, 0)), duration)
+        self._relax(V_inf, V_start, elapsed)
+
+        neurons = np.repeat(firing, N_spikes)
+        index = np.arange(neurons.size) - np.repeat(np.cumsum(N_spikes) - N_spikes, N_spikes)
+        times = t0 + np.repeat(first, N_spikes) + index*np.repeat(np.where(N_spikes > 1, period, 0), N_spikes)
+        order = np.argsort(times, kind='stable')
+        return neurons[order], times[order]
 
     def reset(self, V: Optional[np.ndarray] = None):
         return super().reset(V)
@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import Optional, Union
 from abc import ABC, abstractmethod
 import numpy as np
-from ..statistics import NeuronStepStatistics
+from ..statistics import NeuronStepStatistics, TraceRecorder, SpikeDetector, Profiler
 
 
 class NeuronGroup(ABC):
@@ -9,22 +9,86 @@ class NeuronGroup(ABC):
     A base class for models of a group of independent neurons, which specifies the main parameters of any neuron cell. 
 
     """
+
+    RECORDABLE: tuple[str, ...] = ('Vm', 'I_ext', 'I_total')
+    """Names of the variables this model can record (see `pyneural.statistics.NeuronStepStatistics`)."""
+
+    INTEGRATORS: tuple[str, ...] = ('euler', 'exponential', 'rk4')
+    """Names of the available integration schemes: forward Euler, exponential integration and the classical 4th order Runge-Kutta method."""
+
+    EVENT_DRIVEN: bool = False
+    """Whether the model can be simulated exactly for a piecewise-constant stimulation with `advance_exact` (see `pyneural.NeuralModel.simulate_event_driven`)."""
    
     def __init__(self, N_neurons: int = 1, params: dict = {}):#V_start=-70, V_rest=-70, C_m=1, E_L=-59.4, E_K=-82, E_Na=45, gL=0.3, gK=36.0, gNa=120.0):
         """
         Initialize a new neuron.
 
-        :param N_neurons: number of neurons in a group.
+        :param N_neurons: number of neurons in a group (in each trial, see `params['n_trials']`).
         :param params['V_rest']: resting potential in mV (-70.0 by default).
         :param params['V']: starting membrane potential for each cell in mV (by default, all initialized to be equal to the resting potential).
         :param params['V_threshold']: threshold voltage in mV (0.0 by default). This is the value of membrane potential that certainly generates a spike. Needed for spike detection.
+        :param params['integrator']: integration scheme, one of `INTEGRATORS` ('euler' by default).
+        :param params['dtype']: floating point type of the state of the neurons and their ion channels (float64 by default). float32 halves the memory traffic at the cost of precision.
+        :param params['n_trials']: number of independent Monte-Carlo trials of the group (1 by default). The state of `n_trials` copies of the neurons is kept in a single group and stepped together: `N_neurons` becomes `n_trials` times larger, and the neuron `j` of the trial `i` has the index `i*N_trial_neurons + j`.
+        Numeric parameters of all models can also be numpy arrays of length `N_neurons` with a separate value for each neuron, which allows parameter sweeps to run as a single group (see `pyneural.NeuralModel.sweep`). With multiple trials, arrays of length `N_trial_neurons` are repeated for each trial.
         Note that the conductances of ion channels are not specidied in the base class constructor since they differ in different models.
         """
-        self.N_neurons: int = N_neurons
-        self._V_rest: float = params.get('V_rest', -70.0)
-        self._V: np.ndarray = params.get('V_start', np.zeros(self.N_neurons) + self._V_rest)
-        self._V_threshold = params.get('V_threshold', 0.0)
-        self._max_spike_frequency = params.get("max_spike_f", 0.5)
+        self.n_trials: int = int(params.get('n_trials', 1))
+        """Number of Monte-Carlo trials simulated by the group."""
+        if self.n_trials < 1:
+            raise ValueError(f'Bad number of trials: {self.n_trials}')
+        self.N_trial_neurons: int = N_neurons
+        """Number of neurons in each trial."""
+        self.N_neurons: int = N_neurons * self.n_trials
+        """Total number of simulated neurons in all trials."""
+        self.params: dict = dict(params)
+        """Parameters the group was created with."""
+        self.dtype: np.dtype = np.dtype(params.get('dtype', np.float64))
+        """Floating point type of the state of the neurons."""
+        if self.dtype.kind != 'f':
+            raise ValueError(f'Bad dtype: {self.dtype}, a floating point type is required')
+        self._V_rest: Union[float, np.ndarray] = self._param(params, 'V_rest', -70.0)
+        self._V: np.ndarray = np.array(np.broadcast_to(self._param(params, 'V_start', self._V_rest), (self.N_neurons,)), dtype=self.dtype)
+        self._V_threshold = self._param(params, 'V_threshold', 0.0)
+        self._max_spike_frequency = self._param(params, 'max_spike_f', 0.5)
+
+        # scratch buffers reused by the steps of a simulation to avoid allocating temporary arrays
+        self._work: np.ndarray = np.zeros(self.N_neurons, dtype=self.dtype)
+        self._dV: np.ndarray = np.zeros(self.N_neurons, dtype=self.dtype)
+
+        self.profiler: Optional[Profiler] = None
+        """`pyneural.statistics.Profiler` timing the phases inside the steps of the model (set by `pyneural.NeuralModel` for the duration of a profiled simulation)."""
+
+        self.integrator: str = 'euler'
+        """Integration scheme used by the simulation steps (one of `INTEGRATORS`)."""
+        self.set_integrator(params.get('integrator', 'euler'))
+
+    def _param(self, params: dict, name: str, default: float) -> Union[float, np.ndarray]:
+        # scalar parameters are kept as they are, per-neuron parameters are converted to arrays of the dtype of the group
+        value = params.get(name, default)
+        if np.ndim(value) == 0:
+            return value
+        value = np.asarray(value, dtype=self.dtype)
+        if value.shape == (self.N_trial_neurons,):
+            return np.tile(value, self.n_trials)
+        if value.shape != (self.N_neurons,):
+            raise ValueError(f'Bad shape of parameter {name}: {value.shape}, expected a scalar, ({self.N_trial_neurons},) or ({self.N_neurons},)')
+        return value
+
+    @property
+    def V(self) -> np.ndarray:
+        """Numpy array containing the current membrane potential of each neuron in mV (owned by the group, do not modify)."""
+        return self._V
+
+    def set_integrator(self, integrator: str):
+        """
+        Set the integration scheme used by the simulation steps.
+
+        :param integrator: 'euler' for the forward Euler method, 'exponential' for the exponential integration (exact for linear membrane equations, Rush-Larsen updates for the ion gates) or 'rk4' for the classical 4th order Runge-Kutta method.
+        """
+        if integrator not in self.INTEGRATORS:
+            raise ValueError(f'Bad integrator: {integrator}')
+        self.integrator = integrator
 
        
     def reset(self, V: Optional[np.ndarray] = None):
@@ -34,12 +98,85 @@ class NeuronGroup(ABC):
         :param V: numpy array containing new membrane potentials for each neuron in mV. If not specified, neurons are set to the resting potential.
         """
 
-        if not V:
-            self._V = np.zeros(self.N_neurons) + self._V_rest 
+        if V is None:
+            self._V[:] = self._V_rest
         else:
-            self._V = V.copy()
+            self._V[:] = V
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Capture the state of the neurons (and their ion channels). Returns a dictionary of numpy arrays (copies), which can be passed to `restore` to continue a simulation from this point.
+        """
+        return {'V': self._V.copy()}
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        """
+        Restore the state of the neurons captured by `snapshot`.
+
+        :param snapshot: dictionary returned by `snapshot`.
+        """
+        np.copyto(self._V, snapshot['V'])
+
+    def split(self, start: int, stop: int) -> 'NeuronGroup':
+        """
+        Create a separate group of the neurons `[start, stop)` of this group, with their parameters, integration scheme and current state. Used to step tiles of a large group in parallel threads (see the `threads` parameter of `pyneural.NeuralModel.simulate_neurons`); `join` collects the state of the tiles back.
+
+        :param start: index of the first neuron of the tile.
+        :param stop: index after the last neuron of the tile.
+        """
+        params = {**self.params, 'n_trials': 1}
+        for name, value in self.params.items():
+            if name != 'n_trials' and np.ndim(value) == 1:
+                value = np.asarray(value)
+                if value.shape == (self.N_trial_neurons,):
+                    value = np.tile(value, self.n_trials)
+                params[name] = value[start:stop]
+        tile = type(self)(stop - start, params)
+        tile.set_integrator(self.integrator)
+        tile.restore({name: value[start:stop] for name, value in self.snapshot().items()})
+        return tile
+
+    def join(self, tiles: list['NeuronGroup']):
+        """
+        Set the state of this group from the consecutive tiles created by `split`.
+
+        :param tiles: groups covering all neurons of this group, in order.
+        """
+        snapshots = [tile.snapshot() for tile in tiles]
+        self.restore({name: np.concatenate([snapshot[name] for snapshot in snapshots]) for name in snapshots[0]})
+
+    def advance_compiled(self, I_rows: np.ndarray, dt: float, detector: SpikeDetector) -> bool:
+        """
+        Advance the neurons by a step for each row of the external stimulation with a compiled kernel, which fuses the steps and the spike detection into a single pass parallelized over the neurons (the 'numba' backend of `pyneural.NeuralModel`). Nothing is recorded. Returns False without changing anything if the model (or its integration scheme and options) has no compiled kernel, the steps are then simulated with `advance`.
+
+        :param I_rows: numpy array of shape `(N_steps, N_neurons)` containing the external stimulation of each step.
+        :param dt: time between two consecutive simulation steps in ms.
+        :param detector: `pyneural.statistics.SpikeDetector` of the simulation, which is updated with the steps.
+        """
+        return False
+
+    def advance_exact(self, I_ext: np.ndarray, t0: float, duration: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Advance the neurons by `duration` ms with a constant external stimulation, using the closed-form solution of the model instead of time steps. Returns numpy arrays with the neuron index and the exact time in ms of each spike in the interval, in the order of occurrence. Only available for models with `EVENT_DRIVEN` set.
+
+        :param I_ext: external stimulation for each neuron cell.
+        :param t0: time at the start of the interval in ms.
+        :param duration: length of the interval in ms.
+        """
+        raise ValueError(f'{type(self).__name__} does not support event-driven simulations')
 
     @abstractmethod
+    def advance(self, I_ext: np.ndarray, t: float, dt: float, recorder: Optional[TraceRecorder] = None) -> np.ndarray:
+        """
+        Perform one step of a simulation, writing the recorded variables directly into the recorder. The state is updated in place using the scratch buffers of the group, so no arrays are allocated. Returns the observed membrane potential for each neuron in mV (the array is owned by the model and is overwritten by the next step).
+
+        :param I_ext: external stimulation for each neuron cell.
+        :param t: current time in ms.
+        :param dt: time between two consecutive simulation steps in ms.
+        :param recorder: `pyneural.statistics.TraceRecorder` object to write the variables of this step into (nothing is recorded by default).
+        """
+        pass
+
     def step(self, I_ext: np.ndarray, t: float, dt: float) -> NeuronStepStatistics:
         """
         Perform one step of a simulation. Returns a `pyneural.statistics.NeuronStepStatistics` object.
@@ -48,5 +185,7 @@ class NeuronGroup(ABC):
         :param t: current time in ms.
         :param dt: time between two consecutive simulation steps in ms.
         """
-        pass
+        recorder = TraceRecorder(1, self.N_neurons, self.RECORDABLE, self.dtype)
+        self.advance(I_ext, t, dt, recorder)
+        return recorder.step_statistics(0, t)
 
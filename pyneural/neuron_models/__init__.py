@@ -6,10 +6,13 @@ from ._Neuron import NeuronGroup
 from ._HHNeuron import HHNeuronGroup
 from ._LIFNeuron import LIFNeuronGroup
 from ._ConstCondNeuron import ConstCondNeuronGroup
+from ._EquationModel import EquationModel, EquationNeuronGroup
 
 __all__ = [
     'NeuronGroup',
     'ConstCondNeuronGroup',
     'LIFNeuronGroup',
     'HHNeuronGroup',
+    'EquationModel',
+    'EquationNeuronGroup',
 ]
@@ -0,0 +1,151 @@
+"""
+Compiled step kernels of the neuron models, used by the 'numba' backend of `pyneural.NeuralModel` (see `pyneural.neuron_models.NeuronGroup.advance_compiled`).
+
+Each kernel advances a block of steps for all neurons: the loop over the neurons is parallel, and each neuron runs the whole block with its state in registers, including the spike detection of `pyneural.statistics.SpikeDetector`. The arithmetic follows the operations of the NumPy engine in the same order.
+
+Numba is an optional dependency: without it, the kernels are plain Python functions and are only useful for testing.
+"""
+
+import math
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+AVAILABLE: bool = numba is not None
+"""Whether numba is installed, so the kernels are compiled."""
+
+_prange = range if numba is None else numba.prange
+
+
+def _compile(function, parallel: bool = True, cache: bool = True):
+    # generated functions have no source file, so numba cannot cache them on the disk;
+    # divisions by zero give inf and nan as in the NumPy engine (e.g. the 0/0 of the HH rate functions at V - V_rest = 10 or 25)
+    # instead of raising ZeroDivisionError
+    if numba is None:
+        return function
+    return numba.njit(parallel=parallel, cache=cache, error_model='numpy')(function)
+
+
+def _detect(Vm, i, k, step, prev_V, rising, last_spike, V_threshold, refractory, peaks):
+    # the update of `SpikeDetector` for a single neuron: a spike is reported at the previous step if the potential was rising into it,
+    # does not rise after it, exceeds the threshold and the neuron is not refractory
+    prev = prev_V[i]
+    peak_step = step + k - 1
+    if Vm <= prev and rising[i] and prev >= V_threshold[i] and peak_step - last_spike[i] >= refractory[i]:
+        peaks[k, i] = True
+        last_spike[i] = peak_step
+    rising[i] = Vm > prev
+    prev_V[i] = Vm
+
+
+_detect = _compile(_detect, parallel=False)
+
+
+def _const_cond(V, I, V_rest, g_m, tau, factor, euler, dt, prev_V, rising, last_spike, V_threshold, refractory, step, peaks):
+    for i in _prange(V.shape[0]):
+        v = V[i]
+        for k in range(I.shape[0]):
+            dv = V_rest[i] - v
+            dv += I[k, i] / g_m[i]
+            if euler:
+                dv *= dt
+                dv /= tau[i]
+            else:
+                dv *= factor[i]
+            v += dv
+            _detect(v, i, k, step, prev_V, rising, last_spike, V_threshold, refractory, peaks)
+        V[i] = v
+
+
+const_cond_kernel = _compile(_const_cond)
+"""Kernel of `pyneural.neuron_models.ConstCondNeuronGroup`."""
+
+
+def _lif(V, Vm, I, V_rest, g_m, tau, factor, euler, dt, V_reset, V_spike, V_fire, prev_V, rising, last_spike, V_threshold, refractory, step, peaks):
+    for i in _prange(V.shape[0]):
+        v = V[i]
+        vm = Vm[i]
+        for k in range(I.shape[0]):
+            dv = V_rest[i] - v
+            dv += I[k, i] / g_m[i]
+            if euler:
+                dv *= dt
+                dv /= tau[i]
+            else:
+                dv *= factor[i]
+            v += dv
+            vm = v
+            if v > V_fire[i]:
+                vm = V_spike[i]
+                v = V_reset[i]
+            _detect(vm, i, k, step, prev_V, rising, last_spike, V_threshold, refractory, peaks)
+        V[i] = v
+        Vm[i] = vm
+
+
+lif_kernel = _compile(_lif)
+"""Kernel of `pyneural.neuron_models.LIFNeuronGroup`."""
+
+
+def _gate(x, a, b, exponential, dt):
+    # the update of `MarkovIonGate` with the rates evaluated directly
+    if exponential:
+        b = a + b
+        a = a / b
+        return a + (x - a) * math.exp(b * -dt)
+    return x + (a * (1 - x) - b * x) * dt
+
+
+_gate = _compile(_gate, parallel=False)
+
+
+def _hh(V, n, m, h, g_L, g_K_max, g_Na_max, E_L, E_K, E_Na, C_m, V_rest, I, exponential, dt, g_K, g_Na, I_leak, I_K, I_Na, I_total,
+        prev_V, rising, last_spike, V_threshold, refractory, step, peaks):
+    for i in _prange(V.shape[0]):
+        v, x_n, x_m, x_h = V[i], n[i], m[i], h[i]
+        gL = g_L[i]
+        gK, gNa, i_leak, i_K, i_Na, i_total = g_K[i], g_Na[i], I_leak[i], I_K[i], I_Na[i], I_total[i]
+        for k in range(I.shape[0]):
+            u = v - V_rest[i]
+            w = 10 - u
+            x_n = _gate(x_n, (w / 100) / (math.exp(0.1 * w) - 1), math.exp(-u / 80) * 0.125, exponential, dt)
+            w = 25 - u
+            x_m = _gate(x_m, (w / 10) / (math.exp(0.1 * w) - 1), math.exp(-u / 18) * 4, exponential, dt)
+            x_h = _gate(x_h, math.exp(-u / 20) * 0.07, 1 / (math.exp((30 - u) / 10) + 1), exponential, dt)
+
+            gK = x_n ** 4.0 * g_K_max[i]
+            gNa = x_m ** 3.0 * g_Na_max[i] * x_h
+            i_leak = -((v - E_L[i]) * gL)
+            i_K = -((v - E_K[i]) * gK)
+            i_Na = -((v - E_Na[i]) * gNa)
+            i_total = i_leak + i_K + i_Na + I[k, i]
+            if exponential:
+                G = gL + gK + gNa
+                if G > 0:
+                    v += -math.expm1(G * -dt / C_m[i]) / G * i_total
+                else:
+                    # the limit of the exponential step for G -> 0
+                    v += dt / C_m[i] * i_total
+            else:
+                v += i_total * dt / C_m[i]
+            _detect(v, i, k, step, prev_V, rising, last_spike, V_threshold, refractory, peaks)
+        V[i], n[i], m[i], h[i] = v, x_n, x_m, x_h
+        g_K[i], g_Na[i], I_leak[i], I_K[i], I_Na[i], I_total[i] = gK, gNa, i_leak, i_K, i_Na, i_total
+
+
+hh_kernel = _compile(_hh)
+"""Kernel of `pyneural.neuron_models.HHNeuronGroup` (Euler and exponential integration with the rate functions evaluated directly)."""
+
+
+def per_neuron(value, N_neurons: int, dtype) -> np.ndarray:
+    """
+    Convert a scalar or per-neuron parameter into a contiguous array of length `N_neurons`, the form the kernels take all parameters in.
+
+    :param value: scalar or numpy array of length `N_neurons`.
+    :param N_neurons: number of neurons.
+    :param dtype: type of the returned array.
+    """
+    return np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=dtype), (N_neurons,)))
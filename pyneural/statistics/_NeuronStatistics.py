@@ -1,25 +1,73 @@
+import json
+import os
 import numpy as np
-from typing import Any
+from typing import Any, Iterator, Optional, Sequence
 from ._NeuronStepStatistics import NeuronStepStatistics
+from ._TraceRecorder import TraceRecorder
+
+
+class _StepDataView(Sequence[NeuronStepStatistics]):
+    """
+    Lazy list-like view of the recorded traces as `pyneural.statistics.NeuronStepStatistics` objects. The objects are built on access.
+    """
+
+    def __init__(self, stats: 'NeuronStatistics'):
+        self._stats = stats
+
+    def __len__(self) -> int:
+        if self._stats.recorder is None:
+            return 0
+        return self._stats.recorder.N_steps
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError('step index out of range')
+        assert self._stats.recorder is not None
+        return self._stats.recorder.step_statistics(i, self._stats.recorder.steps[i] * self._stats.dt)
+
+    def __iter__(self) -> Iterator[NeuronStepStatistics]:
+        for i in range(len(self)):
+            yield self[i]
+
 
 class NeuronStatistics:
     """
     This class contains the information about the whole simulation for a group of neurons.
     """
 
-    def __init__(self, N_steps: int, dt: float):
+    METADATA_FILE: str = 'meta.json'
+    """Name of the metadata file of a simulation saved into a directory."""
+
+    def __init__(self, N_steps: int, dt: float, recorder: Optional[TraceRecorder] = None):
         """
         Initialize a new statistics object
 
         :param N_steps: number of simulation steps.
-        :param dt: time interval between consecutive steps. 
+        :param dt: time interval between consecutive steps.
+        :param recorder: `pyneural.statistics.TraceRecorder` object holding the recorded traces (nothing is recorded by default).
         """
         self.N_steps = N_steps
         """The number of simulation steps."""
         self.dt = dt
         """The time interval between two consecutive simulation steps in ms."""
-        self.step_data: list[NeuronStepStatistics] = []
-        """The list of `pyneural.statistics.NeuronStepStatistics` objects containing the statistics per each step."""
+        self.recorder = recorder
+        """The `pyneural.statistics.TraceRecorder` object holding the recorded traces."""
+        self.model: str = ''
+        """The name of the neuron model (only set for simulations run by `pyneural.NeuralModel` or loaded with `load`)."""
+        self.n_trials: int = 1
+        """The number of Monte-Carlo trials in the simulation (see `pyneural.neuron_models.NeuronGroup`)."""
+        self.profile: Optional[dict[str, dict]] = None
+        """Time spent in each phase of the simulation and counters of its work, in the form of `pyneural.statistics.Profiler.since` (only set for simulations run with a profiler)."""
+        self.spike_steps: np.ndarray = np.array([], dtype=np.int64)
+        """Numpy array containing the step of each spike in the simulation, in the order of occurrence."""
+        self.spike_neurons: np.ndarray = np.array([], dtype=np.int64)
+        """Numpy array containing the index of the neuron that generated each spike in `spike_steps`."""
+        self.spike_times: Optional[np.ndarray] = None
+        """Numpy array containing the exact time of each spike in `spike_steps` in ms (only set by event-driven simulations)."""
         self.spikes: list[np.ndarray] = []
         """The list containding the numpy arrays of steps where spikes occured for each neuron."""
         self.spike_intervals: list[np.ndarray] = []
@@ -29,3 +77,121 @@ class NeuronStatistics:
         self.spiking_frequency: list[np.floating[Any]] = []
         """The list containing the spiking frequencies foe each neuron (0 of no spikes)."""
 
+    def set_spike_events(self, spike_steps: np.ndarray, spike_neurons: np.ndarray, N_neurons: int, spike_times: Optional[np.ndarray] = None):
+        """
+        Store the spike events of the simulation and compute the per-neuron spike trains, interspike intervals and spiking frequencies from them.
+
+        :param spike_steps: numpy array containing the step of each spike, in the order of occurrence.
+        :param spike_neurons: numpy array containing the index of the neuron that generated each spike.
+        :param N_neurons: number of neurons in a simulated group.
+        :param spike_times: numpy array containing the exact time of each spike in ms. If specified, the interspike intervals are computed from these times instead of the steps.
+        """
+        self.spike_steps = spike_steps
+        self.spike_neurons = spike_neurons
+        self.spike_times = spike_times
+
+        order = np.argsort(spike_neurons, kind='stable')
+        counts = np.bincount(spike_neurons, minlength=N_neurons)
+        splits = np.cumsum(counts)[:-1]
+        self.spikes = np.split(spike_steps[order], splits)
+        if spike_times is None:
+            self.spike_intervals = [np.diff(train)*self.dt for train in self.spikes]
+        else:
+            self.spike_intervals = [np.diff(train) for train in np.split(spike_times[order], splits)]
+
+        # neurons with less than two spikes have no interspike intervals and get nan values
+        n_intervals = np.maximum(counts - 1, 0)
+        total = np.array([intervals.sum() for intervals in self.spike_intervals])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_interspike_int = np.where(n_intervals > 0, total / n_intervals, np.nan)
+        self.mean_interspike_int = list(mean_interspike_int)
+        self.spiking_frequency = [np.floating(0) if mean == 0 else 1/mean for mean in mean_interspike_int]
+
+    def save(self, directory: str, model: str = ''):
+        """
+        Save the spike events and the metadata of the simulation into a directory, so it can be reopened with `load`. The recorded traces are saved too, unless they are already memory-mapped files in this directory.
+
+        :param directory: directory to save the simulation into.
+        :param model: name of the neuron model (e.g. 'hh').
+        """
+        os.makedirs(directory, exist_ok=True)
+        variables = list(self.traces)
+        if self.recorder is not None:
+            if self.recorder.directory is not None and os.path.samefile(self.recorder.directory, directory):
+                self.recorder.flush()
+            else:
+                for name, trace in self.traces.items():
+                    np.save(TraceRecorder.trace_path(directory, name), trace)
+            np.save(TraceRecorder.trace_path(directory, 'steps'), self.recorder.steps)
+        np.save(os.path.join(directory, 'spike_steps.npy'), self.spike_steps)
+        np.save(os.path.join(directory, 'spike_neurons.npy'), self.spike_neurons)
+
+        metadata = {
+            'model': model,
+            'dt': self.dt,
+            'N_steps': self.N_steps,
+            'N_neurons': len(self.spikes),
+            'n_trials': self.n_trials,
+            'variables': variables
+        }
+        with open(os.path.join(directory, NeuronStatistics.METADATA_FILE), 'w') as file:
+            json.dump(metadata, file, indent=4)
+
+    @classmethod
+    def load(cls, directory: str) -> 'NeuronStatistics':
+        """
+        Reopen a simulation saved into a directory (see `save` and the `output_dir` parameter of `pyneural.NeuralModel.simulate_neurons`). The traces are memory-mapped read-only and loaded from the disk only when accessed.
+
+        :param directory: directory containing the simulation.
+        """
+        with open(os.path.join(directory, NeuronStatistics.METADATA_FILE)) as file:
+            metadata = json.load(file)
+        recorder = TraceRecorder.open(directory, metadata['variables'])
+        stats = cls(metadata['N_steps'], metadata['dt'], recorder)
+        stats.model = metadata['model']
+        stats.n_trials = metadata.get('n_trials', 1)
+        stats.set_spike_events(np.load(os.path.join(directory, 'spike_steps.npy')), np.load(os.path.join(directory, 'spike_neurons.npy')), metadata['N_neurons'])
+        return stats
+
+    @property
+    def traces(self) -> dict[str, np.ndarray]:
+        """Dictionary mapping the name of each recorded variable to its `(N_steps, N_neurons)` array."""
+        if self.recorder is None:
+            return {}
+        return self.recorder.traces
+
+    def by_trial(self, values) -> np.ndarray:
+        """
+        Split per-neuron values of all trials by trial. Returns a numpy array with an additional trial axis: values of shape `(N_neurons,)` become `(n_trials, N_trial_neurons)` and traces of shape `(N_steps, N_neurons)` become `(N_steps, n_trials, N_trial_neurons)`. Arrays are returned as views.
+
+        :param values: values for each neuron along the last axis (e.g. `spiking_frequency` or a trace).
+        """
+        values = np.asarray(values)
+        return values.reshape(values.shape[:-1] + (self.n_trials, values.shape[-1] // self.n_trials))
+
+    @property
+    def trial_traces(self) -> dict[str, np.ndarray]:
+        """Dictionary mapping the name of each recorded variable to its `(N_steps, n_trials, N_trial_neurons)` view."""
+        return {name: self.by_trial(trace) for name, trace in self.traces.items()}
+
+    @property
+    def trial_frequency(self) -> np.ndarray:
+        """Numpy array of shape `(n_trials, N_trial_neurons)` containing the spiking frequency of each neuron in each trial."""
+        return self.by_trial(np.array(self.spiking_frequency, dtype=np.float64))
+
+    @property
+    def spike_trials(self) -> np.ndarray:
+        """Numpy array containing the trial of each spike in `spike_steps`."""
+        return self.spike_neurons // (len(self.spikes) // self.n_trials)
+
+    @property
+    def recorded_times(self) -> np.ndarray:
+        """Numpy array containing the time in ms of each row of the recorded traces."""
+        if self.recorder is None:
+            return np.array([])
+        return self.recorder.steps * self.dt
+
+    @property
+    def step_data(self) -> Sequence[NeuronStepStatistics]:
+        """Lazy list-like view of the recorded traces as `pyneural.statistics.NeuronStepStatistics` objects, one per step. Kept for compatibility, prefer `traces`."""
+        return _StepDataView(self)
@@ -0,0 +1,135 @@
+from typing import Callable
+import time
+
+
+class Profiler:
+    """
+    Opt-in instrumentation of simulations (see the `profiler` parameter of `pyneural.NeuralModel.simulate_neurons`). It accumulates the wall time spent in each phase of the simulations it is passed to, and counters of the work they did. Simulations without a profiler do not read the clock at all.
+
+    The phases (`timers`, in seconds):
+
+    - 'setup': resetting the neurons and allocating the traces,
+    - 'input': generation of the input current,
+    - 'neurons': integration of the steps that record nothing,
+    - 'channels': ion-channel updates of the Hodgkin-Huxley model (a part of 'neurons' and 'recording', so the membrane update takes the rest),
+    - 'recording': integration of the recorded steps, including writing their traces,
+    - 'detection': spike detection,
+    - 'synapses': synaptic currents and spike delivery,
+    - 'accumulator': updates of a `pyneural.statistics.SpikeTrainAccumulator`,
+    - 'compiled': blocks of steps advanced by compiled kernels, including their spike detection (see the `backend` of `pyneural.NeuralModel`),
+    - 'threads': blocks of steps advanced by tiles in a thread pool (see the `threads` parameter of `pyneural.NeuralModel.simulate_neurons`),
+    - 'checkpoint': writing checkpoints,
+    - 'statistics': computing the spike trains from the detected spikes and saving the results.
+
+    The counters (`counters`): 'steps', 'spikes', 'bytes_recorded' and 'compiled_steps'.
+
+    External profilers and metrics exporters can `subscribe` to the events of the simulations.
+    """
+
+    EVENTS: tuple[str, ...] = ('start', 'block', 'finish')
+    """Events passed to the listeners: 'start' before the first step of a simulation, 'block' after each block of steps sharing a generated input current, and 'finish' after a simulation."""
+
+    def __init__(self):
+        """
+        Initialize a new profiler with all timers and counters at zero.
+        """
+        self.timers: dict[str, float] = {}
+        """Dictionary mapping the name of each phase to the accumulated wall time in seconds."""
+        self.counters: dict[str, int] = {}
+        """Dictionary mapping the name of each counter to its value."""
+        self._listeners: list[Callable[[str, 'Profiler'], None]] = []
+
+    @staticmethod
+    def clock() -> float:
+        """
+        Read the clock used by the timers in seconds.
+        """
+        return time.perf_counter()
+
+    def add(self, phase: str, start: float) -> float:
+        """
+        Add the time since `start` to a phase. Returns the current time, so consecutive phases can be timed with a single reading of the clock.
+
+        :param phase: name of the phase.
+        :param start: time the phase started at (a value of `clock`).
+        """
+        now = time.perf_counter()
+        self.timers[phase] = self.timers.get(phase, 0.0) + (now - start)
+        return now
+
+    def count(self, name: str, n: int = 1):
+        """
+        Increase a counter.
+
+        :param name: name of the counter.
+        :param n: increment.
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def subscribe(self, listener: Callable[[str, 'Profiler'], None]):
+        """
+        Register a function called with each event (one of `EVENTS`) and this profiler, e.g. to export the counters of a running simulation or to mark the blocks in an external profiler.
+
+        :param listener: function taking the name of the event and the profiler.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, 'Profiler'], None]):
+        """
+        Remove a function registered with `subscribe`.
+
+        :param listener: registered function.
+        """
+        self._listeners.remove(listener)
+
+    def notify(self, event: str):
+        """
+        Call the listeners with an event.
+
+        :param event: name of the event (one of `EVENTS`).
+        """
+        for listener in self._listeners:
+            listener(event, self)
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Get copies of the timers and the counters as a dictionary with the keys 'timers' and 'counters'.
+        """
+        return {'timers': dict(self.timers), 'counters': dict(self.counters)}
+
+    def since(self, snapshot: dict[str, dict]) -> dict[str, dict]:
+        """
+        Get the time and the counts accumulated since a snapshot, in the form of `snapshot`. Phases and counters that did not change are left out.
+
+        :param snapshot: dictionary returned by `snapshot`.
+        """
+        timers = {name: value - snapshot['timers'].get(name, 0.0) for name, value in self.timers.items()}
+        counters = {name: value - snapshot['counters'].get(name, 0) for name, value in self.counters.items()}
+        return {'timers': {name: value for name, value in timers.items() if value > 0},
+                'counters': {name: value for name, value in counters.items() if value != 0}}
+
+    def reset(self):
+        """
+        Set all timers and counters back to zero. The listeners stay registered.
+        """
+        self.timers.clear()
+        self.counters.clear()
+
+    @staticmethod
+    def format(profile: dict[str, dict]) -> str:
+        """
+        Format the timers and the counters as a table, with the phases sorted by time.
+
+        :param profile: dictionary returned by `snapshot` or `since` (e.g. `profile` of `pyneural.statistics.NeuronStatistics`).
+        """
+        timers, counters = profile['timers'], profile['counters']
+        # 'channels' is a part of other phases and is not added to the total
+        total = sum(value for name, value in timers.items() if name != 'channels')
+        lines = [f"{'phase':<14} {'seconds':>10} {'share':>7}"]
+        for name, value in sorted(timers.items(), key=lambda item: -item[1]):
+            lines.append(f'{name:<14} {value:>10.4f} {value / total if total else 0:>7.1%}')
+        lines.extend(f'{name:<20} {value:>14}' for name, value in counters.items())
+        return '\n'.join(lines)
+
+    def __str__(self) -> str:
+        return Profiler.format(self.snapshot())
@@ -0,0 +1,68 @@
+from typing import Iterable, Optional
+import numpy as np
+
+
+class RecordingPolicy:
+    """
+    Policy specifying which variables are recorded at which steps of a simulation (see `pyneural.NeuralModel.simulate_neurons`). Only the selected steps are stored, so the memory footprint of the traces scales with what is kept rather than with the number of simulated steps.
+    """
+
+    GROUPS: dict[str, tuple[str, ...]] = {
+        'currents': ('I_ext', 'I_total', 'I_leak', 'I_K', 'I_Na'),
+        'conductances': ('g_leak', 'g_K', 'g_Na'),
+        'gates': ('gate_n', 'gate_m', 'gate_h')
+    }
+    """Names of the groups of variables, which can be selected at once. Variables of a group that are not available for a model are skipped."""
+
+    def __init__(self, variables: Optional[Iterable[str]] = None, stride: int = 1, start_time: float = 0.0, end_time: float = np.inf):
+        """
+        Initialize a new recording policy.
+
+        :param variables: names of the variables or of the groups of variables (see `GROUPS`) to record. By default, all variables available for the model are recorded.
+        :param stride: number of simulation steps between two consecutive recorded steps (e.g. 100 records every 1 ms with dt = 0.01 ms).
+        :param start_time: time of the first recorded step in ms.
+        :param end_time: time in ms where the recording ends (exclusive).
+        """
+        if stride < 1:
+            raise ValueError(f'Bad recording stride: {stride}')
+        self.variables: Optional[tuple[str, ...]] = None if variables is None else tuple(variables)
+        self.stride = stride
+        self.start_time = start_time
+        self.end_time = end_time
+
+    def select(self, available: tuple[str, ...]) -> tuple[str, ...]:
+        """
+        Get the names of the recorded variables. Raises ValueError if a selected variable is not available.
+
+        :param available: names of the variables available for the model (e.g. `neurons.RECORDABLE`).
+        """
+        if self.variables is None:
+            return available
+        selected: list[str] = []
+        for name in self.variables:
+            if name in RecordingPolicy.GROUPS:
+                names = [variable for variable in RecordingPolicy.GROUPS[name] if variable in available]
+            elif name in available:
+                names = [name]
+            else:
+                raise ValueError(f'Variable {name} is not available, expected one of {available} or a group {tuple(RecordingPolicy.GROUPS)}')
+            selected.extend(variable for variable in names if variable not in selected)
+        return tuple(selected)
+
+    def steps(self, N_steps: int, dt: float) -> np.ndarray:
+        """
+        Get the indices of the recorded steps of a simulation.
+
+        :param N_steps: number of steps in a simulation.
+        :param dt: time interval between two consecutive steps in ms.
+        """
+        # the step i is at the time i*dt, the small tolerance protects the ends of the window from rounding errors
+        first = max(0, int(np.ceil(self.start_time / dt - 1e-9)))
+        end = N_steps if np.isinf(self.end_time) else min(N_steps, max(first, int(np.ceil(self.end_time / dt - 1e-9))))
+        return np.arange(first, end, self.stride, dtype=np.int64)
+
+    def describe(self) -> dict:
+        """
+        Describe the policy, e.g. for the keys of a `pyneural.ResultCache`.
+        """
+        return {'variables': None if self.variables is None else list(self.variables), 'stride': self.stride, 'start_time': self.start_time, 'end_time': self.end_time}
@@ -0,0 +1,48 @@
+from typing import Optional
+import numpy as np
+
+
+class SimulationChunk:
+    """
+    This class contains the data of a fixed-size chunk of steps of a streamed simulation (see `pyneural.NeuralModel.iter_simulation`).
+    """
+
+    def __init__(self, start_step: int, N_steps: int, dt: float, traces: dict[str, np.ndarray], spike_steps: np.ndarray, spike_neurons: np.ndarray, spike_counts: np.ndarray, steps: Optional[np.ndarray] = None):
+        """
+        Initialize a new chunk.
+
+        :param start_step: index of the first step of the chunk in the simulation.
+        :param N_steps: number of steps in the chunk.
+        :param dt: time interval between two consecutive steps in ms.
+        :param traces: dictionary mapping the name of each recorded variable to its `(N_steps, N_neurons)` array.
+        :param spike_steps: numpy array containing the step of each spike detected in the chunk.
+        :param spike_neurons: numpy array containing the index of the neuron that generated each spike in `spike_steps`.
+        :param spike_counts: numpy array containing the number of spikes of each neuron since the start of the simulation.
+        :param steps: indices of the simulation steps recorded in the rows of the traces (all steps of the chunk by default).
+        """
+        self.start_step = start_step
+        """The index of the first step of the chunk in the simulation."""
+        self.N_steps = N_steps
+        """The number of steps in the chunk."""
+        self.dt = dt
+        """The time interval between two consecutive simulation steps in ms."""
+        self.traces = traces
+        """Dictionary mapping the name of each recorded variable to its `(N_steps, N_neurons)` array."""
+        self.spike_steps = spike_steps
+        """Numpy array containing the step (counted from the start of the simulation) of each spike detected in the chunk, in the order of occurrence."""
+        self.spike_neurons = spike_neurons
+        """Numpy array containing the index of the neuron that generated each spike in `spike_steps`."""
+        self.spike_counts = spike_counts
+        """Numpy array containing the number of spikes of each neuron since the start of the simulation up to the end of this chunk."""
+        self.steps = np.arange(start_step, start_step + N_steps, dtype=np.int64) if steps is None else steps
+        """Numpy array containing the index of the simulation step recorded in each row of the traces."""
+
+    @property
+    def end_step(self) -> int:
+        """The index of the step following the last step of the chunk."""
+        return self.start_step + self.N_steps
+
+    @property
+    def T(self) -> np.ndarray:
+        """Numpy array containing the time of each recorded step of the chunk in ms."""
+        return self.steps * self.dt
@@ -0,0 +1,183 @@
+from typing import Union
+import numpy as np
+from numpy.typing import DTypeLike
+
+
+class SpikeDetector:
+    """
+    Online spike detector. It is updated with the membrane potentials of the whole group after each simulation step and detects spikes as local maxima of the membrane potential above the threshold, separated by at least the refractory window. Detected spikes are stored in a compact event buffer of (step, neuron) pairs.
+    """
+
+    _INITIAL_CAPACITY = 1024
+    _no_spikes = np.array([], dtype=np.int64)
+
+    def __init__(self, N_neurons: int, V_threshold: Union[float, np.ndarray], refractory_steps: Union[int, np.ndarray], dtype: DTypeLike = np.float64):
+        """
+        Initialize a new spike detector.
+
+        :param N_neurons: number of neurons in a simulated group.
+        :param V_threshold: minimal membrane potential of a spike in mV.
+        :param refractory_steps: minimal number of steps between two consecutive spikes of a neuron.
+        :param dtype: floating point type of the membrane potentials (float64 by default).
+        """
+        self.N_neurons = N_neurons
+        self._V_threshold = V_threshold
+        self._refractory_steps = refractory_steps
+
+        self._prev_V = np.zeros(N_neurons, dtype=dtype)
+        self._rising = np.zeros(N_neurons, dtype=bool)
+        self._last_spike = np.full(N_neurons, np.iinfo(np.int64).min // 2, dtype=np.int64)
+        self._step = 0
+        self._peak = np.zeros(N_neurons, dtype=bool)
+        self._mask = np.zeros(N_neurons, dtype=bool)
+        self._since_spike = np.zeros(N_neurons, dtype=np.int64)
+
+        self._event_steps = np.empty(self._INITIAL_CAPACITY, dtype=np.int64)
+        self._event_neurons = np.empty(self._INITIAL_CAPACITY, dtype=np.int64)
+        self.N_events: int = 0
+        """The number of detected spikes."""
+
+    @staticmethod
+    def refractory_steps(max_spike_frequency: Union[float, np.ndarray], dt: float) -> np.ndarray:
+        """
+        Convert the maximal spiking frequency into the refractory window in steps.
+
+        :param max_spike_frequency: maximal spiking frequency in kHz.
+        :param dt: time interval between two consecutive steps in ms.
+        """
+        return np.maximum(np.ceil(1 / (np.asarray(max_spike_frequency) * dt)), 1).astype(np.int64)
+
+    def update(self, Vm: np.ndarray) -> np.ndarray:
+        """
+        Process the membrane potentials of the next step. A spike is reported at the previous step if the potential was rising into it, does not rise after it, exceeds the threshold and the neuron is not refractory. Returns indices of neurons that spiked at the previous step.
+
+        :param Vm: numpy array containing membrane potentials for each neuron in mV.
+        """
+        peak_step = self._step - 1
+        peak = self._peak
+        np.less_equal(Vm, self._prev_V, out=peak)
+        peak &= self._rising
+        np.greater_equal(self._prev_V, self._V_threshold, out=self._mask)
+        peak &= self._mask
+        np.subtract(peak_step, self._last_spike, out=self._since_spike)
+        np.greater_equal(self._since_spike, self._refractory_steps, out=self._mask)
+        peak &= self._mask
+
+        if not peak.any():
+            fired = self._no_spikes
+        else:
+            fired = np.flatnonzero(peak)
+            self._last_spike[fired] = peak_step
+            self._append(peak_step, fired)
+
+        np.greater(Vm, self._prev_V, out=self._rising)
+        self._prev_V[:] = Vm
+        self._step += 1
+        return fired
+
+    def _append(self, step: Union[int, np.ndarray], neurons: np.ndarray):
+        end = self.N_events + neurons.size
+        if end > self._event_steps.size:
+            capacity = max(2 * self._event_steps.size, end)
+            self._event_steps = np.resize(self._event_steps, capacity)
+            self._event_neurons = np.resize(self._event_neurons, capacity)
+        self._event_steps[self.N_events:end] = step
+        self._event_neurons[self.N_events:end] = neurons
+        self.N_events = end
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Capture the state of the detector, including the detected spikes. Returns a dictionary of numpy arrays (copies), which can be passed to `restore`.
+        """
+        return {
+            'prev_V': self._prev_V.copy(),
+            'rising': self._rising.copy(),
+            'last_spike': self._last_spike.copy(),
+            'step': np.array(self._step),
+            'event_steps': self.event_steps.copy(),
+            'event_neurons': self.event_neurons.copy()
+        }
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        """
+        Restore the state of the detector captured by `snapshot`.
+
+        :param snapshot: dictionary returned by `snapshot`.
+        """
+        np.copyto(self._prev_V, snapshot['prev_V'])
+        np.copyto(self._rising, snapshot['rising'])
+        np.copyto(self._last_spike, snapshot['last_spike'])
+        self._step = int(snapshot['step'])
+        self.N_events = 0
+        self._append(snapshot['event_steps'], snapshot['event_neurons'])
+
+    def compiled_state(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Get the state of the detector in the form taken by the compiled step kernels (see `pyneural.neuron_models.NeuronGroup.advance_compiled`): the previous potentials, the rising flags and the steps of the last spikes (updated in place by the kernels), the thresholds and the refractory windows of each neuron, and the index of the next step. The spikes found by a kernel are passed to `add_peaks`.
+        """
+        V_threshold = np.ascontiguousarray(np.broadcast_to(np.asarray(self._V_threshold, dtype=self._prev_V.dtype), (self.N_neurons,)))
+        refractory = np.ascontiguousarray(np.broadcast_to(np.asarray(self._refractory_steps, dtype=np.int64), (self.N_neurons,)))
+        return self._prev_V, self._rising, self._last_spike, V_threshold, refractory, self._step
+
+    def add_peaks(self, peaks: np.ndarray):
+        """
+        Store the spikes found by a compiled step kernel and advance the detector by its steps.
+
+        :param peaks: boolean numpy array of shape `(N_steps, N_neurons)`, where the row `k` marks the neurons that spiked at the step before the `k`-th processed step.
+        """
+        rows, neurons = np.nonzero(peaks)
+        if rows.size:
+            self._append(rows + (self._step - 1), neurons)
+        self._step += peaks.shape[0]
+
+    def split(self, start: int, stop: int) -> 'SpikeDetector':
+        """
+        Create a detector for the neurons `[start, stop)` with their current state and an empty event buffer. Used together with `pyneural.neuron_models.NeuronGroup.split` to step tiles of a group in parallel; `join` collects the tiles back.
+
+        :param start: index of the first neuron of the tile.
+        :param stop: index after the last neuron of the tile.
+        """
+        tile = SpikeDetector(stop - start, self._tile_param(self._V_threshold, start, stop), self._tile_param(self._refractory_steps, start, stop), self._prev_V.dtype)
+        np.copyto(tile._prev_V, self._prev_V[start:stop])
+        np.copyto(tile._rising, self._rising[start:stop])
+        np.copyto(tile._last_spike, self._last_spike[start:stop])
+        tile._step = self._step
+        return tile
+
+    @staticmethod
+    def _tile_param(value: Union[float, np.ndarray], start: int, stop: int) -> Union[float, np.ndarray]:
+        return value[start:stop] if np.ndim(value) > 0 else value
+
+    def join(self, tiles: list['SpikeDetector']):
+        """
+        Take over the state of the consecutive tiles created by `split` and append their spikes to the event buffer. The spikes are merged in the order of detection of a single detector (by step, then by neuron).
+
+        :param tiles: detectors covering all neurons of this detector, in order.
+        """
+        offsets = np.cumsum([0] + [tile.N_neurons for tile in tiles[:-1]])
+        steps = np.concatenate([tile.event_steps for tile in tiles])
+        neurons = np.concatenate([tile.event_neurons + offset for tile, offset in zip(tiles, offsets)])
+        order = np.lexsort((neurons, steps))
+        self._append(steps[order], neurons[order])
+        np.concatenate([tile._prev_V for tile in tiles], out=self._prev_V)
+        np.concatenate([tile._rising for tile in tiles], out=self._rising)
+        np.concatenate([tile._last_spike for tile in tiles], out=self._last_spike)
+        self._step = tiles[0]._step
+
+    def pop_events(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Remove the detected spikes from the event buffer. Returns copies of the steps and the neuron indices of the removed spikes, in the order of detection.
+        """
+        events = self.event_steps.copy(), self.event_neurons.copy()
+        self.N_events = 0
+        return events
+
+    @property
+    def event_steps(self) -> np.ndarray:
+        """Numpy array containing the step of each detected spike, in the order of detection."""
+        return self._event_steps[:self.N_events]
+
+    @property
+    def event_neurons(self) -> np.ndarray:
+        """Numpy array containing the neuron index of each detected spike, in the order of detection."""
+        return self._event_neurons[:self.N_events]
@@ -0,0 +1,179 @@
+from typing import Optional
+import numpy as np
+
+
+class SpikeTrainAccumulator:
+    """
+    Streaming statistics of the spike trains and membrane potentials of a group of neurons, updated during a simulation (see the `accumulator` parameter of `pyneural.NeuralModel.simulate_neurons`). All statistics are kept per neuron in arrays of a fixed size, so the memory does not grow with the length of a simulation:
+
+    - a histogram of interspike intervals with fixed bins,
+    - the running mean and variance of interspike intervals, giving the coefficient of variation (CV),
+    - the mean and variance of spike counts in consecutive time windows, giving the Fano factor,
+    - the running mean and variance of the membrane potential (optional).
+    """
+
+    def __init__(self, N_neurons: int, dt: float, isi_bins: Optional[np.ndarray] = None, count_window: float = 100.0, track_Vm: bool = False):
+        """
+        Initialize a new accumulator.
+
+        :param N_neurons: number of neurons in a simulated group.
+        :param dt: time interval between two consecutive steps in ms.
+        :param isi_bins: increasing edges of the bins of the interspike interval histogram in ms (1 ms bins from 0 to 200 ms by default). Intervals outside of the bins are counted in `isi_outside`.
+        :param count_window: length of the windows the spikes are counted in for the Fano factor in ms.
+        :param track_Vm: whether to accumulate the mean and variance of the membrane potential (this adds work to each step).
+        """
+        self.N_neurons = N_neurons
+        self.dt = dt
+        self.isi_bins: np.ndarray = np.arange(0, 201, 1.0) if isi_bins is None else np.asarray(isi_bins, dtype=np.float64)
+        """Edges of the bins of the interspike interval histogram in ms."""
+        self.track_Vm = track_Vm
+        self._window_steps = max(1, int(round(count_window / dt)))
+
+        self.spike_count = np.zeros(N_neurons, dtype=np.int64)
+        """Number of spikes of each neuron."""
+        self._last_spike = np.full(N_neurons, -1, dtype=np.int64)
+        self.isi_histogram = np.zeros((N_neurons, self.isi_bins.size - 1), dtype=np.int64)
+        """Numpy array of shape `(N_neurons, bins)` with the number of interspike intervals of each neuron in each bin."""
+        self.isi_outside = np.zeros(N_neurons, dtype=np.int64)
+        """Number of interspike intervals of each neuron outside of the histogram bins."""
+        self._isi_n = np.zeros(N_neurons, dtype=np.int64)
+        self._isi_mean = np.zeros(N_neurons)
+        self._isi_m2 = np.zeros(N_neurons)
+
+        self._window = 0
+        self._window_counts = np.zeros(N_neurons, dtype=np.int64)
+        self._count_n = 0
+        self._count_mean = np.zeros(N_neurons)
+        self._count_m2 = np.zeros(N_neurons)
+        self._delta = np.zeros(N_neurons)
+
+        self._Vm_n = 0
+        self._Vm_mean = np.zeros(N_neurons)
+        self._Vm_m2 = np.zeros(N_neurons)
+        self._Vm_delta = np.zeros(N_neurons)
+
+    def add_spikes(self, step: int, neurons: np.ndarray):
+        """
+        Add the spikes of a single step. Steps must be added in increasing order.
+
+        :param step: index of the step of the spikes.
+        :param neurons: numpy array containing the indices of the neurons that spiked (each at most once).
+        """
+        self._close_windows(step)
+        self._window_counts[neurons] += 1
+        self.spike_count[neurons] += 1
+
+        previous = self._last_spike[neurons]
+        self._last_spike[neurons] = step
+        neurons = neurons[previous >= 0]
+        if neurons.size == 0:
+            return
+        isi = (step - previous[previous >= 0]) * self.dt
+
+        bins = np.searchsorted(self.isi_bins, isi, side='right') - 1
+        inside = (bins >= 0) & (bins < self.isi_histogram.shape[1])
+        self.isi_histogram[neurons[inside], bins[inside]] += 1
+        self.isi_outside[neurons[~inside]] += 1
+
+        # Welford's update of the mean and the sum of squared deviations
+        self._isi_n[neurons] += 1
+        delta = isi - self._isi_mean[neurons]
+        self._isi_mean[neurons] += delta / self._isi_n[neurons]
+        self._isi_m2[neurons] += delta * (isi - self._isi_mean[neurons])
+
+    def add_potentials(self, Vm: np.ndarray):
+        """
+        Add the membrane potentials of a single step. Does nothing unless `track_Vm` is set.
+
+        :param Vm: numpy array containing membrane potentials for each neuron in mV.
+        """
+        if not self.track_Vm:
+            return
+        self._Vm_n += 1
+        np.subtract(Vm, self._Vm_mean, out=self._Vm_delta)
+        self._Vm_mean += self._Vm_delta / self._Vm_n
+        np.subtract(Vm, self._Vm_mean, out=self._delta)
+        self._delta *= self._Vm_delta
+        self._Vm_m2 += self._delta
+
+    def finish(self, N_steps: int):
+        """
+        Account for the windows of spike counts completed by the end of a simulation. The last incomplete window is not counted.
+
+        :param N_steps: number of simulated steps.
+        """
+        self._close_windows(N_steps)
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Capture the state of the accumulator (e.g. for a `pyneural.Checkpoint`). Returns a dictionary of numpy arrays (copies), which can be passed to `restore`.
+        """
+        return {
+            'spike_count': self.spike_count.copy(), 'last_spike': self._last_spike.copy(),
+            'isi_histogram': self.isi_histogram.copy(), 'isi_outside': self.isi_outside.copy(),
+            'isi_n': self._isi_n.copy(), 'isi_mean': self._isi_mean.copy(), 'isi_m2': self._isi_m2.copy(),
+            'window': np.array(self._window), 'window_counts': self._window_counts.copy(),
+            'count_n': np.array(self._count_n), 'count_mean': self._count_mean.copy(), 'count_m2': self._count_m2.copy(),
+            'Vm_n': np.array(self._Vm_n), 'Vm_mean': self._Vm_mean.copy(), 'Vm_m2': self._Vm_m2.copy()
+        }
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        """
+        Restore the state of the accumulator captured by `snapshot`.
+
+        :param snapshot: dictionary returned by `snapshot`.
+        """
+        for name in ('spike_count', 'isi_histogram', 'isi_outside'):
+            np.copyto(getattr(self, name), snapshot[name])
+        for name in ('last_spike', 'isi_n', 'isi_mean', 'isi_m2', 'window_counts', 'count_mean', 'count_m2', 'Vm_mean', 'Vm_m2'):
+            np.copyto(getattr(self, f'_{name}'), snapshot[name])
+        self._window = int(snapshot['window'])
+        self._count_n = int(snapshot['count_n'])
+        self._Vm_n = int(snapshot['Vm_n'])
+
+    def _close_windows(self, step: int):
+        # folds the spike counts of the windows ending before the step into the running mean and variance
+        while (self._window + 1) * self._window_steps <= step:
+            self._count_n += 1
+            np.subtract(self._window_counts, self._count_mean, out=self._delta)
+            self._count_mean += self._delta / self._count_n
+            self._count_m2 += self._delta * (self._window_counts - self._count_mean)
+            self._window_counts[:] = 0
+            self._window += 1
+
+    @property
+    def isi_mean(self) -> np.ndarray:
+        """Mean interspike interval of each neuron in ms (nan for neurons with less than two spikes)."""
+        return np.where(self._isi_n > 0, self._isi_mean, np.nan)
+
+    @property
+    def isi_var(self) -> np.ndarray:
+        """Variance of the interspike intervals of each neuron in ms^2 (nan for neurons with less than two spikes)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self._isi_n > 0, self._isi_m2 / self._isi_n, np.nan)
+
+    @property
+    def cv(self) -> np.ndarray:
+        """Coefficient of variation of the interspike intervals of each neuron (standard deviation divided by the mean)."""
+        return np.sqrt(self.isi_var) / self.isi_mean
+
+    @property
+    def spiking_frequency(self) -> np.ndarray:
+        """Spiking frequency of each neuron in kHz (the inverse of the mean interspike interval)."""
+        return 1 / self.isi_mean
+
+    @property
+    def fano_factor(self) -> np.ndarray:
+        """Fano factor of the spike counts of each neuron (variance of the counts in the windows divided by their mean, nan without spikes or complete windows)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self._count_m2 / self._count_n) / self._count_mean if self._count_n > 0 else np.full(self.N_neurons, np.nan)
+
+    @property
+    def Vm_mean(self) -> np.ndarray:
+        """Mean membrane potential of each neuron in mV (requires `track_Vm`)."""
+        return self._Vm_mean.copy() if self._Vm_n > 0 else np.full(self.N_neurons, np.nan)
+
+    @property
+    def Vm_var(self) -> np.ndarray:
+        """Variance of the membrane potential of each neuron in mV^2 (requires `track_Vm`)."""
+        return self._Vm_m2 / self._Vm_n if self._Vm_n > 0 else np.full(self.N_neurons, np.nan)
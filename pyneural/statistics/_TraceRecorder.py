@@ -0,0 +1,125 @@
+from typing import Iterable, Optional
+import os
+import numpy as np
+from numpy.typing import DTypeLike
+from ._NeuronStepStatistics import NeuronStepStatistics
+
+
+class TraceRecorder:
+    """
+    Columnar recorder for the simulation traces. For each recorded variable (e.g. `Vm`, `I_K`, `g_Na`, `gate_n`) it preallocates a single `(N_steps, N_neurons)` array, and the neuron models write their values directly into the current row.
+
+    The arrays can be memory-mapped `.npy` files in a directory (one file `<name>.npy` per variable), so traces that do not fit in memory are written straight to disk.
+    """
+
+    def __init__(self, N_steps: int, N_neurons: int, variables: Iterable[str], dtype: DTypeLike = np.float64, directory: Optional[str] = None, steps: Optional[np.ndarray] = None):
+        """
+        Initialize a new recorder.
+
+        :param N_steps: number of simulation steps to record (rows of the traces).
+        :param N_neurons: number of neurons in a simulated group.
+        :param variables: names of the variables to record (see `pyneural.statistics.NeuronStepStatistics` for the available names).
+        :param dtype: floating point type of the recorded traces (float64 by default).
+        :param directory: directory to write the traces into as memory-mapped `.npy` files. By default, the traces are kept in memory.
+        :param steps: increasing indices of the simulation steps recorded in the rows (e.g. every 10th step, see `pyneural.statistics.RecordingPolicy`). By default, the rows are the steps from 0 to `N_steps - 1`.
+        """
+        self.N_steps = N_steps
+        self.N_neurons = N_neurons
+        self.directory = directory
+        """The directory containing the memory-mapped traces (None if the traces are kept in memory)."""
+        if directory is None:
+            self.traces: dict[str, np.ndarray] = {name: np.zeros((N_steps, N_neurons), dtype=dtype) for name in variables}
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self.traces = {name: np.lib.format.open_memmap(TraceRecorder.trace_path(directory, name), mode='w+', dtype=dtype, shape=(N_steps, N_neurons))
+                           for name in variables}
+        """Dictionary mapping the name of each recorded variable to its `(N_steps, N_neurons)` array."""
+        self.step: int = 0
+        """Index of the row the next values are written to."""
+        self.steps: np.ndarray = np.arange(N_steps, dtype=np.int64) if steps is None else np.asarray(steps, dtype=np.int64)
+        """Numpy array containing the index of the simulation step recorded in each row."""
+        if self.steps.shape != (N_steps,):
+            raise ValueError(f'Bad number of recorded steps: {self.steps.size}, expected {N_steps}')
+
+    @staticmethod
+    def trace_path(directory: str, name: str) -> str:
+        """
+        Get the path of the `.npy` file of a recorded variable.
+
+        :param directory: directory containing the traces.
+        :param name: name of the variable.
+        """
+        return os.path.join(directory, f'{name}.npy')
+
+    @classmethod
+    def open(cls, directory: str, variables: Iterable[str], mode: str = 'r', steps: Optional[np.ndarray] = None) -> 'TraceRecorder':
+        """
+        Reopen the traces written into a directory. The files are memory-mapped, so the data is loaded from the disk only when accessed.
+
+        :param directory: directory containing the traces.
+        :param variables: names of the recorded variables.
+        :param mode: 'r' to open the traces read-only or 'r+' to continue recording into them.
+        :param steps: indices of the recorded steps. By default, they are read from the file `steps.npy` in the directory if it exists.
+        """
+        traces = {name: np.load(cls.trace_path(directory, name), mmap_mode=mode) for name in variables}
+        N_steps, N_neurons = next(iter(traces.values())).shape if traces else (0, 0)
+        steps_path = cls.trace_path(directory, 'steps')
+        if steps is None and os.path.exists(steps_path):
+            steps = np.load(steps_path)
+        if steps is not None:
+            N_steps = len(steps)
+        recorder = cls(N_steps, N_neurons, (), steps=steps)
+        recorder.directory = directory
+        recorder.traces = traces
+        return recorder
+
+    def split(self, start: int, stop: int) -> 'TraceRecorder':
+        """
+        Create a recorder for the neurons `[start, stop)`, which writes into the columns of the traces of this recorder (the traces of the returned recorder are views). Used to record tiles of a group stepped in parallel threads.
+
+        :param start: index of the first neuron of the tile.
+        :param stop: index after the last neuron of the tile.
+        """
+        tile = TraceRecorder(self.N_steps, stop - start, (), steps=self.steps)
+        tile.traces = {name: trace[:, start:stop] for name, trace in self.traces.items()}
+        return tile
+
+    def flush(self):
+        """
+        Write the changes of the memory-mapped traces to the disk. Does nothing if the traces are kept in memory.
+        """
+        for trace in self.traces.values():
+            if isinstance(trace, np.memmap):
+                trace.flush()
+
+    def wants(self, name: str) -> bool:
+        """
+        Check whether the variable is recorded.
+
+        :param name: name of the variable.
+        """
+        return name in self.traces
+
+    def record(self, name: str, value: np.ndarray):
+        """
+        Write the value of a variable for the current step. Values of the variables that are not recorded are ignored.
+
+        :param name: name of the variable.
+        :param value: numpy array containing the value of the variable for each neuron.
+        """
+        trace = self.traces.get(name)
+        if trace is not None:
+            trace[self.step] = value
+
+    def step_statistics(self, step: int, T: float) -> NeuronStepStatistics:
+        """
+        Build a `pyneural.statistics.NeuronStepStatistics` object for a single recorded step. The arrays in the returned object are views into the recorded traces.
+
+        :param step: index of the recorded step.
+        :param T: time at this step in ms.
+        """
+        stats = NeuronStepStatistics()
+        stats.T = T
+        for name, trace in self.traces.items():
+            setattr(stats, name, trace[step])
+        return stats
@@ -4,8 +4,20 @@ This module contains classes for recording the simulation data statistics.
 
 from ._NeuronStatistics import NeuronStatistics
 from ._NeuronStepStatistics import NeuronStepStatistics
+from ._TraceRecorder import TraceRecorder
+from ._SpikeDetector import SpikeDetector
+from ._SimulationChunk import SimulationChunk
+from ._RecordingPolicy import RecordingPolicy
+from ._SpikeTrainAccumulator import SpikeTrainAccumulator
+from ._Profiler import Profiler
 
 __all__ = [
     'NeuronStepStatistics',
-    'NeuronStatistics'
+    'NeuronStatistics',
+    'TraceRecorder',
+    'SpikeDetector',
+    'SimulationChunk',
+    'RecordingPolicy',
+    'SpikeTrainAccumulator',
+    'Profiler'
 ]
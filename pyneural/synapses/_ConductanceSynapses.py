@@ -0,0 +1,31 @@
+from typing import Union
+import numpy as np
+from numpy.typing import DTypeLike
+from ._Synapses import Synapses
+
+
+class ConductanceSynapses(Synapses):
+    """
+    Conductance-based synapses: a spike arriving through a synapse increases the synaptic conductance of its postsynaptic neuron by the weight of the synapse (in mS/cm2), which then decays with the time constant `tau`. The current is g_syn*(E_syn - V), so it depends on the membrane potential and the reversal potential decides whether the synapses are excitatory or inhibitory.
+    """
+
+    def __init__(self, N_neurons: int, pre: np.ndarray, post: np.ndarray, weights: Union[float, np.ndarray], delays: Union[float, np.ndarray] = 1.0, tau: float = 5.0, E_syn: float = 0.0):
+        """
+        Initialize synapses from a list of connections. Apart from the parameters of `pyneural.synapses.Synapses`, takes the following additional argument:
+
+        :param E_syn: reversal potential of the synapses in mV (0.0 by default, excitatory; around -80.0 for inhibitory synapses).
+        """
+        super().__init__(N_neurons, pre, post, weights, delays, tau)
+        if np.any(self.weights < 0):
+            raise ValueError('Bad synaptic weights: conductances must not be negative')
+        self.E_syn = E_syn
+        self._work = np.zeros(N_neurons)
+
+    def prepare(self, dt: float, dtype: DTypeLike = np.float64):
+        super().prepare(dt, dtype)
+        self._work = np.zeros(self.N_neurons, dtype=dtype)
+
+    def _add_current(self, V: np.ndarray, out: np.ndarray):
+        np.subtract(self.E_syn, V, out=self._work)
+        self._work *= self._state
+        out += self._work
@@ -0,0 +1,11 @@
+import numpy as np
+from ._Synapses import Synapses
+
+
+class ExponentialSynapses(Synapses):
+    """
+    Current-based synapses with exponentially decaying currents: a spike arriving through a synapse increases the current of its postsynaptic neuron by the weight of the synapse (in μA/cm2, positive for excitatory and negative for inhibitory synapses), which then decays with the time constant `tau`.
+    """
+
+    def _add_current(self, V: np.ndarray, out: np.ndarray):
+        out += self._state
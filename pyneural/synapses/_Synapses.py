@@ -0,0 +1,152 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+import numpy as np
+from numpy.typing import DTypeLike
+
+
+class Synapses(ABC):
+    """
+    A base class for the synaptic coupling between the neurons of a simulated group. The connectivity is stored in the CSR format: the synapses of the presynaptic neuron `i` are `indptr[i]:indptr[i + 1]`, with their postsynaptic neurons in `targets` and their weights and delays in `weights` and `delays`. Populations (e.g. excitatory and inhibitory neurons) are ranges of neuron indices within the group, which can have per-neuron parameters.
+
+    Spikes are delivered event-driven: when a neuron fires, the weights of its synapses are scatter-added into a circular buffer of delayed inputs at the steps they arrive at, so the work per step is proportional to the number of spikes times their fan-out instead of the number of possible connections. Each postsynaptic neuron has a synaptic variable which decays exponentially with the time constant `tau` and jumps by the weights arriving at a step; the subclasses turn it into a current.
+
+    Pass synapses to `pyneural.NeuralModel.simulate_neurons` to simulate them with a group. The synaptic current is added to the external stimulation of the group.
+    """
+
+    def __init__(self, N_neurons: int, pre: np.ndarray, post: np.ndarray, weights: Union[float, np.ndarray], delays: Union[float, np.ndarray] = 1.0, tau: float = 5.0):
+        """
+        Initialize synapses from a list of connections.
+
+        :param N_neurons: number of neurons in the simulated group.
+        :param pre: numpy array containing the presynaptic neuron of each synapse.
+        :param post: numpy array containing the postsynaptic neuron of each synapse.
+        :param weights: weight of each synapse (or a single weight for all of them), see the subclasses for its units.
+        :param delays: delay of each synapse (or a single delay for all of them) in ms, from the detection of a spike to its arrival. Delays are rounded to whole steps, and are at least one step.
+        :param tau: time constant of the decay of the synaptic variable in ms.
+        """
+        pre = np.asarray(pre, dtype=np.int64).ravel()
+        post = np.asarray(post, dtype=np.int64).ravel()
+        if pre.shape != post.shape:
+            raise ValueError(f'Bad synapses: {pre.size} presynaptic and {post.size} postsynaptic neurons')
+        if pre.size and (min(pre.min(), post.min()) < 0 or max(pre.max(), post.max()) >= N_neurons):
+            raise ValueError(f'Bad synapses: neuron indices must be between 0 and {N_neurons - 1}')
+        if tau <= 0:
+            raise ValueError(f'Bad synaptic time constant: {tau}')
+        self.N_neurons = N_neurons
+        self.tau = tau
+
+        order = np.argsort(pre, kind='stable')
+        self.indptr: np.ndarray = np.concatenate([[0], np.cumsum(np.bincount(pre, minlength=N_neurons))])
+        """Numpy array of length `N_neurons + 1`: the synapses of the presynaptic neuron `i` are `indptr[i]:indptr[i + 1]`."""
+        self.targets: np.ndarray = post[order]
+        """Numpy array containing the postsynaptic neuron of each synapse."""
+        self.weights: np.ndarray = np.broadcast_to(np.asarray(weights, dtype=np.float64), pre.shape)[order]
+        """Numpy array containing the weight of each synapse."""
+        self.delays: np.ndarray = np.broadcast_to(np.asarray(delays, dtype=np.float64), pre.shape)[order]
+        """Numpy array containing the delay of each synapse in ms."""
+
+        self._dt: Optional[float] = None
+        self._delay_steps: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._buffer: np.ndarray = np.zeros((1, N_neurons))
+        self._state: np.ndarray = np.zeros(N_neurons)
+        self._decay: float = 1.0
+
+    @classmethod
+    def random(cls, N_neurons: int, p: float, weight: float, delay: float = 1.0, pre: Optional[tuple[int, int]] = None, post: Optional[tuple[int, int]] = None, rng: Optional[np.random.Generator] = None, **kwargs) -> 'Synapses':
+        """
+        Create random sparse synapses: each presynaptic neuron gets a binomial number of synapses with probability `p` per postsynaptic neuron, with the targets drawn uniformly (with replacement). The connections are drawn without building an `N x N` matrix.
+
+        :param N_neurons: number of neurons in the simulated group.
+        :param p: connection probability.
+        :param weight: weight of every synapse.
+        :param delay: delay of every synapse in ms.
+        :param pre: range `(start, stop)` of the presynaptic neurons (all neurons by default).
+        :param post: range `(start, stop)` of the postsynaptic neurons (all neurons by default).
+        :param rng: `numpy.random.Generator` to draw the connections with. If not specified, a new unseeded generator is used.
+        :param kwargs: other parameters of the constructor of the subclass (e.g. `tau`).
+        """
+        if not 0 <= p <= 1:
+            raise ValueError(f'Bad connection probability: {p}')
+        rng = np.random.default_rng() if rng is None else rng
+        pre_start, pre_stop = (0, N_neurons) if pre is None else pre
+        post_start, post_stop = (0, N_neurons) if post is None else post
+        counts = rng.binomial(post_stop - post_start, p, size=pre_stop - pre_start)
+        sources = np.repeat(np.arange(pre_start, pre_stop), counts)
+        targets = rng.integers(post_start, post_stop, size=sources.size)
+        return cls(N_neurons, sources, targets, weight, delay, **kwargs)
+
+    @property
+    def N_synapses(self) -> int:
+        """The number of synapses."""
+        return self.targets.size
+
+    def prepare(self, dt: float, dtype: DTypeLike = np.float64):
+        """
+        Allocate the circular buffer of delayed inputs for a simulation with the given step, and reset the synapses. Called by `pyneural.NeuralModel.simulate_neurons`.
+
+        :param dt: time interval between two consecutive steps in ms.
+        :param dtype: floating point type of the state of the simulated group.
+        """
+        self._dt = dt
+        self._delay_steps = np.maximum(np.rint(self.delays / dt), 1).astype(np.int64)
+        N_slots = int(self._delay_steps.max(initial=1)) + 1
+        self._buffer = np.zeros((N_slots, self.N_neurons), dtype=dtype)
+        self._state = np.zeros(self.N_neurons, dtype=dtype)
+        self._decay = float(np.exp(-dt / self.tau))
+
+    def reset(self):
+        """
+        Clear the synaptic variables and the inputs in flight.
+        """
+        self._buffer[:] = 0
+        self._state[:] = 0
+
+    def deliver(self, fired: np.ndarray, step: int):
+        """
+        Send the spikes of the given neurons through their synapses: the weights are added to the inputs arriving at `step` plus the delay of each synapse.
+
+        :param fired: numpy array containing the indices of the neurons that fired.
+        :param step: index of the step the spikes were detected at.
+        """
+        starts = self.indptr[fired]
+        counts = self.indptr[fired + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return
+        # indices of the synapses of all fired neurons, concatenated
+        synapses = np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        slots = (step + self._delay_steps[synapses]) % self._buffer.shape[0]
+        np.add.at(self._buffer, (slots, self.targets[synapses]), self.weights[synapses])
+
+    def add_current(self, step: int, V: np.ndarray, out: np.ndarray):
+        """
+        Advance the synaptic variables to the given step (the decay and the inputs arriving at it), and add the synaptic current to `out`.
+
+        :param step: index of the simulation step.
+        :param V: numpy array containing the membrane potential of each neuron in mV at the start of the step.
+        :param out: numpy array containing the stimulation of each neuron, the current is added to it in place.
+        """
+        arriving = self._buffer[step % self._buffer.shape[0]]
+        self._state *= self._decay
+        self._state += arriving
+        arriving[:] = 0
+        self._add_current(V, out)
+
+    @abstractmethod
+    def _add_current(self, V: np.ndarray, out: np.ndarray):
+        pass
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Capture the synaptic variables and the inputs in flight. Returns a dictionary of numpy arrays (copies), which can be passed to `restore`.
+        """
+        return {'state': self._state.copy(), 'buffer': self._buffer.copy()}
+
+    def restore(self, snapshot: dict[str, np.ndarray]):
+        """
+        Restore the state captured by `snapshot` (after `prepare` with the same step).
+
+        :param snapshot: dictionary returned by `snapshot`.
+        """
+        np.copyto(self._state, snapshot['state'])
+        np.copyto(self._buffer, snapshot['buffer'])
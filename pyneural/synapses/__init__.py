@@ -0,0 +1,13 @@
+"""
+This module contains models of the synaptic coupling between the neurons of a group, which turns a group of independent neurons into a recurrent network. All of them are inherited from an abstract class `pyneural.synapses.Synapses`.
+"""
+
+from ._Synapses import Synapses
+from ._ExponentialSynapses import ExponentialSynapses
+from ._ConductanceSynapses import ConductanceSynapses
+
+__all__ = [
+    'Synapses',
+    'ExponentialSynapses',
+    'ConductanceSynapses'
+]
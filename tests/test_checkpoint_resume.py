@@ -0,0 +1,75 @@
+from pyneural import NeuralModel
+from pyneural.input_current import NoisyConstInputCurrent
+from pyneural.statistics import Profiler
+import os
+import tempfile
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+N_neurons = 20
+N_steps = 10000
+dt = 0.02
+I = np.linspace(5, 30, N_neurons)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt(event: str, profiler: Profiler):
+    # stops the simulation in the middle, after some checkpoints were written
+    if event == 'block' and profiler.counters['steps'] >= N_steps // 2:
+        raise Interrupted()
+
+
+def simulate(checkpoint=None, resume=False, profiler=None):
+    model = NeuralModel('hh')
+    neurons = model.create_model(N_neurons)
+    current = NoisyConstInputCurrent(N_neurons, I=I, std=2.0, rng=np.random.default_rng(7))
+    return model.simulate_neurons(neurons, N_steps, dt, current, record=['Vm', 'I_ext'], checkpoint=checkpoint, checkpoint_steps=1500, resume=resume, profiler=profiler)
+
+
+uninterrupted = simulate()
+
+with tempfile.TemporaryDirectory() as directory:
+    checkpoint = os.path.join(directory, 'run.checkpoint')
+    profiler = Profiler()
+    profiler.subscribe(interrupt)
+    try:
+        simulate(checkpoint, profiler=profiler)
+        raise AssertionError('the simulation was not interrupted')
+    except Interrupted:
+        pass
+    assert os.path.exists(checkpoint)
+    # a new process would start from scratch: new neurons and a new input current with the same seed
+    resumed_profiler = Profiler()
+    resumed = simulate(checkpoint, resume=True, profiler=resumed_profiler)
+    assert 0 < resumed_profiler.counters['steps'] < N_steps, 'the simulation did not continue from the checkpoint'
+
+# the resumed run must be identical to the uninterrupted one
+assert np.array_equal(uninterrupted.spike_steps, resumed.spike_steps)
+assert np.array_equal(uninterrupted.spike_neurons, resumed.spike_neurons)
+for name in ['Vm', 'I_ext']:
+    assert np.array_equal(uninterrupted.recorder.traces[name], resumed.recorder.traces[name]), f'trace {name} differs'
+
+fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+assert isinstance(ax, Axes)
+t = np.arange(N_steps) * dt
+ax.plot(t, uninterrupted.recorder.traces['Vm'][:, -1], label='uninterrupted')
+ax.plot(t, resumed.recorder.traces['Vm'][:, -1], '--', label='resumed')
+ax.set_title('Simulation resumed from a checkpoint')
+ax.set_xlabel('Time (ms)')
+ax.set_ylabel('Membrane potential (mV)')
+ax.legend()
+plt.show()
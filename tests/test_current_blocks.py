@@ -0,0 +1,38 @@
+from pyneural.input_current import ConstInputCurrent, NoisyConstInputCurrent
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+dt = 0.1
+N_steps = 500
+end_times = np.round(np.arange(0.1, 40, 0.1), 10)
+
+# blocks starting at any step must give the same rows as the single steps at `step*dt`
+for end_time in end_times:
+    current = ConstInputCurrent(1, I=np.array([10.0]), start_time=1.7, end_time=end_time)
+    steps = np.stack([current.get_current(step*dt).copy() for step in range(N_steps)])
+    for start in (0, 1, 7, 42, 333):
+        block = current.get_current_block(start*dt, N_steps - start, dt)
+        assert np.array_equal(block, steps[start:]), f'block at step {start} differs for end_time={end_time}'
+
+noisy = NoisyConstInputCurrent(3, I=np.full(3, 10.0), std=1.0, start_time=1.7, end_time=4.3, rng=np.random.default_rng(0))
+active = np.stack([noisy.get_current_block(start*dt, 10, dt)[:, 0] != 0 for start in range(0, 60, 10)]).ravel()
+assert np.array_equal(active, np.array([1.7 <= step*dt <= 4.3 for step in range(60)]))
+
+fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+assert isinstance(ax, Axes)
+ax.plot(np.arange(60)*dt, active, drawstyle='steps-post')
+ax.set_title('Active steps of a stimulation generated in blocks')
+ax.set_xlabel('Time (ms)')
+ax.set_ylabel('Active')
+plt.show()
@@ -0,0 +1,71 @@
+from pyneural import NeuralModel
+from pyneural.neuron_models import EquationModel
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+# the Hodgkin-Huxley model written as equations
+HH = '''
+dV/dt = I_total / C_m
+alpha_n = 0.01 * vtrap(10 - (V - V_rest), 10)
+beta_n = 0.125 * exp(-(V - V_rest) / 80)
+alpha_m = 0.1 * vtrap(25 - (V - V_rest), 10)
+beta_m = 4 * exp(-(V - V_rest) / 18)
+alpha_h = 0.07 * exp(-(V - V_rest) / 20)
+beta_h = 1 / (exp((30 - (V - V_rest)) / 10) + 1)
+I_leak = -gL * (V - E_L)
+I_K = -gK * n**4 * (V - E_K)
+I_Na = -gNa * m**3 * h * (V - E_Na)
+'''
+HH_PARAMS = {'gL': 0.3, 'gK': 36.0, 'gNa': 120.0, 'E_L': -59.4, 'E_K': -82.0, 'E_Na': 45.0, 'C_m': 1.0}
+
+# the same model with an A-type potassium current
+HH_A = HH + '''
+alpha_a = 0.02 * vtrap(-(V + 45), 5)
+beta_a = 0.1 * exp(-(V + 70) / 20)
+alpha_b = 0.001 * exp(-(V + 70) / 20)
+beta_b = 0.02 / (1 + exp(-(V + 40) / 5))
+I_A = -gA * a**3 * b * (V - E_K)
+'''
+
+NeuralModel.register_model('hh_equations', EquationModel.parse(HH, HH_PARAMS), replace=True)
+NeuralModel.register_model('hh_a', EquationModel.parse(HH_A, {**HH_PARAMS, 'gA': 20.0}), replace=True)
+
+I = np.linspace(0, 30, 200)
+N_iter = 20000
+dt = 0.02
+
+fig, ax = plt.subplots(figsize=(6, 4))
+assert isinstance(ax, Axes)
+f_hh = NeuralModel('hh').get_fi_curve(I, params={'integrator': 'rk4'}, N_iter=N_iter, dt=dt)
+f_equations = NeuralModel('hh_equations').get_fi_curve(I, params={'integrator': 'rk4'}, N_iter=N_iter, dt=dt)
+f_a = NeuralModel('hh_a').get_fi_curve(I, params={'integrator': 'rk4'}, N_iter=N_iter, dt=dt)
+# the equations must reproduce the built-in model
+assert np.array_equal(np.isnan(f_hh), np.isnan(f_equations))
+assert np.allclose(f_hh, f_equations, rtol=1e-6, equal_nan=True)
+
+# the stages of rk4 are evaluated at their times, so time-dependent equations keep the 4th order
+NeuralModel.register_model('sine', EquationModel({'V': 'sin(t)'}), replace=True)
+sine = NeuralModel('sine')
+neurons = sine.create_model(1, integrator='rk4')
+sine.simulate_neurons(neurons, 20, 0.5)
+assert abs(neurons.V[0] - (-70.0 + 1 - np.cos(10.0))) < 1e-3
+
+ax.plot(I, f_hh, label='hh')
+ax.plot(I, f_equations, '--', label='hh from equations')
+ax.plot(I, f_a, label='hh with A-type K current')
+ax.set_title('f-I curves of equation-defined models')
+ax.set_xlabel('Input current $I_{ext}$')
+ax.set_ylabel('Spiking frequency (kHz)')
+ax.legend()
+plt.show()
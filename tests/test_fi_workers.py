@@ -0,0 +1,37 @@
+from pyneural import NeuralModel
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+I = np.linspace(0, 30, 200)
+N_iter = 10000
+dt = 0.02
+std = 3.0
+seed = 12345
+
+if __name__ == '__main__':
+    model = NeuralModel('hh')
+    # each shard of the currents has its own random stream, so the curve does not depend on the number of processes simulating the shards
+    f_1 = model.get_fi_curve(I, std=std, N_iter=N_iter, dt=dt, workers=1, seed=seed, shard_size=32)
+    f_4 = model.get_fi_curve(I, std=std, N_iter=N_iter, dt=dt, workers=4, seed=seed, shard_size=32)
+    assert np.array_equal(f_1, f_4, equal_nan=True), 'the f-I curve depends on the number of workers'
+
+    fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+    assert isinstance(ax, Axes)
+    ax.plot(I, f_1, label='1 worker')
+    ax.plot(I, f_4, '--', label='4 workers')
+    ax.set_title(f'Hodgkin-Huxley f-I curve with noise (std={std})')
+    ax.set_xlabel('Input current $I_{ext}$')
+    ax.set_ylabel('Spiking frequency (kHz)')
+    ax.legend()
+    plt.show()
@@ -0,0 +1,36 @@
+from pyneural import NeuralModel
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+# float32 frequencies must match float64 within 1e-3 of the maximal frequency
+TOLERANCE = 1e-3
+
+model = NeuralModel('hh')
+I = np.linspace(0, 30, 200)
+f_64 = model.get_fi_curve(I_ext=I, N_iter=25000, dt=0.02, dtype=np.float64)
+f_32 = model.get_fi_curve(I_ext=I, N_iter=25000, dt=0.02, dtype=np.float32)
+
+assert np.array_equal(np.isnan(f_64), np.isnan(f_32))
+error = np.nanmax(np.abs(f_64 - f_32))
+assert error <= TOLERANCE * np.nanmax(f_64), f'float32 error {error} exceeds the tolerance'
+
+fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+assert isinstance(ax, Axes)
+ax.plot(I, f_64, label='float64')
+ax.plot(I, f_32, '--', label='float32')
+ax.set_title(f'Hodgkin-Huxley f-I curve, max difference {error:.2e} kHz')
+ax.set_xlabel('Input current $I_{ext}$')
+ax.set_ylabel('Spiking frequency (kHz)')
+ax.legend()
+plt.show()
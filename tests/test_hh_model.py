@@ -19,6 +19,11 @@ neuron = model.create_model(1)
 I_ext = NoisyConstInputCurrent(N_neurons=1, I=np.array([5]), std=0)
 stats = model.simulate_neurons(neuron, 100000, 0.01, I_ext)
 
+# without conductances the exponential step is the Euler step I_total*dt/C_m instead of 0/0
+passive = model.create_model(1, {'gL': 0.0, 'gK': 0.0, 'gNa': 0.0}, integrator='exponential')
+model.simulate_neurons(passive, 100, 0.01, NoisyConstInputCurrent(N_neurons=1, I=np.array([2.0]), std=0))
+assert np.allclose(passive.V, -70.0 + 2.0 * 100 * 0.01)
+
 plt.figure(figsize=(10, 8))
 
 ax1 = plt.subplot(411)
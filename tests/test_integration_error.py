@@ -0,0 +1,50 @@
+from pyneural import NeuralModel
+from pyneural.input_current import ConstInputCurrent
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+# subthreshold Hodgkin-Huxley neurons for 20 ms, compared with a rk4 simulation with a very fine step
+T = 20.0
+dt_reference = 0.0005
+I = np.array([1.0, 2.0])
+model = NeuralModel('hh')
+
+
+def simulate(dt: float, integrator: str) -> np.ndarray:
+    neurons = model.create_model(I.size, integrator=integrator)
+    return model.simulate_neurons(neurons, int(round(T / dt)), dt, ConstInputCurrent(I.size, I=I), record=['Vm']).traces['Vm']
+
+
+reference = simulate(dt_reference, 'rk4')
+
+fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+assert isinstance(ax, Axes)
+for integrator, dts in [('euler', [0.01, 0.02, 0.04]), ('rk4', [0.02, 0.04, 0.08])]:
+    estimated, true = [], []
+    for dt in dts:
+        ratio = int(round(dt / dt_reference))
+        # the row k of a simulation is the potential after the step k
+        error = simulate(dt, integrator) - reference[ratio - 1::ratio]
+        estimate = model.estimate_integration_error(model.create_model(I.size), int(round(T / dt)), dt, ConstInputCurrent(I.size, I=I), integrator)
+        estimated.append(estimate['max_abs'])
+        true.append(np.max(np.abs(error)))
+        # the estimate is the error of the step `dt`, not of the step `dt/2`
+        assert 0.5 < estimate['max_abs'] / true[-1] < 2, f'{integrator} at dt={dt}: estimated {estimate["max_abs"]}, true {true[-1]}'
+    ax.loglog(dts, true, 'o-', label=f'{integrator} true')
+    ax.loglog(dts, estimated, 'x--', label=f'{integrator} estimated')
+ax.set_title('Global error of the membrane potential')
+ax.set_xlabel('Step (ms)')
+ax.set_ylabel('Max error (mV)')
+ax.legend()
+plt.show()
@@ -0,0 +1,44 @@
+from pyneural import NeuralModel
+from pyneural.input_current import NoisyConstInputCurrent
+from pyneural.synapses import ExponentialSynapses, ConductanceSynapses
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+# a sparse recurrent network of 8000 excitatory and 2000 inhibitory neurons with 100 inputs per neuron on average
+N_exc, N_inh = 8000, 2000
+N_neurons = N_exc + N_inh
+dt = 0.1
+rng = np.random.default_rng(0)
+excitatory = ExponentialSynapses.random(N_neurons, 80 / N_neurons, 2.0, delay=1.5, pre=(0, N_exc), rng=rng)
+inhibitory = ConductanceSynapses.random(N_neurons, 20 / N_neurons, 0.5, delay=0.8, pre=(N_exc, N_neurons), rng=rng, tau=10.0, E_syn=-80.0)
+
+model = NeuralModel('lif')
+np.random.seed(0)
+neurons = model.create_model(N_neurons)
+I_input = NoisyConstInputCurrent(N_neurons, I=np.full(N_neurons, 22.0), std=2)
+coupled = model.simulate_neurons(neurons, 2000, dt, I_input, record=[], synapses=[excitatory, inhibitory])
+
+np.random.seed(0)
+I_input = NoisyConstInputCurrent(N_neurons, I=np.full(N_neurons, 22.0), std=2)
+uncoupled = model.simulate_neurons(neurons, 2000, dt, I_input, record=[])
+assert not np.array_equal(coupled.spike_steps, uncoupled.spike_steps)
+
+fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+assert isinstance(ax, Axes)
+ax.plot(coupled.spike_steps * dt, coupled.spike_neurons, '.', markersize=0.5)
+ax.axhline(N_exc, color='gray', linestyle='--')
+ax.set_title(f'Recurrent network of {N_neurons} LIF neurons with {excitatory.N_synapses + inhibitory.N_synapses} synapses')
+ax.set_xlabel('Time (ms)')
+ax.set_ylabel('Neuron')
+plt.show()
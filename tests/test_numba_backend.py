@@ -0,0 +1,52 @@
+from pyneural import NeuralModel
+from pyneural.neuron_models import _kernels
+import sys
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+if not _kernels.AVAILABLE:
+    print('Skipped: the numba backend requires the optional numba package')
+    sys.exit(0)
+
+I = np.linspace(0, 30, 200)
+N_iter = 20000
+dt = 0.02
+
+# at V - V_rest = 10 and 25 the HH rate functions divide 0 by 0, which gives nan in both engines instead of an error
+V_singular = {'V_start': np.array([-60.0, -45.0, -65.0])}
+states = []
+for backend in ['numpy', 'numba']:
+    model = NeuralModel('hh', backend=backend)
+    neurons = model.create_model(3, V_singular)
+    model.simulate_neurons(neurons, 1000, dt, record=[], initial_state=neurons.snapshot())
+    states.append(neurons.V.copy())
+assert np.array_equal(np.isnan(states[0]), np.isnan(states[1]))
+assert np.isnan(states[1][:2]).all() and not np.isnan(states[1][2])
+
+fig, axes = plt.subplots(1, 2, figsize=(10, 4))
+for ax, model in zip(axes, ['hh', 'lif']):
+    assert isinstance(ax, Axes)
+    # the compiled kernels must agree with the NumPy engine
+    f_numpy = NeuralModel(model).get_fi_curve(I, N_iter=N_iter, dt=dt)
+    f_numba = NeuralModel(model, backend='numba').get_fi_curve(I, N_iter=N_iter, dt=dt)
+    assert np.array_equal(np.isnan(f_numpy), np.isnan(f_numba))
+    assert np.allclose(f_numpy, f_numba, rtol=1e-6, equal_nan=True)
+
+    ax.plot(I, f_numpy, label='numpy')
+    ax.plot(I, f_numba, '--', label='numba')
+    ax.set_title(f'f-I curve of the {model} model')
+    ax.set_xlabel('Input current $I_{ext}$')
+    ax.set_ylabel('Spiking frequency (kHz)')
+    ax.legend()
+plt.show()
@@ -0,0 +1,32 @@
+from pyneural import NeuralModel
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+model = NeuralModel('hh')
+rheobase = model.find_rheobase(I_min=0, I_max=30, N_iter=20000, dt=0.02, tolerance=0.01)
+I, f = model.get_adaptive_fi_curve(I_min=0, I_max=30, N_iter=20000, dt=0.02)
+
+# the rheobase must agree with the first firing current of the adaptive curve
+assert np.isnan(model.get_fi_curve(np.array([rheobase - 0.01]), N_iter=20000, dt=0.02)[0])
+assert rheobase <= I[np.argmax(np.nan_to_num(f) > 0)]
+
+fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+assert isinstance(ax, Axes)
+ax.plot(I, f, '.-', label='Hodgkin-Huxley')
+ax.axvline(rheobase, linestyle='--', color='gray', label=f'rheobase {rheobase:.2f}')
+ax.set_title(f'Adaptive f-I curve with {I.size} currents')
+ax.set_xlabel('Input current $I_{ext}$')
+ax.set_ylabel('Spiking frequency (kHz)')
+ax.legend()
+plt.show()
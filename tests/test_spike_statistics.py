@@ -0,0 +1,42 @@
+from pyneural import NeuralModel
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+from pyneural.input_current import NoisyConstInputCurrent
+from pyneural.statistics import SpikeTrainAccumulator
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+model = NeuralModel('hh')
+I = np.linspace(10, 25, 5)
+dt = 0.05
+ngroup = model.create_model(5)
+accumulator = SpikeTrainAccumulator(5, dt, isi_bins=np.linspace(0, 60, 121), count_window=200)
+stats = model.simulate_neurons(ngroup, 200000, dt, NoisyConstInputCurrent(5, I=I, std=15), record=(), accumulator=accumulator)
+
+# the streaming statistics must match the ones computed from the stored spike trains
+for i in range(5):
+    assert np.array_equal(accumulator.isi_histogram[i], np.histogram(stats.spike_intervals[i], bins=accumulator.isi_bins)[0])
+assert np.allclose(accumulator.isi_mean, [intervals.mean() for intervals in stats.spike_intervals])
+assert np.allclose(accumulator.isi_var, [intervals.var() for intervals in stats.spike_intervals])
+
+fig, ax = plt.subplots(5, figsize=(10, 8))
+centers = (accumulator.isi_bins[1:] + accumulator.isi_bins[:-1]) / 2
+for i in range(5):
+    assert isinstance(ax[i], Axes)
+    ax[i].bar(centers, accumulator.isi_histogram[i], width=np.diff(accumulator.isi_bins))
+    ax[i].set_xlabel('ISI (ms)')
+    ax[i].set_title(f'$\\mu_I=${I[i]:.2f}, CV={accumulator.cv[i]:.3f}, Fano={accumulator.fano_factor[i]:.3f}')
+    ax[i].set_ylabel('Count')
+
+fig.tight_layout()
+plt.show()
@@ -0,0 +1,43 @@
+from pyneural import NeuralModel
+from pyneural.input_current import NoisyConstInputCurrent
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+N_neurons = 1000
+N_steps = 5000
+dt = 0.02
+model = NeuralModel('hh')
+
+
+def simulate(threads: int):
+    np.random.seed(0)
+    neurons = model.create_model(N_neurons)
+    I_input = NoisyConstInputCurrent(N_neurons, I=np.linspace(0, 30, N_neurons), std=5)
+    return model.simulate_neurons(neurons, N_steps, dt, I_input, record=['Vm'], threads=threads, tile_size=256)
+
+
+# the tiled simulation must reproduce the serial one exactly
+serial = simulate(1)
+tiled = simulate(4)
+assert np.array_equal(serial.spike_steps, tiled.spike_steps)
+assert np.array_equal(serial.spike_neurons, tiled.spike_neurons)
+assert np.array_equal(serial.traces['Vm'], tiled.traces['Vm'])
+
+fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+assert isinstance(ax, Axes)
+ax.plot(tiled.spike_steps * dt, tiled.spike_neurons, '.', markersize=1)
+ax.set_title(f'Spikes of {N_neurons} Hodgkin-Huxley neurons simulated in 4 threads')
+ax.set_xlabel('Time (ms)')
+ax.set_ylabel('Neuron')
+plt.show()
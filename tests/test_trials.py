@@ -0,0 +1,64 @@
+from pyneural import NeuralModel
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+import seaborn as sns
+
+sns.set_theme(style="ticks",
+              palette="Set1",
+              font_scale=1,
+              rc={
+                  "axes.spines.right": False,
+                  "axes.spines.top": False,
+              },
+              )
+
+I = np.linspace(0, 30, 50)
+N_iter = 10000
+dt = 0.02
+n_trials = 3
+
+if __name__ == '__main__':
+    model = NeuralModel('hh')
+    single = model.get_fi_curve(I, N_iter=N_iter, dt=dt)
+    # without noise every trial is the same simulation as a single-trial group
+    trials = model.get_fi_curve(I, params={'n_trials': n_trials}, N_iter=N_iter, dt=dt, burn_in_steps=500)
+    assert trials.shape == (n_trials, I.size)
+    burnt_in = model.get_fi_curve(I, N_iter=N_iter, dt=dt, burn_in_steps=500)
+    for trial in trials:
+        assert np.array_equal(trial, burnt_in, equal_nan=True)
+
+    # with noise the trials differ, but the curve does not depend on the number of processes simulating the shards
+    noisy_1 = model.get_fi_curve(I, params={'n_trials': n_trials}, std=3.0, N_iter=N_iter, dt=dt, workers=1, seed=7, shard_size=16)
+    noisy_2 = model.get_fi_curve(I, params={'n_trials': n_trials}, std=3.0, N_iter=N_iter, dt=dt, workers=2, seed=7, shard_size=16)
+    assert noisy_1.shape == (n_trials, I.size)
+    assert np.array_equal(noisy_1, noisy_2, equal_nan=True)
+    assert not np.array_equal(noisy_1[0], noisy_1[1], equal_nan=True)
+
+    # a sweep over a grid of parameters has a leading trial axis
+    frequencies, stats = model.sweep({'gNa': [100.0, 120.0], 'I_ext': [10.0, 20.0, 30.0]}, N_steps=N_iter, dt=dt, params={'n_trials': n_trials}, burn_in_steps=500)
+    assert frequencies.shape == (n_trials, 2, 3)
+    for trial in frequencies:
+        assert np.array_equal(trial, frequencies[0], equal_nan=True)
+
+    # the burn-in of a multi-trial group accepts the stimulation of the neurons of a trial
+    neurons = model.create_model(I.size, n_trials=n_trials)
+    state = model.burn_in(neurons, I, 500, dt)
+    assert state['V'].shape == (n_trials * I.size,)
+    assert np.array_equal(state['V'][:I.size], state['V'][-I.size:])
+    try:
+        model.burn_in(neurons, I[:-1], 500, dt)
+        raise AssertionError('a stimulation of a bad shape was accepted')
+    except ValueError:
+        pass
+
+    fig, ax = plt.subplots(1, 1, figsize=(10, 3))
+    assert isinstance(ax, Axes)
+    ax.plot(I, single, label='single trial')
+    for i, trial in enumerate(noisy_1):
+        ax.plot(I, trial, '--', label=f'noisy trial {i}')
+    ax.set_title(f'Hodgkin-Huxley f-I curve in {n_trials} trials')
+    ax.set_xlabel('Input current $I_{ext}$')
+    ax.set_ylabel('Spiking frequency (kHz)')
+    ax.legend()
+    plt.show()